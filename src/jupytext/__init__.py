@@ -1,35 +1,66 @@
 """Read and write Jupyter notebooks as text files"""
 
-from .formats import NOTEBOOK_EXTENSIONS, get_format_implementation, guess_format
-from .jupytext import read, reads, write, writes
+from importlib import import_module
+from importlib.util import find_spec
+
 from .reraise import reraise
 from .version import __version__
 
-try:
-    from .sync_contentsmanager import build_sync_jupytext_contents_manager_class
-except ImportError as err:
-    build_sync_jupytext_contents_manager_class = reraise(err)
+# The public objects of Jupytext, and the modules where they are defined. The modules
+# are imported when the objects are used for the first time, so that 'import jupytext'
+# does not import nbformat, the contents managers or the optional dependencies.
+_LAZY_OBJECTS = {
+    "read": ".jupytext",
+    "reads": ".jupytext",
+    "write": ".jupytext",
+    "writes": ".jupytext",
+    "iter_cells": ".jupytext",
+    "NOTEBOOK_EXTENSIONS": ".formats",
+    "guess_format": ".formats",
+    "get_format_implementation": ".formats",
+    "TextFileContentsManager": ".sync_contentsmanager",
+    "AsyncTextFileContentsManager": ".async_contentsmanager",
+    "build_sync_jupytext_contents_manager_class": ".sync_contentsmanager",
+    "build_async_jupytext_contents_manager_class": ".async_contentsmanager",
+}
+
+# These objects are not available when Jupyter Server (or Notebook) is not installed
+_CONTENTS_MANAGER_OBJECTS = {
+    "TextFileContentsManager",
+    "AsyncTextFileContentsManager",
+    "build_sync_jupytext_contents_manager_class",
+    "build_async_jupytext_contents_manager_class",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_OBJECTS:
+        # The submodules, e.g. jupytext.config, are also imported on first use
+        if name.startswith("_") or find_spec(f"{__name__}.{name}") is None:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        return import_module(f".{name}", __name__)
+
+    try:
+        value = getattr(import_module(_LAZY_OBJECTS[name], __name__), name)
+    except ImportError as err:
+        if name not in _CONTENTS_MANAGER_OBJECTS:
+            raise
+        value = reraise(err)
+
+    globals()[name] = value
+    return value
 
-try:
-    from .sync_contentsmanager import TextFileContentsManager
-except ImportError as err:
-    TextFileContentsManager = reraise(err)
 
-try:
-    from .async_contentsmanager import build_async_jupytext_contents_manager_class
-except ImportError as err:
-    build_async_jupytext_contents_manager_class = reraise(err)
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_OBJECTS))
 
-try:
-    from .async_contentsmanager import AsyncTextFileContentsManager
-except ImportError as err:
-    AsyncTextFileContentsManager = reraise(err)
 
 __all__ = [
     "read",
     "write",
     "writes",
     "reads",
+    "iter_cells",
     "NOTEBOOK_EXTENSIONS",
     "guess_format",
     "get_format_implementation",
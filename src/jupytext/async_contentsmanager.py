@@ -6,13 +6,16 @@ text files as notebooks
 import inspect
 import itertools
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
 try:
     import tomllib
 except ImportError:
     import tomli as tomllib
 
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 from datetime import timedelta
 
 import nbformat
@@ -29,6 +32,7 @@ from .config import (
     notebook_formats,
     preferred_format,
 )
+from .export_cache import CellExportCache
 from .formats import (
     long_form_multiple_formats,
     short_form_multiple_formats,
@@ -44,7 +48,7 @@ from .paired_paths import (
     full_path,
     paired_paths,
 )
-from .pairs import PairedFilesDiffer, latest_inputs_and_outputs
+from .pairs import PairedFilesDiffer, async_conversion_pool, async_run_in_executor, gather, latest_inputs_and_outputs
 
 
 def build_async_jupytext_contents_manager_class(base_contents_manager_class):
@@ -65,8 +69,16 @@ def build_async_jupytext_contents_manager_class(base_contents_manager_class):
             # fmt is the current format, and formats the paired formats.
             self.paired_notebooks = dict()
 
-            # Configuration cache, useful when notebooks are listed in a given directory
+            # The last configuration loaded
             self.cached_config = namedtuple("cached_config", "path config_file config")
+            # Configuration cache: directory => (signature, config_file, config)
+            self.config_cache = OrderedDict()
+            self.config_cache_size = 128
+            # Cell export caches: text notebook path => CellExportCache
+            self.cell_export_caches = OrderedDict()
+            self.cell_export_caches_size = 16
+            # The pools of threads or processes used for the conversions
+            self.conversion_executors = {}
             self.super = super()
             self.super.__init__(*args, **kwargs)
 
@@ -116,6 +128,62 @@ def build_async_jupytext_contents_manager_class(base_contents_manager_class):
                     self.log.info("Creating directory %s", parent_dir)
                     await self.super.save(dict(type="directory"), parent_dir)
 
+        def get_cell_export_cache(self, path):
+            """Return the cell export cache for the text notebook at this path"""
+            cell_export_cache = self.cell_export_caches.pop(path, None) or CellExportCache()
+            self.cell_export_caches[path] = cell_export_cache
+            while len(self.cell_export_caches) > self.cell_export_caches_size:
+                self.cell_export_caches.popitem(last=False)
+            return cell_export_cache
+
+        def get_conversion_executor(self, config):
+            """The pool of threads or processes in which the notebooks are converted, or None.
+            The previous pool is shut down when the conversion_executor or the
+            conversion_max_workers options change"""
+            if config.conversion_executor == "none":
+                self.close_conversion_executors()
+                return None
+            key = (config.conversion_executor, config.conversion_max_workers)
+            executor = self.conversion_executors.get(key)
+            if executor is None:
+                self.close_conversion_executors()
+                executor = async_conversion_pool(config.conversion_executor, config.conversion_max_workers)
+                if executor is not None:
+                    self.conversion_executors[key] = executor
+            return executor
+
+        def close_conversion_executors(self):
+            """Shut down the pools of threads or processes used for the conversions.
+            The conversions in progress are completed"""
+            while self.conversion_executors:
+                _, executor = self.conversion_executors.popitem()
+                executor.shutdown(wait=False)
+
+        def close(self):
+            """Release the resources of the contents manager"""
+            self.close_conversion_executors()
+
+        def __del__(self):
+            if getattr(self, "conversion_executors", None):
+                self.close_conversion_executors()
+
+        def portable_config(self):
+            """A copy of the Jupytext configuration of the contents manager"""
+            return JupytextConfiguration(
+                **{name: getattr(self, name) for name in JupytextConfiguration.class_trait_names(config=True)}
+            )
+
+        async def run_conversion(self, config, func, /, *args, **kwargs):
+            """Run a conversion function (reads, writes, combine_paired_notebooks) in the pool
+            of threads or processes set by the conversion_executor option, or in the event loop"""
+            executor = self.get_conversion_executor(config)
+            if executor is None:
+                return func(*args, **kwargs)
+            if isinstance(executor, ProcessPoolExecutor):
+                # The contents manager cannot be sent to another process
+                kwargs = {key: self.portable_config() if value is self else value for key, value in kwargs.items()}
+            return await async_run_in_executor(executor, func, *args, **kwargs)
+
         async def save(self, model, path=""):
             """Save the file model and return the model with no content."""
             if model["type"] != "notebook":
@@ -160,11 +228,31 @@ def build_async_jupytext_contents_manager_class(base_contents_manager_class):
                             "(toggle 'Include Metadata' in the Jupytext Menu or Commands if desired)".format(path)
                         )
 
+                    # The cells exported in another process would not be cached
+                    cell_export_cache = (
+                        self.get_cell_export_cache(path)
+                        if config.cell_export_cache and config.conversion_executor != "process"
+                        else None
+                    )
                     text_model = dict(
                         type="file",
                         format="text",
-                        content=writes(nbformat.from_dict(model["content"]), fmt=fmt, config=config),
+                        content=await self.run_conversion(
+                            config,
+                            writes,
+                            nbformat.from_dict(model["content"]),
+                            fmt=fmt,
+                            config=config,
+                            cell_export_cache=cell_export_cache,
+                        ),
                     )
+                    if cell_export_cache is not None:
+                        self.log.info(
+                            "Cell export cache for %s: %d of %d cells reused",
+                            os.path.basename(path),
+                            cell_export_cache.last_hits,
+                            cell_export_cache.last_hits + cell_export_cache.last_misses,
+                        )
 
                     return await self.super.save(text_model, path)
 
@@ -231,7 +319,7 @@ def build_async_jupytext_contents_manager_class(base_contents_manager_class):
                     model["format"] = "json"
                     model["mimetype"] = None
                     try:
-                        model["content"] = reads(model["content"], fmt=fmt, config=config)
+                        model["content"] = await self.run_conversion(config, reads, model["content"], fmt=fmt, config=config)
                     except Exception as err:
                         self.log.error("Error while reading file: %s %s", path, err, exc_info=True)
                         raise HTTPError(500, str(err))
@@ -309,9 +397,11 @@ def build_async_jupytext_contents_manager_class(base_contents_manager_class):
                         format=None,
                     )
                 )["content"]
-                return reads(text, fmt=alt_fmt, config=config)
+                return await self.run_conversion(config, reads, text, fmt=alt_fmt, config=config)
 
-            timestamps = {alt_path: await get_timestamp(alt_path) for alt_path, alt_fmt in paired_paths(path, fmt, formats)}
+            # The timestamps of the paired files are queried concurrently
+            paired_alt_paths = [alt_path for alt_path, _ in paired_paths(path, fmt, formats)]
+            timestamps = dict(zip(paired_alt_paths, await gather(*(get_timestamp(alt_path) for alt_path in paired_alt_paths))))
 
             inputs, outputs = latest_inputs_and_outputs(
                 path,
@@ -359,7 +449,13 @@ def build_async_jupytext_contents_manager_class(base_contents_manager_class):
                     self.log.warning(ts_mismatch)
 
                     try:
-                        content = await read_pair(inputs, outputs, read_one_file, must_match=True)
+                        content = await read_pair(
+                            inputs,
+                            outputs,
+                            read_one_file,
+                            must_match=True,
+                            run_conversion=partial(self.run_conversion, config),
+                        )
                         self.log.warning(
                             "The inputs in {src} and {out} are identical, so the mismatch in timestamps was ignored".format(
                                 src=inputs.path, out=outputs.path
@@ -394,7 +490,9 @@ to your jupytext.toml file
                 model["content"] = content
             else:
                 try:
-                    model["content"] = await read_pair(inputs, outputs, read_one_file)
+                    model["content"] = await read_pair(
+                        inputs, outputs, read_one_file, run_conversion=partial(self.run_conversion, config)
+                    )
                 except HTTPError:
                     raise
                 except Exception as err:
@@ -531,8 +629,10 @@ to your jupytext.toml file
                 return path.rsplit(":", 1)[0] + ":"
             return ""
 
-        async def get_config_file(self, directory):
+        async def get_config_file(self, directory, searched_dirs=None):
             """Return the jupytext configuration file, if any"""
+            if searched_dirs is not None:
+                searched_dirs.append(directory)
             for jupytext_config_file in JUPYTEXT_CONFIG_FILES:
                 path = directory + "/" + jupytext_config_file
                 if await self.file_exists(path):
@@ -556,7 +656,7 @@ to your jupytext.toml file
                 return None
 
             parent_dir = self.get_parent_dir(directory)
-            return await self.get_config_file(parent_dir)
+            return await self.get_config_file(parent_dir, searched_dirs)
 
         async def load_config_file(self, config_file, *, prev_config_file, prev_config, is_os_path=False):
             """Load the configuration file"""
@@ -588,43 +688,92 @@ to your jupytext.toml file
                 getattr(self.log, log_level)("Loaded Jupytext configuration file at %s", config_file)
             return config
 
+        async def last_modified(self, path, type, is_os_path=False):
+            """The modification time of a file or directory, as a timestamp, or None"""
+            if is_os_path:
+                return os.stat(path).st_mtime if os.path.exists(path) else None
+            try:
+                model = await self.super.get(path, content=False, type=type)
+            except HTTPError:
+                return None
+            last_modified = model.get("last_modified")
+            return last_modified.timestamp() if last_modified is not None else None
+
+        async def config_signature(self, searched_dirs, config_file, is_os_path, full=True):
+            """The modification time of the configuration file, and, if full=True,
+            of the directories that were searched for a configuration file and of their
+            pyproject.toml file (a [tool.jupytext] section can be added to an existing file)"""
+            signature = []
+            if config_file is not None:
+                signature.append(await self.last_modified(config_file, "file", is_os_path))
+            if full:
+                for directory in searched_dirs:
+                    signature.append(await self.last_modified(directory, "directory"))
+                    signature.append(await self.last_modified(directory + "/" + PYPROJECT_FILE, "file"))
+            return signature
+
         async def get_config(self, path, use_cache=False):
             """Return the Jupytext configuration for the given path"""
             parent_dir = self.get_parent_dir(path)
 
-            # When listing the notebooks for the tree view, we use a cache for the configuration file
-            # The cache will be refreshed when a notebook is opened or saved, or when we go
-            # to a different directory.
-            if not use_cache or parent_dir != self.cached_config.path:
-                try:
-                    config_file = await self.get_config_file(parent_dir)
-                    if config_file:
-                        self.cached_config.config = await self.load_config_file(
-                            config_file,
-                            prev_config_file=self.cached_config.config_file,
-                            prev_config=self.cached_config.config,
-                        )
-                    else:
-                        config_file = find_global_jupytext_configuration_file()
-                        self.cached_config.config = await self.load_config_file(
-                            config_file,
-                            prev_config_file=self.cached_config.config_file,
-                            prev_config=self.cached_config.config,
-                            is_os_path=True,
-                        )
+            # When listing the notebooks for the tree view, we reuse the last configuration
+            # if the directory is the same
+            if use_cache and parent_dir == self.cached_config.path:
+                return self._config_or_self(self.cached_config.config)
+
+            # The configuration of each directory is cached. When listing the notebooks for the tree
+            # view (use_cache=True), we only check that the configuration file was not modified.
+            # Otherwise, we also check that no configuration file was added to the searched directories.
+            cached = self.config_cache.get(parent_dir)
+            if cached is not None:
+                signature, searched_dirs, config_file, is_os_path, config = cached
+                current_signature = await self.config_signature(searched_dirs, config_file, is_os_path, full=not use_cache)
+                if current_signature == signature[: len(current_signature)]:
+                    self.config_cache.move_to_end(parent_dir)
+                    self.cached_config.config = config
                     self.cached_config.config_file = config_file
                     self.cached_config.path = parent_dir
-                except JupytextConfigurationError as err:
-                    self.log.error(
-                        "Error while reading config file: %s %s",
-                        config_file,
-                        err,
-                        exc_info=True,
-                    )
-                    raise HTTPError(500, f"{err}")
+                    return self._config_or_self(config)
+                del self.config_cache[parent_dir]
+
+            searched_dirs = []
+            try:
+                config_file = await self.get_config_file(parent_dir, searched_dirs)
+                is_os_path = False
+                if not config_file:
+                    config_file = find_global_jupytext_configuration_file()
+                    is_os_path = True
+                config = await self.load_config_file(
+                    config_file,
+                    prev_config_file=self.cached_config.config_file,
+                    prev_config=self.cached_config.config,
+                    is_os_path=is_os_path,
+                )
+                self.cached_config.config = config
+                self.cached_config.config_file = config_file
+                self.cached_config.path = parent_dir
+            except JupytextConfigurationError as err:
+                self.log.error(
+                    "Error while reading config file: %s %s",
+                    config_file,
+                    err,
+                    exc_info=True,
+                )
+                raise HTTPError(500, f"{err}")
+
+            # Files or directories modified recently might be modified again with the same timestamp
+            signature = await self.config_signature(searched_dirs, config_file, is_os_path)
+            recent = time.time() - 2
+            if all(timestamp is None or timestamp < recent for timestamp in signature):
+                self.config_cache[parent_dir] = signature, searched_dirs, config_file, is_os_path, config
+                while len(self.config_cache) > self.config_cache_size:
+                    self.config_cache.popitem(last=False)
 
-            if self.cached_config.config is not None:
-                return self.cached_config.config
+            return self._config_or_self(config)
+
+        def _config_or_self(self, config):
+            if config is not None:
+                return config
             if isinstance(self.notebook_extensions, str):
                 self.notebook_extensions = self.notebook_extensions.split(",")
             return self
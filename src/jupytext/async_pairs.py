@@ -1,32 +1,24 @@
-import jupytext
-
-from .combine import combine_inputs_with_outputs
-from .compare import compare
-from .formats import check_file_version, long_form_multiple_formats
+from .formats import long_form_multiple_formats
 from .paired_paths import find_base_path_and_format, full_path
-from .pairs import PairedFilesDiffer
+from .pairs import combine_paired_notebooks, gather
 
 
-async def read_pair(inputs, outputs, read_one_file, must_match=False):
-    """Read a notebook given its inputs and outputs path and formats"""
+async def read_pair(inputs, outputs, read_one_file, must_match=False, run_conversion=None):
+    """Read a notebook given its inputs and outputs path and formats. The async contents
+    manager can run the combination of the two files in an executor with 'run_conversion'."""
     if not outputs.path or outputs.path == inputs.path:
         return await read_one_file(inputs.path, inputs.fmt)
 
-    notebook = await read_one_file(inputs.path, inputs.fmt)
-    check_file_version(notebook, inputs.path, outputs.path)
-
-    notebook_with_outputs = await read_one_file(outputs.path, outputs.fmt)
-
-    if must_match:
-        in_text = jupytext.writes(notebook, inputs.fmt)
-        out_text = jupytext.writes(notebook_with_outputs, inputs.fmt)
-        diff = compare(out_text, in_text, outputs.path, inputs.path, return_diff=True)
-        if diff:
-            raise PairedFilesDiffer(diff)
+    # The async contents manager reads the two files concurrently
+    notebook, notebook_with_outputs = await gather(
+        read_one_file(inputs.path, inputs.fmt),
+        read_one_file(outputs.path, outputs.fmt),
+    )
 
-    notebook = combine_inputs_with_outputs(notebook, notebook_with_outputs, fmt=inputs.fmt)
-
-    return notebook
+    args = (notebook, notebook_with_outputs, inputs.path, inputs.fmt, outputs.path, must_match)
+    if run_conversion is not None:
+        return await run_conversion(combine_paired_notebooks, *args)
+    return combine_paired_notebooks(*args)
 
 
 async def write_pair(path, formats, write_one_file):
@@ -50,20 +42,21 @@ async def write_pair(path, formats, write_one_file):
         if alt_path == path:
             return_value = value
 
-    # And then to the other formats, in reverse order so that
-    # the first format is the most recent
-    for fmt in formats[::-1]:
-        if fmt["extension"] == ".ipynb":
-            continue
-
-        alt_path = full_path(base, fmt)
-        if ipynb_changed:
-            value = await write_one_file(alt_path, fmt, force_update_timestamp=True)
-        else:
-            # in the contents manager the write_one_file always writes anyway
-            value = await write_one_file(alt_path, fmt)
-        if alt_path == path:
-            return_value = value
+    # And then to the other formats, in reverse order so that the first format
+    # is the most recent. The async contents manager writes the other text
+    # formats concurrently, and then the first text format
+    text_paths_and_formats = [(full_path(base, fmt), fmt) for fmt in formats[::-1] if fmt["extension"] != ".ipynb"]
+    if text_paths_and_formats:
+        # NB: in the contents manager the write_one_file always writes anyway
+        kwargs = {"force_update_timestamp": True} if ipynb_changed else {}
+        *other_paths_and_formats, (first_path, first_fmt) = text_paths_and_formats
+        values = []
+        if other_paths_and_formats:
+            values = await gather(*(write_one_file(alt_path, fmt, **kwargs) for alt_path, fmt in other_paths_and_formats))
+        values.append(await write_one_file(first_path, first_fmt, **kwargs))
+        for (alt_path, _), value in zip(text_paths_and_formats, values):
+            if alt_path == path:
+                return_value = value
 
     # Update modified timestamp to match that of the pair #207
     if isinstance(return_value, dict) and "last_modified" in return_value:
@@ -62,22 +62,24 @@ def uncomment(lines, prefix="#", suffix=""):
     return lines
 
 
-def paragraph_is_fully_commented(lines, comment, main_language):
-    """Is the paragraph fully commented?"""
-    for i, line in enumerate(lines):
+def paragraph_is_fully_commented(lines, comment, main_language, start=0):
+    """Is the paragraph that starts at lines[start] fully commented?"""
+    for i in range(start, len(lines)):
+        line = lines[i]
         if line.startswith(comment):
             if line[len(comment) :].lstrip().startswith(comment):
                 continue
             if is_magic(line, main_language):
                 return False
             continue
-        return i > 0 and _BLANK_LINE.match(line)
+        return i > start and _BLANK_LINE.match(line)
     return True
 
 
-def next_code_is_indented(lines):
-    """Is the next unescaped line indented?"""
-    for line in lines:
+def next_code_is_indented(lines, start=0):
+    """Is the next unescaped line (from lines[start] on) indented?"""
+    for i in range(start, len(lines)):
+        line = lines[i]
         if _BLANK_LINE.match(line):
             continue
         return _PY_INDENTED.match(line)
@@ -139,19 +141,20 @@ class BaseCellReader:
         self.cell_metadata_json = fmt.get("cell_metadata_json", False)
         self.doxygen_equation_markers = fmt.get("doxygen_equation_markers", False)
 
-    def read(self, lines):
-        """Read one cell from the given lines, and return the cell,
-        plus the position of the next cell
+    def read(self, lines, start=0):
+        """Read one cell from the given lines, starting at lines[start], and return the cell,
+        plus the position of the next cell. The lines are not copied, so reading a
+        document cell after cell takes a time that is linear in the document length.
         """
 
         # Do we have an explicit code marker on the first line?
-        self.metadata_and_language_from_option_line(lines[0])
+        self.metadata_and_language_from_option_line(lines[start])
 
         if self.metadata and "language" in self.metadata:
             self.language = self.metadata.pop("language")
 
         # Parse cell till its end and set content, lines_to_next_cell
-        pos_next_cell = self.find_cell_content(lines)
+        pos_next_cell = self.find_cell_content(lines, start)
 
         if self.cell_type == "code":
             new_cell = new_code_cell
@@ -164,7 +167,7 @@ class BaseCellReader:
             self.metadata = {}
 
         if self.ext == ".py":
-            expected_blank_lines = pep8_lines_between_cells(self.org_content or [""], lines[pos_next_cell:], self.ext)
+            expected_blank_lines = pep8_lines_between_cells(self.org_content or [""], lines, self.ext, pos_next_cell)
         else:
             expected_blank_lines = 1
 
@@ -189,22 +192,22 @@ class BaseCellReader:
         """Return language (str) and metadata (dict) from the option line"""
         raise NotImplementedError("Option parsing must be implemented in a sub class")
 
-    def find_cell_end(self, lines):
+    def find_cell_end(self, lines, start=0):
         """Return position of end of cell marker, and position
-        of first line after cell"""
+        of first line after cell, for the cell that starts at lines[start]"""
         raise NotImplementedError("This method must be implemented in a sub class")
 
-    def find_cell_content(self, lines):
+    def find_cell_content(self, lines, start=0):
         """Parse cell till its end and set content, lines_to_next_cell.
         Return the position of next cell start"""
-        cell_end_marker, next_cell_start, self.explicit_eoc = self.find_cell_end(lines)
+        cell_end_marker, next_cell_start, self.explicit_eoc = self.find_cell_end(lines, start)
 
         # Metadata to dict
         if self.metadata is None:
-            cell_start = 0
+            cell_start = start
             self.metadata = {}
         else:
-            cell_start = 1
+            cell_start = start + 1
 
         # Cell content
         source = lines[cell_start:cell_end_marker]
@@ -218,12 +221,12 @@ class BaseCellReader:
             else:
                 lines_to_end_of_cell_marker = 0
 
-            pep8_lines = pep8_lines_between_cells(source, lines[cell_end_marker:], self.ext)
+            pep8_lines = pep8_lines_between_cells(source, lines, self.ext, cell_end_marker)
             if lines_to_end_of_cell_marker != (0 if pep8_lines == 1 else 2):
                 self.metadata["lines_to_end_of_cell_marker"] = lines_to_end_of_cell_marker
 
         # Uncomment content
-        self.explicit_soc = cell_start > 0
+        self.explicit_soc = cell_start > start
         self.content = self.extract_content(source)
 
         # Is this an inactive cell?
@@ -238,7 +241,7 @@ class BaseCellReader:
                     self.cell_type = "markdown"
                     self.explicit_eoc = False
                     cell_end_marker += 1
-                    self.content = lines[:cell_end_marker]
+                    self.content = lines[start:cell_end_marker]
                 # Previous versions mapped those to raw cells
                 else:
                     self.cell_type = "raw"
@@ -372,12 +375,12 @@ class MarkdownCellReader(BaseCellReader):
         self.cell_metadata_json = self.cell_metadata_json or is_json_metadata(options)
         return text_to_metadata(options)
 
-    def find_cell_end(self, lines):
+    def find_cell_end(self, lines, start=0):
         """Return position of end of cell marker, and position
         of first line after cell"""
         if self.in_region:
-            for i, line in enumerate(lines):
-                if self.end_region_re.match(line):
+            for i in range(start, len(lines)):
+                if self.end_region_re.match(lines[i]):
                     return i, i + 1, True
         elif self.metadata is None:
             # default markdown: (last) two consecutive blank lines, except when in code blocks
@@ -386,7 +389,8 @@ class MarkdownCellReader(BaseCellReader):
             in_explicit_code_block = False
             in_indented_code_block = False
 
-            for i, line in enumerate(lines):
+            for i in range(start, len(lines)):
+                line = lines[i]
                 if in_explicit_code_block and self.end_code_re.match(line):
                     in_explicit_code_block = False
                     continue
@@ -403,7 +407,7 @@ class MarkdownCellReader(BaseCellReader):
                     continue
 
                 if self.start_region_re.match(line):
-                    if i > 1 and prev_blank:
+                    if i > start + 1 and prev_blank:
                         return i - 1, i, False
                     return i, i, False
 
@@ -418,7 +422,7 @@ class MarkdownCellReader(BaseCellReader):
                         prev_blank = 0
                         continue
 
-                    if i > 1 and prev_blank:
+                    if i > start + 1 and prev_blank:
                         return i - 1, i, False
                     return i, i, False
                 elif line.startswith("```{"):
@@ -449,10 +453,8 @@ class MarkdownCellReader(BaseCellReader):
             # into multiple cells (#419). Indeed, now that the markdown cell uses one extra backtick (#712)
             # we should not have the issue any more
             parser = StringParser(self.language or self.default_language)
-            for i, line in enumerate(lines):
-                # skip cell header
-                if i == 0:
-                    continue
+            for i in range(start + 1, len(lines)):
+                line = lines[i]
 
                 if parser.is_quoted():
                     parser.read_line(line)
@@ -537,12 +539,13 @@ class RScriptCellReader(ScriptCellReader):
     def options_to_metadata(self, options):
         return rmd_options_to_metadata("r " + options, self.use_runtools)
 
-    def find_cell_end(self, lines):
+    def find_cell_end(self, lines, start=0):
         """Return position of end of cell marker, and position
         of first line after cell"""
-        if self.metadata is None and lines[0].startswith("#'"):
+        if self.metadata is None and lines[start].startswith("#'"):
             self.cell_type = "markdown"
-            for i, line in enumerate(lines):
+            for i in range(start, len(lines)):
+                line = lines[i]
                 if not line.startswith("#'"):
                     if _BLANK_LINE.match(line):
                         return i, i + 1, False
@@ -556,9 +559,10 @@ class RScriptCellReader(ScriptCellReader):
             self.cell_type = "code"
 
         parser = StringParser(self.language or self.default_language)
-        for i, line in enumerate(lines):
+        for i in range(start, len(lines)):
+            line = lines[i]
             # skip cell header
-            if self.metadata is not None and i == 0:
+            if self.metadata is not None and i == start:
                 continue
 
             if parser.is_quoted():
@@ -568,19 +572,19 @@ class RScriptCellReader(ScriptCellReader):
             parser.read_line(line)
 
             if self.start_code_re.match(line) or (self.markdown_prefix and line.startswith(self.markdown_prefix)):
-                if i > 0 and _BLANK_LINE.match(lines[i - 1]):
-                    if i > 1 and _BLANK_LINE.match(lines[i - 2]):
+                if i > start and _BLANK_LINE.match(lines[i - 1]):
+                    if i > start + 1 and _BLANK_LINE.match(lines[i - 2]):
                         return i - 2, i, False
                     return i - 1, i, False
                 return i, i, False
 
             if _BLANK_LINE.match(line):
-                if not next_code_is_indented(lines[i:]):
-                    if i > 0:
+                if not next_code_is_indented(lines, i):
+                    if i > start:
                         return i, i + 1, False
-                    if len(lines) > 1 and not _BLANK_LINE.match(lines[1]):
-                        return 1, 1, False
-                    return 1, 2, False
+                    if len(lines) > start + 1 and not _BLANK_LINE.match(lines[start + 1]):
+                        return start + 1, start + 1, False
+                    return start + 1, start + 2, False
 
         return len(lines), len(lines), False
 
@@ -664,16 +668,16 @@ class LightScriptCellReader(ScriptCellReader):
 
         return None, metadata
 
-    def find_cell_end(self, lines):
+    def find_cell_end(self, lines, start=0):
         """Return position of end of cell marker, and position of first line after cell"""
         if (
             self.metadata is None
-            and not (self.cell_marker_end and self.end_code_re.match(lines[0]))
-            and paragraph_is_fully_commented(lines, self.comment, self.default_language)
+            and not (self.cell_marker_end and self.end_code_re.match(lines[start]))
+            and paragraph_is_fully_commented(lines, self.comment, self.default_language, start)
         ):
             self.cell_type = "markdown"
-            for i, line in enumerate(lines):
-                if _BLANK_LINE.match(line):
+            for i in range(start, len(lines)):
+                if _BLANK_LINE.match(lines[i]):
                     return i, i + 1, False
             return len(lines), len(lines), False
 
@@ -683,9 +687,9 @@ class LightScriptCellReader(ScriptCellReader):
             end_of_cell = self.metadata.get("endofcell", "-")
             self.end_code_re = re.compile("^" + re.escape(self.comment) + " " + end_of_cell + r"\s*$")
 
-        return self.find_region_end(lines)
+        return self.find_region_end(lines, start)
 
-    def find_region_end(self, lines):
+    def find_region_end(self, lines, start=0):
         """Find the end of the region started with start and end markers"""
         if self.metadata and "cell_type" in self.metadata:
             self.cell_type = self.metadata.pop("cell_type")
@@ -693,9 +697,10 @@ class LightScriptCellReader(ScriptCellReader):
             self.cell_type = "code"
 
         parser = StringParser(self.language or self.default_language)
-        for i, line in enumerate(lines):
+        for i in range(start, len(lines)):
+            line = lines[i]
             # skip cell header
-            if self.metadata is not None and i == 0:
+            if self.metadata is not None and i == start:
                 continue
 
             if parser.is_quoted():
@@ -708,7 +713,7 @@ class LightScriptCellReader(ScriptCellReader):
             if self.start_code_re.match(line) or (
                 self.simple_start_code_re
                 and self.simple_start_code_re.match(line)
-                and (self.cell_marker_start or i == 0 or _BLANK_LINE.match(lines[i - 1]))
+                and (self.cell_marker_start or i == start or _BLANK_LINE.match(lines[i - 1]))
             ):
                 if self.explicit_end_marker_required:
                     # Metadata here was conditioned on finding an explicit end marker
@@ -716,8 +721,8 @@ class LightScriptCellReader(ScriptCellReader):
                     self.metadata = None
                     self.language = None
 
-                if i > 0 and _BLANK_LINE.match(lines[i - 1]):
-                    if i > 1 and _BLANK_LINE.match(lines[i - 2]):
+                if i > start and _BLANK_LINE.match(lines[i - 1]):
+                    if i > start + 1 and _BLANK_LINE.match(lines[i - 2]):
                         return i - 2, i, False
                     return i - 1, i, False
                 return i, i, False
@@ -726,12 +731,12 @@ class LightScriptCellReader(ScriptCellReader):
                 if self.end_code_re.match(line):
                     return i, i + 1, True
             elif _BLANK_LINE.match(line):
-                if not next_code_is_indented(lines[i:]):
-                    if i > 0:
+                if not next_code_is_indented(lines, i):
+                    if i > start:
                         return i, i + 1, False
-                    if len(lines) > 1 and not _BLANK_LINE.match(lines[1]):
-                        return 1, 1, False
-                    return 1, 2, False
+                    if len(lines) > start + 1 and not _BLANK_LINE.match(lines[start + 1]):
+                        return start + 1, start + 1, False
+                    return start + 1, start + 2, False
 
         return len(lines), len(lines), False
 
@@ -760,16 +765,16 @@ class DoublePercentScriptCellReader(LightScriptCellReader):
         else:
             self.metadata = {}
 
-    def find_cell_content(self, lines):
+    def find_cell_content(self, lines, start=0):
         """Parse cell till its end and set content, lines_to_next_cell.
         Return the position of next cell start"""
-        cell_end_marker, next_cell_start, explicit_eoc = self.find_cell_end(lines)
+        cell_end_marker, next_cell_start, explicit_eoc = self.find_cell_end(lines, start)
 
         # Metadata to dict
-        if self.start_code_re.match(lines[0]) or self.alternative_start_code_re.match(lines[0]):
-            cell_start = 1
+        if self.start_code_re.match(lines[start]) or self.alternative_start_code_re.match(lines[start]):
+            cell_start = start + 1
         else:
-            cell_start = 0
+            cell_start = start
 
         # Cell content
         source = lines[cell_start:cell_end_marker]
@@ -780,7 +785,7 @@ class DoublePercentScriptCellReader(LightScriptCellReader):
 
         return next_cell_start
 
-    def find_cell_end(self, lines):
+    def find_cell_end(self, lines, start=0):
         """Return position of end of cell marker, and position
         of first line after cell"""
 
@@ -797,19 +802,20 @@ class DoublePercentScriptCellReader(LightScriptCellReader):
 
         next_cell = len(lines)
         parser = StringParser(self.language or self.default_language)
-        for i, line in enumerate(lines):
+        for i in range(start, len(lines)):
+            line = lines[i]
             if parser.is_quoted():
                 parser.read_line(line)
                 continue
 
             parser.read_line(line)
-            if i > 0 and (self.start_code_re.match(line) or self.alternative_start_code_re.match(line)):
+            if i > start and (self.start_code_re.match(line) or self.alternative_start_code_re.match(line)):
                 next_cell = i
                 break
 
-        if last_two_lines_blank(lines[:next_cell]):
+        if last_two_lines_blank(lines[start:next_cell]):
             return next_cell - 2, next_cell, False
-        if next_cell > 0 and _BLANK_LINE.match(lines[next_cell - 1]):
+        if next_cell > start and _BLANK_LINE.match(lines[next_cell - 1]):
             return next_cell - 1, next_cell, False
         return next_cell, next_cell, False
 
@@ -860,7 +866,7 @@ class SphinxGalleryScriptCellReader(ScriptCellReader):  # pylint: disable=W0223
         else:
             self.cell_type = "code"
 
-    def find_cell_end(self, lines):
+    def find_cell_end(self, lines, start=0):
         """Return position of end of cell, and position
         of first line after cell, and whether there was an
         explicit end of cell marker"""
@@ -868,14 +874,15 @@ class SphinxGalleryScriptCellReader(ScriptCellReader):  # pylint: disable=W0223
         if self.cell_type == "markdown":
             # Empty cell "" or ''
             if len(self.markdown_marker) <= 2:
-                if len(lines) == 1 or _BLANK_LINE.match(lines[1]):
-                    return 0, 2, True
-                return 0, 1, True
+                if len(lines) == start + 1 or _BLANK_LINE.match(lines[start + 1]):
+                    return start, start + 2, True
+                return start, start + 1, True
 
             # Multi-line comment with triple quote
             if len(self.markdown_marker) == 3:
-                for i, line in enumerate(lines):
-                    if (i > 0 or line.strip() != self.markdown_marker) and line.rstrip().endswith(self.markdown_marker):
+                for i in range(start, len(lines)):
+                    line = lines[i]
+                    if (i > start or line.strip() != self.markdown_marker) and line.rstrip().endswith(self.markdown_marker):
                         explicit_end_of_cell_marker = line.strip() == self.markdown_marker
                         if explicit_end_of_cell_marker:
                             end_of_cell = i
@@ -886,7 +893,8 @@ class SphinxGalleryScriptCellReader(ScriptCellReader):  # pylint: disable=W0223
                         return end_of_cell, i + 1, explicit_end_of_cell_marker
             else:
                 # 20 # or more
-                for i, line in enumerate(lines[1:], 1):
+                for i in range(start + 1, len(lines)):
+                    line = lines[i]
                     if not line.startswith(self.comment):
                         if _BLANK_LINE.match(line):
                             return i, i + 1, False
@@ -894,23 +902,29 @@ class SphinxGalleryScriptCellReader(ScriptCellReader):  # pylint: disable=W0223
 
         elif self.cell_type == "code":
             parser = StringParser("python")
-            for i, line in enumerate(lines):
+            for i in range(start, len(lines)):
+                line = lines[i]
                 if parser.is_quoted():
                     parser.read_line(line)
                     continue
 
                 if self.start_of_new_markdown_cell(line):
-                    if i > 0 and _BLANK_LINE.match(lines[i - 1]):
+                    if i > start and _BLANK_LINE.match(lines[i - 1]):
                         return i - 1, i, False
                     return i, i, False
                 parser.read_line(line)
 
         return len(lines), len(lines), False
 
-    def find_cell_content(self, lines):
+    def find_cell_content(self, lines, start=0):
         """Parse cell till its end and set content, lines_to_next_cell.
         Return the position of next cell start"""
-        cell_end_marker, next_cell_start, explicit_eoc = self.find_cell_end(lines)
+        cell_end_marker, next_cell_start, explicit_eoc = self.find_cell_end(lines, start)
+        total = len(lines)
+
+        # We work on a copy of the cell lines, as we may remove the triple quotes
+        lines = lines[start:cell_end_marker]
+        cell_end_marker -= start
 
         # Metadata to dict
         cell_start = 0
@@ -950,6 +964,6 @@ class SphinxGalleryScriptCellReader(ScriptCellReader):  # pylint: disable=W0223
 
         self.content = source
 
-        self.lines_to_next_cell = count_lines_to_next_cell(cell_end_marker, next_cell_start, len(lines), explicit_eoc)
+        self.lines_to_next_cell = count_lines_to_next_cell(start + cell_end_marker, next_cell_start, total, explicit_eoc)
 
         return next_cell_start
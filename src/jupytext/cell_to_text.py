@@ -15,7 +15,7 @@ from .cell_reader import LightScriptCellReader, MarkdownCellReader, RMarkdownCel
 from .doxygen import markdown_to_doxygen
 from .languages import _SCRIPT_EXTENSIONS, cell_language, comment_lines, same_language
 from .magics import comment_magic, escape_code_start, need_explicit_marker
-from .metadata_filter import filter_metadata
+from .metadata_filter import compile_metadata_filter
 from .pep8 import pep8_lines_between_cells
 
 
@@ -57,11 +57,8 @@ class BaseCellExporter:
         self.cell_type = cell.cell_type
         self.source = cell_source(cell)
         self.unfiltered_metadata = cell.metadata
-        self.metadata = filter_metadata(
-            cell.metadata,
-            self.fmt.get("cell_metadata_filter"),
-            _IGNORE_CELL_METADATA,
-            unsupported_keys=unsupported_keys,
+        self.metadata = compile_metadata_filter(self.fmt.get("cell_metadata_filter"), _IGNORE_CELL_METADATA).apply(
+            cell.metadata, unsupported_keys=unsupported_keys
         )
         if self.parse_cell_language:
             custom_cell_magics = self.fmt.get("custom_cell_magics", "").split(",")
@@ -9,46 +9,16 @@ import shlex
 import subprocess
 import sys
 import warnings
+from contextlib import redirect_stderr, redirect_stdout
 from copy import copy
+from io import StringIO
 from tempfile import NamedTemporaryFile
 from typing import Optional
 
-from nbformat.sign import NotebookNotary
-
-from .combine import combine_inputs_with_outputs
-from .compare import NotebookDifference, compare, test_round_trip_conversion
-from .config import load_jupytext_config, notebook_formats
-from .formats import (
-    _BINARY_FORMAT_OPTIONS,
-    _VALID_FORMAT_OPTIONS,
-    JUPYTEXT_FORMATS,
-    NOTEBOOK_EXTENSIONS,
-    check_auto_ext,
-    check_file_version,
-    long_form_multiple_formats,
-    long_form_one_format,
-    short_form_one_format,
-)
-from .header import recursive_update
-from .jupytext import (
-    create_prefix_dir,
-    get_formats_from_notebook_path,
-    read,
-    reads,
-    write,
-    writes,
-)
-from .kernels import find_kernel_specs, get_kernel_spec, kernelspec_from_language
-from .languages import _SCRIPT_EXTENSIONS
-from .paired_paths import (
-    InconsistentPath,
-    base_path,
-    find_base_path_and_format,
-    full_path,
-    paired_paths,
-)
-from .pairs import latest_inputs_and_outputs
-from .sync_pairs import read_pair, write_pair
+# The modules that import nbformat, and the optional dependencies, are imported in the
+# functions that use them, so that 'jupytext --version' or the commands that are
+# forwarded to the daemon do not pay for these imports
+from .sync_state import SYNC_STATE_FILE
 from .version import __version__
 
 
@@ -83,10 +53,66 @@ def str2bool(value):
     raise argparse.ArgumentTypeError("Expected: (Y)es/(T)rue/(N)o/(F)alse/(D)efault")
 
 
+def jobs_count(value):
+    """Parse the --jobs argument: a positive integer, or 'auto' for the number of CPUs"""
+    if value.lower() == "auto":
+        return os.cpu_count() or 1
+    try:
+        jobs = int(value)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError("Expected a positive integer or 'auto'") from err
+    if jobs < 1:
+        raise argparse.ArgumentTypeError("Expected a positive integer or 'auto'")
+    return jobs
+
+
+def _output_format_help():
+    """The help for the --to argument"""
+    from .formats import JUPYTEXT_FORMATS, NOTEBOOK_EXTENSIONS
+
+    selected_file_extensions = ["md", "Rmd", "jl", "py", "R"]
+    return (
+        "The destination format: 'ipynb', 'markdown' or 'script', or a file extension: "
+        "'{}', ... or 'auto' (script extension matching the notebook language), "
+        "or a combination of an extension and a format name, e.g. {} ".format(
+            "', '".join(selected_file_extensions),
+            ", ".join({f"md:{fmt.format_name}" for fmt in JUPYTEXT_FORMATS if fmt.extension == ".md"}),
+        )
+        + " or {}. ".format(", ".join({f"py:{fmt.format_name}" for fmt in JUPYTEXT_FORMATS if fmt.extension == ".py"}))
+        + "The default format for scripts is the 'percent' format, "
+        "which uses '# %%%%' as cell markers and is compatible with VS Code and PyCharm. "
+        "Alternatively, you can also use the 'light' format, which uses fewer cell markers. "
+        "The main formats (MyST Markdown, Markdown, percent, light) preserve "
+        "notebooks and text documents in a roundtrip. Use the "
+        "--test and and --test-strict commands to test the roundtrip on your files. "
+        "Read more about the available formats at "
+        "https://jupytext.org/formats/scripts/ "
+        "NB: in addition to the extensions listed above, you can also use these: '{}'".format(
+            "', '".join(
+                sorted(
+                    {ext.removeprefix(".") for ext in NOTEBOOK_EXTENSIONS} - set(selected_file_extensions + ["auto", "ipynb"])
+                )
+            )
+        )
+    )
+
+
+class _JupytextArgumentParser(argparse.ArgumentParser):
+    """An argument parser that completes the help for --to when the help is shown,
+    as the list of formats requires importing the formats module"""
+
+    output_format_action = None
+
+    def format_help(self):
+        if self.output_format_action is not None:
+            self.output_format_action.help = _output_format_help()
+        return super().format_help()
+
+
 def parse_jupytext_args(args=None):
     """Command line parser for jupytext"""
 
-    parser = argparse.ArgumentParser(
+    parser = _JupytextArgumentParser(
         description="Jupyter Notebooks as Markdown Documents, Julia, Python or R Scripts",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
@@ -104,35 +130,11 @@ def parse_jupytext_args(args=None):
     )
     # Destination format & act on metadata
 
-    selected_file_extensions = ["md", "Rmd", "jl", "py", "R"]
-    parser.add_argument(
+    # The list of formats is added to the help when the help is shown
+    parser.output_format_action = parser.add_argument(
         "--to",
         dest="output_format",
-        help=(
-            "The destination format: 'ipynb', 'markdown' or 'script', or a file extension: "
-            "'{}', ... or 'auto' (script extension matching the notebook language), "
-            "or a combination of an extension and a format name, e.g. {} ".format(
-                "', '".join(selected_file_extensions),
-                ", ".join({f"md:{fmt.format_name}" for fmt in JUPYTEXT_FORMATS if fmt.extension == ".md"}),
-            )
-            + " or {}. ".format(", ".join({f"py:{fmt.format_name}" for fmt in JUPYTEXT_FORMATS if fmt.extension == ".py"}))
-            + "The default format for scripts is the 'percent' format, "
-            "which uses '# %%%%' as cell markers and is compatible with VS Code and PyCharm. "
-            "Alternatively, you can also use the 'light' format, which uses fewer cell markers. "
-            "The main formats (MyST Markdown, Markdown, percent, light) preserve "
-            "notebooks and text documents in a roundtrip. Use the "
-            "--test and and --test-strict commands to test the roundtrip on your files. "
-            "Read more about the available formats at "
-            "https://jupytext.org/formats/scripts/ "
-            "NB: in addition to the extensions listed above, you can also use these: '{}'".format(
-                "', '".join(
-                    sorted(
-                        {ext.removeprefix(".") for ext in NOTEBOOK_EXTENSIONS}
-                        - set(selected_file_extensions + ["auto", "ipynb"])
-                    )
-                )
-            )
-        ),
+        help="The destination format",
     )
 
     # Destination file
@@ -169,6 +171,13 @@ def parse_jupytext_args(args=None):
         "if present.",
         action="store_true",
     )
+    parser.add_argument(
+        "--sync-state",
+        action="store_true",
+        help=f"Record the modification time, size and content hash of the paired files in {SYNC_STATE_FILE} "
+        "(in the current directory) after a successful --sync, and skip the notebooks whose paired files, "
+        "Jupytext version and configuration file have not changed since then.",
+    )
     action.add_argument(
         "--paired-paths",
         "-p",
@@ -211,6 +220,15 @@ def parse_jupytext_args(args=None):
         action="store_true",
         help="Only issue a warning and continue processing other notebooks when the conversion of a given notebook fails",
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=jobs_count,
+        default=1,
+        help="Process the notebooks in parallel using this number of worker processes "
+        "('auto' for one per CPU). Paired files of the same notebook are always processed "
+        "by the same worker, and the log of each notebook is printed in one block.",
+    )
     action.add_argument(
         "--test",
         action="store_true",
@@ -274,6 +292,23 @@ def parse_jupytext_args(args=None):
         help="The format in which the notebook should be piped to other programs, "
         "when using the --pipe and/or --check commands.",
     )
+    parser.add_argument(
+        "--pipe-batch",
+        action="store_true",
+        help="Run each --pipe and --check command once for all the notebooks (or for "
+        f"{PIPE_BATCH_SIZE} notebooks at a time) rather than once per notebook. The text "
+        "representations of the notebooks are written to temporary files next to the notebooks, "
+        "and passed to the commands in place of {}. With this option, 'black', 'flake8' and "
+        "'autopep8' are run on files. The other commands that read the notebook from stdin "
+        "are still run once per notebook.",
+    )
+    parser.add_argument(
+        "--pipe-in-subprocess",
+        action="store_true",
+        help="Run the --pipe commands in a subprocess. By default, 'black -', 'isort -' and 'autopep8 -' "
+        "(and the commands registered in the 'jupytext.pipe_adapters' entry point group) are run "
+        "in the Jupytext process when the corresponding package can be imported.",
+    )
 
     # Execute the notebook
     parser.add_argument(
@@ -299,6 +334,44 @@ def parse_jupytext_args(args=None):
         type=str,
         help="Execute the notebook at the given path (defaults to the notebook parent directory)",
     )
+    parser.add_argument(
+        "--execute-timeout",
+        type=float,
+        help="Interrupt the execution of a notebook after this number of seconds. "
+        "With --jobs N, N notebooks are executed at the same time. The kernels are "
+        "restarted rather than started again between the notebooks that use the same kernel "
+        "and run path, and a summary of the execution is shown when more than one notebook is executed.",
+    )
+    parser.add_argument(
+        "--execute-incremental",
+        action="store_true",
+        help="Execute only the code cells that changed since the notebook with outputs was saved, "
+        "the cells that depend on them and the cells that they require. The outputs of the "
+        "other cells are taken from the .ipynb file. All the cells are executed when the "
+        "dependencies between the cells cannot be determined, e.g. in the presence of magic "
+        "commands or star imports, and for non-Python notebooks.",
+    )
+    parser.add_argument(
+        "--execute-cache-dir",
+        type=str,
+        help="Store the outputs of the executed notebooks in this directory. The notebooks "
+        "whose code cells, kernel, run path and data dependencies have not changed since "
+        "a previous execution are not executed again, instead their outputs are restored from the cache.",
+    )
+    parser.add_argument(
+        "--execute-cache-size",
+        type=float,
+        default=512,
+        help="The maximum size of the execution cache, in megabytes (defaults to %(default)s). "
+        "The entries that were used least recently are removed first.",
+    )
+    parser.add_argument(
+        "--execute-cache-dep",
+        action="append",
+        help="A data file, or a glob pattern relative to the run path, on which the execution "
+        "of the notebooks depends. The notebooks are executed again when these files change. "
+        "Use this option as many times as required.",
+    )
 
     parser.add_argument(
         "--quiet",
@@ -338,21 +411,56 @@ def parse_jupytext_args(args=None):
         "you are trying to convert from are ignored.",
     )
 
+    parser.add_argument(
+        "--daemon",
+        nargs="?",
+        const="",
+        metavar="SOCKET",
+        help="Run Jupytext as a daemon that executes the jupytext commands sent on a Unix socket "
+        "(defaults to the JUPYTEXT_DAEMON_SOCKET environment variable, or to a file in XDG_RUNTIME_DIR "
+        "or in the temporary directory), "
+        "or on stdin/stdout with '--daemon -'. The jupytext command forwards its arguments to the daemon "
+        "when one is listening on the socket.",
+    )
+
     return parser.parse_args(args)
 
 
 def jupytext(args=None, *, notary=None):
     """Entry point for the jupytext script"""
+    from_command_line = args is None and notary is None
     args = parse_jupytext_args(args)
-
-    def log(text):
-        if not args.quiet:
-            sys.stdout.write(text + "\n")
+    log = _log_function(args)
 
     if args.version:
         log(__version__)
         return 0
 
+    if args.daemon is not None:
+        if args.notebooks:
+            raise ValueError("'jupytext --daemon' does not take notebook arguments")
+        from .daemon import serve_socket, serve_stdio
+
+        if args.daemon == "-":
+            return serve_stdio()
+        return serve_socket(args.daemon or None, log=log)
+
+    if from_command_line and can_forward_to_daemon(args):
+        from .daemon import forward_to_daemon
+
+        exit_code = forward_to_daemon(sys.argv[1:])
+        if exit_code is not None:
+            return exit_code
+
+    from nbformat.sign import NotebookNotary
+
+    from .compare import compare
+    from .execute import execution_summary
+    from .formats import long_form_one_format, short_form_one_format
+    from .header import recursive_update
+    from .jupytext import read, writes
+    from .sync_state import SyncState
+
     if args.pre_commit:
         warnings.warn(
             "The --pre-commit argument is deprecated. "
@@ -487,37 +595,416 @@ def jupytext(args=None, *, notary=None):
         else:
             notebooks.append(pattern)
 
-    # Count how many files have round-trip issues when testing
-    exit_code = 0
-
+    # The worker processes cannot use a notary passed by the caller
+    custom_notary = notary is not None
     notary_to_close = None
     if notary is None:
         notary = notary_to_close = NotebookNotary()
 
+    sync_state = None
+    if sync_state_applies(args):
+        sync_state = SyncState(SYNC_STATE_FILE)
+
+    execution_reports = []
+    try:
+        if args.jobs > 1 and len(notebooks) > 1 and not custom_notary and not args.pre_commit:
+            return jupytext_parallel(notebooks, args, sync_state, execution_reports)
+
+        return jupytext_files(notebooks, args, log, notary, sync_state, execution_reports)
+    finally:
+        if sync_state is not None:
+            sync_state.save()
+        if notary_to_close:
+            notary_to_close.store.close()
+        if len(execution_reports) > 1:
+            for line in execution_summary(execution_reports):
+                log(line)
+
+
+def can_forward_to_daemon(args):
+    """Can this command be run by the Jupytext daemon? The commands
+    that read a notebook from stdin are always run locally"""
+    return bool(args.pre_commit or (args.notebooks and "-" not in args.notebooks))
+
+
+def sync_state_applies(args):
+    """Can the state file be used to skip the unchanged pairs? This is the case
+    for a plain --sync, i.e. when no other option modifies the notebooks"""
+    return bool(
+        args.sync_state
+        and args.sync
+        and not args.output
+        and not args.output_format
+        and not args.set_formats
+        and not args.update_metadata
+        and not args.format_options
+        and not args.pipe
+        and not args.check
+        and not args.set_kernel
+        and not args.execute
+        and not args.test
+        and not args.test_strict
+        and not args.use_source_timestamp
+        and not args.check_source_is_newer
+        and not args.pre_commit
+        and not args.pre_commit_mode
+    )
+
+
+def execution_cache(args):
+    """The execution cache for the --execute-cache-dir option, if any"""
+    if not args.execute_cache_dir:
+        return None
+    from .execute import ExecutionCache
+
+    return ExecutionCache(
+        args.execute_cache_dir,
+        max_size=args.execute_cache_size * 2**20,
+        dependencies=args.execute_cache_dep or (),
+    )
+
+
+def jupytext_files(notebooks, args, log, notary, sync_state=None, execution_reports=None):
+    """Apply the jupytext command to each file in turn, and return the sum of the exit codes.
+    The reports on the execution of the notebooks are appended to execution_reports."""
+    from .execute import KernelPool
+    from .signatures import BatchedNotary
+
+    # In the pre-commit mode, the git repository is queried once for all the notebooks
+    git_state = GitState() if args.pre_commit_mode else None
+    # The signatures of the notebooks are stored at the end of the run, in a single transaction
+    notary = BatchedNotary(notary)
+    # The kernels are restarted rather than started again between the notebooks
+    kernel_pool = KernelPool(notebooks_left=len(notebooks), cache=execution_cache(args)) if args.execute else None
+    exit_code = 0
     try:
+        if args.pipe_batch and (args.pipe or args.check):
+            return jupytext_files_with_batched_pipes(notebooks, args, log, notary, sync_state, git_state, kernel_pool)
+
         for nb_file in notebooks:
             if not args.warn_only:
-                exit_code += jupytext_single_file(nb_file, args, log, notary=notary)
+                exit_code += jupytext_single_file(
+                    nb_file, args, log, notary=notary, sync_state=sync_state, git_state=git_state, kernel_pool=kernel_pool
+                )
             else:
                 try:
-                    exit_code += jupytext_single_file(nb_file, args, log, notary=notary)
+                    exit_code += jupytext_single_file(
+                        nb_file,
+                        args,
+                        log,
+                        notary=notary,
+                        sync_state=sync_state,
+                        git_state=git_state,
+                        kernel_pool=kernel_pool,
+                    )
                 except Exception as err:
                     sys.stderr.write(f"[jupytext] Error: {str(err)}\n")
+    finally:
+        notary.flush()
+        if kernel_pool is not None:
+            kernel_pool.close()
+            if execution_reports is not None:
+                execution_reports.extend(kernel_pool.reports)
+
+    return exit_code
+
 
-        return exit_code
+def jupytext_files_with_batched_pipes(notebooks, args, log, notary, sync_state=None, git_state=None, kernel_pool=None):
+    """Apply the jupytext command to each file, and return the sum of the exit codes.
+    The notebooks are processed together, and each --pipe or --check command is run
+    for all the notebooks at once (see pipe_notebooks)"""
+    exit_code = 0
+    pending = []
+
+    def advance(steps, piped_notebook=None):
+        """Process the notebook until the next command, or until the end"""
+        nonlocal exit_code
+        try:
+            if isinstance(piped_notebook, Exception):
+                request = steps.throw(piped_notebook)
+            else:
+                request = steps.send(piped_notebook)
+        except StopIteration as stop:
+            exit_code += stop.value
+        except Exception as err:
+            if not args.warn_only:
+                raise
+            sys.stderr.write(f"[jupytext] Error: {str(err)}\n")
+        else:
+            pending.append((steps, request))
+
+    for nb_file in notebooks:
+        advance(
+            jupytext_single_file_steps(
+                nb_file, args, log, notary, sync_state=sync_state, git_state=git_state, kernel_pool=kernel_pool
+            )
+        )
+
+    while pending:
+        steps, requests = zip(*pending)
+        pending = []
+        for nb_steps, piped_notebook in zip(steps, pipe_notebooks(list(requests))):
+            advance(nb_steps, piped_notebook)
+
+    return exit_code
+
+
+def jupytext_parallel(notebooks, args, sync_state=None, execution_reports=None):
+    """Apply the jupytext command to the notebooks using a pool of worker processes.
+    The notebooks that share a paired file are processed by the same worker. The
+    notebooks for which the paired files cannot be determined are processed
+    one after the other, once the other notebooks have been processed."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    if sync_state is not None:
+        # The unchanged pairs are skipped before starting the workers
+        log = _log_function(args)
+        changed_notebooks = []
+        for nb_file in notebooks:
+            if nb_file != "-" and sync_state.pair_is_unchanged(nb_file):
+                log(f"[jupytext] Unchanged {nb_file} and paired files since the last sync")
+            else:
+                changed_notebooks.append(nb_file)
+        notebooks = changed_notebooks
+        if not notebooks:
+            return 0
+
+    pool_options = {}
+    if args.execute:
+        import multiprocessing
+
+        # The workers start kernels, so they should not inherit the threads and the
+        # zmq sockets of the kernels that this process may have started before
+        pool_options["mp_context"] = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(max_workers=min(args.jobs, len(notebooks)), **pool_options) as executor:
+        written_paths = list(executor.map(_paths_written_by, notebooks, [args] * len(notebooks)))
+        known = [(nb_file, paths) for nb_file, paths in zip(notebooks, written_paths) if paths is not None]
+        groups = group_notebooks_by_written_paths([nb_file for nb_file, _ in known], [paths for _, paths in known])
+        unknown = [nb_file for nb_file, paths in zip(notebooks, written_paths) if paths is None]
+
+        exit_code = 0
+        for batch in [groups, [unknown] if unknown else []]:
+            futures = [executor.submit(_jupytext_files_in_worker, group, args) for group in batch]
+            try:
+                for future in futures:
+                    group_exit_code, out, err, sync_state_updates, group_execution_reports = future.result()
+                    sys.stdout.write(out)
+                    sys.stderr.write(err)
+                    exit_code += group_exit_code
+                    if sync_state is not None:
+                        sync_state.update(sync_state_updates)
+                    if execution_reports is not None:
+                        execution_reports.extend(group_execution_reports)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    return exit_code
+
+
+def _jupytext_files_in_worker(notebooks, args):
+    """Process a group of notebooks in a worker process, and return the exit code
+    together with the captured stdout and stderr, the updates to the sync state,
+    and the reports on the execution of the notebooks"""
+    from nbformat.sign import NotebookNotary
+
+    from .sync_state import SyncState
+
+    log = _log_function(args)
+    out, err = StringIO(), StringIO()
+    notary = NotebookNotary()
+    sync_state = SyncState(SYNC_STATE_FILE) if sync_state_applies(args) else None
+    execution_reports = []
+    try:
+        with redirect_stdout(out), redirect_stderr(err):
+            exit_code = jupytext_files(notebooks, args, log, notary, sync_state, execution_reports)
+    except BaseException:
+        # Show the log for this group before the error is re-raised in the main process
+        sys.stdout.write(out.getvalue())
+        sys.stderr.write(err.getvalue())
+        raise
     finally:
-        if notary_to_close:
-            notary_to_close.store.close()
+        notary.store.close()
+
+    sync_state_updates = sync_state.updated if sync_state is not None else {}
+    return exit_code, out.getvalue(), err.getvalue(), sync_state_updates, execution_reports
+
+
+def _log_function(args):
+    def log(text):
+        if not args.quiet:
+            sys.stdout.write(text + "\n")
+
+    return log
+
+
+def _paths_written_by(nb_file, args):
+    """Return the (absolute) paths that jupytext might write when processing nb_file,
+    or None if these paths cannot be determined"""
+    from .config import load_jupytext_config, notebook_formats
+    from .formats import long_form_multiple_formats
+    from .paired_paths import base_path, paired_paths
+
+    paths = {os.path.abspath(nb_file)}
+    try:
+        bp = base_path(nb_file, args.input_format)
+        if args.output_format:
+            # The destination extension might be '.auto', so we use
+            # the base path as a proxy for the destination file
+            paths.add(os.path.abspath(bp) + ":base_path")
+        if args.sync:
+            fmt = copy(args.input_format) or {"extension": os.path.splitext(nb_file)[1]}
+            if args.set_formats is not None:
+                formats = long_form_multiple_formats(args.set_formats)
+            else:
+                config = load_jupytext_config(os.path.abspath(nb_file))
+                metadata = _read_notebook_metadata(nb_file, fmt["extension"])
+                formats = notebook_formats({"metadata": metadata}, config, nb_file, fallback_on_current_fmt=False)
+            for path, _ in paired_paths(nb_file, fmt, formats):
+                paths.add(os.path.abspath(path))
+    except (OSError, ValueError):
+        # The error, if any, will be reported when the notebook is processed
+        return None
+
+    return paths
+
 
+def _read_notebook_metadata(nb_file, ext):
+    """Read the notebook metadata, or for a text notebook only the metadata in its header"""
+    import yaml
 
-def jupytext_single_file(nb_file, args, log, notary):
+    from .formats import read_metadata
+
+    with open(nb_file, encoding="utf-8") as stream:
+        if ext == ".ipynb":
+            notebook = json.load(stream)
+            metadata = notebook.get("metadata", {}) if isinstance(notebook, dict) else None
+        else:
+            try:
+                metadata = read_metadata(stream.read(), ext)
+            except yaml.YAMLError as err:
+                raise ValueError(f"Invalid header in {nb_file}: {err}") from err
+    if not isinstance(metadata, dict):
+        raise ValueError(f"Invalid notebook metadata in {nb_file}")
+    return metadata
+
+
+def group_notebooks_by_written_paths(notebooks, written_paths):
+    """Group the notebooks that write to a common path, preserving the order of the notebooks"""
+    group_of_notebook = list(range(len(notebooks)))
+
+    def root(i):
+        while group_of_notebook[i] != i:
+            group_of_notebook[i] = group_of_notebook[group_of_notebook[i]]
+            i = group_of_notebook[i]
+        return i
+
+    first_notebook_writing_path = {}
+    for i, paths in enumerate(written_paths):
+        for path in paths:
+            j = first_notebook_writing_path.setdefault(path, i)
+            group_of_notebook[root(i)] = root(j)
+
+    groups = {}
+    for i, nb_file in enumerate(notebooks):
+        groups.setdefault(root(i), []).append(nb_file)
+
+    return list(groups.values())
+
+
+class PipeRequest:
+    """A notebook to pipe into a command, with the arguments of pipe_notebook"""
+
+    def __init__(
+        self,
+        notebook,
+        command,
+        fmt,
+        update=True,
+        quiet=False,
+        prefix=None,
+        directory=None,
+        warn_only=False,
+        in_process=True,
+    ):
+        self.notebook = notebook
+        self.command = command
+        self.fmt = fmt
+        self.update = update
+        self.quiet = quiet
+        self.prefix = prefix
+        self.directory = directory
+        self.warn_only = warn_only
+        self.in_process = in_process
+
+    def run(self):
+        """Pipe the notebook into the command, and return the resulting notebook"""
+        return pipe_notebook(
+            self.notebook,
+            self.command,
+            self.fmt,
+            update=self.update,
+            quiet=self.quiet,
+            prefix=self.prefix,
+            directory=self.directory,
+            warn_only=self.warn_only,
+            in_process=self.in_process,
+        )
+
+
+def jupytext_single_file(nb_file, args, log, notary, sync_state=None, git_state=None, kernel_pool=None):
     """Apply the jupytext command, with given arguments, to a single file"""
+    steps = jupytext_single_file_steps(
+        nb_file, args, log, notary, sync_state=sync_state, git_state=git_state, kernel_pool=kernel_pool
+    )
+    try:
+        request = next(steps)
+        while True:
+            request = steps.send(request.run())
+    except StopIteration as stop:
+        return stop.value
+
+
+def jupytext_single_file_steps(nb_file, args, log, notary, sync_state=None, git_state=None, kernel_pool=None):
+    """Apply the jupytext command, with given arguments, to a single file.
+
+    This is a generator that yields a PipeRequest for each --pipe or --check command,
+    and expects the piped notebook in return. Its return value is the exit code."""
+    from .combine import combine_inputs_with_outputs
+    from .compare import NotebookDifference, compare, test_round_trip_conversion
+    from .config import load_jupytext_config, notebook_formats
+    from .execute import KernelPool
+    from .formats import (
+        check_auto_ext,
+        check_file_version,
+        long_form_multiple_formats,
+        long_form_one_format,
+        short_form_one_format,
+    )
+    from .header import recursive_update
+    from .incremental import IncrementalExecutionUnsure, cells_to_execute, execute_cells
+    from .jupytext import create_prefix_dir, read, reads, write, writes
+    from .kernels import find_kernel_specs, get_kernel_spec, kernelspec_from_language
+    from .languages import _SCRIPT_EXTENSIONS
+    from .paired_paths import InconsistentPath, base_path, find_base_path_and_format, full_path, paired_paths
+    from .signatures import ipynb_notebook_as_read
+    from .sync_pairs import write_pair
+
+    if args.pre_commit_mode and git_state is None:
+        git_state = GitState()
+
     if nb_file == "-" and args.sync:
         msg = "Missing notebook path."
         if args.set_formats is not None and os.path.isfile(args.set_formats):
             msg += f" Did you mean 'jupytext --sync {args.set_formats}' ?"
         raise ValueError(msg)
 
+    if sync_state is not None and sync_state.pair_is_unchanged(nb_file):
+        log(f"[jupytext] Unchanged {nb_file} and paired files since the last sync")
+        return 0
+
     nb_dest = None
     if args.output:
         nb_dest = args.output
@@ -552,7 +1039,11 @@ def jupytext_single_file(nb_file, args, log, notary):
         """Serialize a notebook; sign the result when every cell is trusted."""
         content = writes(nb, fmt=fmt, config=config)
         if notary.check_cells(nb):
-            notary.sign(reads(content, fmt=fmt, config=config))
+            if fmt.get("extension") == ".ipynb":
+                # The notebook does not need to be parsed again
+                notary.sign(ipynb_notebook_as_read(nb))
+            else:
+                notary.sign(reads(content, fmt=fmt, config=config))
         else:
             log("[jupytext] Warning: Notebook is not trusted")
         return content
@@ -580,7 +1071,7 @@ def jupytext_single_file(nb_file, args, log, notary):
         )
     )
 
-    timestamp_checker = TimestampChecker(pre_commit_mode=args.pre_commit_mode)
+    timestamp_checker = TimestampChecker(pre_commit_mode=args.pre_commit_mode, git_state=git_state)
     timestamp_checker.get_and_check_timestamp(nb_file)
     notebook = _read(nb_file, fmt=fmt)
 
@@ -649,6 +1140,7 @@ def jupytext_single_file(nb_file, args, log, notary):
                 args.pre_commit_mode,
                 timestamp_checker,
                 read_func=_read,
+                git_state=git_state,
             )
             nb_files = [inputs_nb_file, outputs_nb_file]
         except NotAPairedNotebook as err:
@@ -681,7 +1173,7 @@ def jupytext_single_file(nb_file, args, log, notary):
         prefix = os.path.splitext(os.path.basename(nb_file))[0]
         directory = os.path.dirname(nb_file)
     for cmd in args.pipe or []:
-        notebook = pipe_notebook(
+        notebook = yield PipeRequest(
             notebook,
             cmd,
             args.pipe_fmt,
@@ -689,11 +1181,12 @@ def jupytext_single_file(nb_file, args, log, notary):
             prefix=prefix,
             directory=directory,
             warn_only=args.warn_only,
+            in_process=not args.pipe_in_subprocess,
         )
 
     # and/or test the desired commands onto the notebook
     for cmd in args.check or []:
-        pipe_notebook(
+        yield PipeRequest(
             notebook,
             cmd,
             args.pipe_fmt,
@@ -736,16 +1229,43 @@ def jupytext_single_file(nb_file, args, log, notary):
             if not os.path.isdir(run_path):
                 raise ValueError(f"--run-path={args.run_path} is not a valid path")
 
-        if run_path:
-            resources = {"metadata": {"path": run_path}}
-        else:
-            resources = {}
+        cells = nb_outputs = None
+        if args.execute_incremental:
+            outputs_path = outputs_nb_file if args.sync else nb_dest
+            if outputs_path and outputs_path != "-" and outputs_path.endswith(".ipynb") and os.path.isfile(outputs_path):
+                nb_outputs = read(outputs_path)
+                try:
+                    cells = cells_to_execute(notebook, nb_outputs)
+                except IncrementalExecutionUnsure as err:
+                    log(f"[jupytext] Executing all the cells of {shlex.quote(nb_file)} as {err}")
+                else:
+                    n_code_cells = sum(cell.cell_type == "code" for cell in notebook.cells)
+                    log(
+                        f"[jupytext] Executing {len(cells)} of the {n_code_cells} code cells, "
+                        f"the outputs of the other cells are taken from {shlex.quote(outputs_path)}"
+                    )
 
+        own_kernel_pool = kernel_pool is None
+        if own_kernel_pool:
+            kernel_pool = KernelPool(cache=execution_cache(args))
         try:
-            from nbconvert.preprocessors import ExecutePreprocessor
-
-            exec_proc = ExecutePreprocessor(timeout=None, kernel_name=kernel_name)
-            exec_proc.preprocess(notebook, resources=resources)
+            if cells is not None:
+                report = execute_cells(
+                    kernel_pool,
+                    notebook,
+                    nb_outputs,
+                    cells,
+                    kernel_name,
+                    path=run_path,
+                    nb_file=nb_file,
+                    timeout=args.execute_timeout,
+                )
+            else:
+                report = kernel_pool.execute(
+                    notebook, kernel_name, path=run_path, nb_file=nb_file, timeout=args.execute_timeout
+                )
+            if report.cached:
+                log(f"[jupytext] Outputs of {shlex.quote(nb_file)} restored from the execution cache")
         except (ImportError, RuntimeError) as err:
             if args.pre_commit_mode:
                 raise RuntimeError(
@@ -757,6 +1277,9 @@ def jupytext_single_file(nb_file, args, log, notary):
                 "An error occurred while executing the notebook. Please "
                 "make sure that 'nbconvert' and 'ipykernel' are installed."
             ) from err
+        finally:
+            if own_kernel_pool:
+                kernel_pool.close()
 
     # III. ### Possible actions ###
     # a. Test round trip conversion
@@ -871,6 +1394,8 @@ def jupytext_single_file(nb_file, args, log, notary):
             tmp_path = name + f"_tmp_jupytext_{os.getpid()}" + ext
             with open(tmp_path, "w", encoding="utf-8") as fp:
                 fp.write(new_content)
+            if git_state is not None:
+                git_state.forget(path)
 
         # We check that none of the input files changed while we were
         # doing our processing. If they did, we abort as we would
@@ -924,7 +1449,7 @@ def jupytext_single_file(nb_file, args, log, notary):
         if args.pre_commit:
             system("git", "add", path)
 
-        if args.pre_commit_mode and is_untracked(path):
+        if args.pre_commit_mode and git_state.is_untracked(path):
             log(
                 f"[jupytext] Error: the git index is outdated.\n"
                 f"Please add the paired notebook with:\n"
@@ -998,12 +1523,16 @@ def jupytext_single_file(nb_file, args, log, notary):
         if args.check_source_is_newer:
             timestamp_checker.check_file_is_newest(nb_file)
         write_pair(nb_file, formats, lazy_write)
+        if sync_state is not None:
+            sync_state.record(nb_file, [path for path, _ in paired_paths(nb_file, fmt, formats)])
 
     return untracked_files
 
 
 def notebooks_in_git_index(fmt):
     """Return the list of modified and deleted ipynb files in the git index that match the given format"""
+    from .paired_paths import InconsistentPath, base_path
+
     git_status = system("git", "status", "--porcelain")
     re_modified = re.compile(r"^[AM]+\s+(?P<name>.*)", re.MULTILINE)
     modified_files_in_git_index = re_modified.findall(git_status)
@@ -1037,6 +1566,9 @@ def is_untracked(filepath):
 
 def print_paired_paths(nb_file, fmt):
     """Display the paired paths for this notebook"""
+    from .jupytext import get_formats_from_notebook_path
+    from .paired_paths import paired_paths
+
     formats = get_formats_from_notebook_path(nb_file, fmt)
     if formats:
         for path, _ in paired_paths(nb_file, fmt, formats):
@@ -1046,6 +1578,8 @@ def print_paired_paths(nb_file, fmt):
 
 def set_format_options(fmt, format_options):
     """Apply the desired format options to the format description fmt"""
+    from .formats import _BINARY_FORMAT_OPTIONS, _VALID_FORMAT_OPTIONS
+
     if not format_options:
         return
 
@@ -1068,6 +1602,9 @@ def set_format_options(fmt, format_options):
 
 def set_prefix_and_suffix(fmt, formats, nb_file):
     """Add prefix and suffix information from jupytext.formats if format and path matches"""
+    from .formats import long_form_multiple_formats
+    from .paired_paths import InconsistentPath, base_path
+
     for alt_fmt in long_form_multiple_formats(formats):
         if alt_fmt["extension"] == fmt["extension"] and fmt.get("format_name") == alt_fmt.get("format_name"):
             try:
@@ -1117,6 +1654,132 @@ def git_timestamp(path):
     return get_timestamp(path)
 
 
+class GitState:
+    """The status of the files in the git repository, as returned by a few git commands
+    that are run once for all the files: 'git status', 'git ls-files', and one pass of
+    'git log' for the commit timestamps. The files that are modified by Jupytext need to
+    be forgotten, their status is then queried file by file."""
+
+    def __init__(self):
+        self._root = None
+        self._status = None
+        self._tracked_files = None
+        self._commit_timestamps = None
+        self._forgotten = set()
+
+    @property
+    def root(self):
+        if self._root is None:
+            self._root = os.path.realpath(system("git", "rev-parse", "--show-toplevel").strip())
+        return self._root
+
+    def _key(self, path):
+        """The path relative to the root of the repository, as in the git outputs"""
+        return os.path.relpath(os.path.realpath(path), self.root).replace(os.sep, "/")
+
+    @property
+    def status(self):
+        """The two-letter status code of the tracked files that are not clean"""
+        if self._status is None:
+            self._status = {}
+            entries = iter(system("git", "-C", self.root, "status", "--porcelain", "-z", "--untracked-files=no").split("\0"))
+            for entry in entries:
+                if not entry:
+                    continue
+                code, path = entry[:2], entry[3:]
+                if code[0] in "RC":
+                    # The next entry is the original path. Like 'git status path',
+                    # we report the new path as added, and a renamed file as deleted
+                    original_path = next(entries, "")
+                    if code[0] == "R":
+                        self._status[original_path] = "D "
+                    code = "A" + code[1]
+                self._status[path] = code
+        return self._status
+
+    @property
+    def tracked_files(self):
+        if self._tracked_files is None:
+            self._tracked_files = set(system("git", "-C", self.root, "ls-files", "-z").split("\0"))
+            self._tracked_files.discard("")
+        return self._tracked_files
+
+    @property
+    def commit_timestamps(self):
+        """The timestamp of the most recent commit for each file"""
+        if self._commit_timestamps is None:
+            self._commit_timestamps = {}
+            try:
+                log = system(
+                    "git",
+                    "-C",
+                    self.root,
+                    "log",
+                    "--name-only",
+                    "--no-show-signature",
+                    "--format=%x00%ct",
+                    "-z",
+                    stderr=subprocess.DEVNULL,
+                )
+            except SystemExit as err:
+                if err.code == 128:
+                    # No commit yet
+                    log = ""
+                else:
+                    raise
+
+            # Each commit starts with an empty token followed by the commit timestamp,
+            # then come the files modified by the commit. Commits are listed from the most recent.
+            tokens = iter(log.split("\0"))
+            timestamp = None
+            for token in tokens:
+                if not token:
+                    timestamp = float(next(tokens, "0") or 0)
+                    continue
+                self._commit_timestamps.setdefault(token[1:] if token.startswith("\n") else token, timestamp)
+        return self._commit_timestamps
+
+    def forget(self, path):
+        """Forget about the status of a file that is being modified"""
+        self._forgotten.add(os.path.realpath(path))
+
+    def _is_forgotten(self, path):
+        return os.path.realpath(path) in self._forgotten
+
+    def file_in_git_index(self, path):
+        """Same as file_in_git_index(path)"""
+        if not os.path.isfile(path):
+            return False
+        if self._is_forgotten(path):
+            return file_in_git_index(path)
+        return self.status.get(self._key(path), "").strip().startswith(("M", "A"))
+
+    def is_untracked(self, path):
+        """Same as is_untracked(path)"""
+        if not path:
+            return False
+        if self._is_forgotten(path):
+            return is_untracked(path)
+        key = self._key(path)
+        if key not in self.tracked_files:
+            return True
+        # Does the file differ from the index?
+        return self.status.get(key, "  ")[1] != " "
+
+    def git_timestamp(self, path):
+        """Same as git_timestamp(path)"""
+        if not os.path.isfile(path):
+            return None
+        if self._is_forgotten(path):
+            return git_timestamp(path)
+        if self.file_in_git_index(path):
+            return float("inf")
+        timestamp = self.commit_timestamps.get(self._key(path))
+        if timestamp is not None:
+            return timestamp
+        return get_timestamp(path)
+
+
 def get_timestamp(path: str) -> Optional[float]:
     if not os.path.isfile(path):
         return None
@@ -1134,8 +1797,9 @@ class TimestampChecker:
     identify the most recent input file, or its content was read.
     """
 
-    def __init__(self, pre_commit_mode: bool = False):
+    def __init__(self, pre_commit_mode: bool = False, git_state: Optional["GitState"] = None):
         self.pre_commit_mode = pre_commit_mode
+        self.git_state = git_state
         self._timestamps: dict[str, Optional[float]] = {}
 
     def get_and_check_timestamp(self, path: str) -> Optional[float]:
@@ -1146,6 +1810,8 @@ class TimestampChecker:
             self._timestamps[path] = ts
 
         if self.pre_commit_mode:
+            if self.git_state is not None:
+                return self.git_state.git_timestamp(path)
             return git_timestamp(path)
 
         return ts
@@ -1205,8 +1871,16 @@ def load_paired_notebook(
     pre_commit_mode: bool,
     timestamp_checker: TimestampChecker,
     read_func,
+    git_state: Optional["GitState"] = None,
 ):
     """Update the notebook with the inputs and outputs of the most recent paired files"""
+    from .compare import compare
+    from .formats import long_form_multiple_formats
+    from .jupytext import read, writes
+    from .paired_paths import find_base_path_and_format, paired_paths
+    from .pairs import latest_inputs_and_outputs
+    from .sync_pairs import read_pair
+
     if not formats:
         raise NotAPairedNotebook(f"{shlex.quote(nb_file)} is not a paired notebook")
 
@@ -1222,10 +1896,11 @@ def load_paired_notebook(
         timestamp_checker.get_and_check_timestamp(path)
         return read_func(path, fmt=fmt)
 
-    if pre_commit_mode and file_in_git_index(nb_file):
+    in_git_index = git_state.file_in_git_index if git_state is not None else file_in_git_index
+    if pre_commit_mode and in_git_index(nb_file):
         # We raise an error if two representations of this notebook in the git index are inconsistent
         nb_files_in_git_index = sorted(
-            ((alt_path, alt_fmt) for alt_path, alt_fmt in paired_paths(nb_file, fmt, formats) if file_in_git_index(alt_path)),
+            ((alt_path, alt_fmt) for alt_path, alt_fmt in paired_paths(nb_file, fmt, formats) if in_git_index(alt_path)),
             key=lambda x: 0 if x[1]["extension"] != ".ipynb" else 1,
         )
 
@@ -1255,16 +1930,25 @@ def load_paired_notebook(
 
 
 def exec_command(command, input=None, capture=False, warn_only=False, quiet=False):
-    """Execute the desired command, and pipe the given input into it"""
+    """Execute the desired command, and pipe the given input into it. The output of the
+    command is written to sys.stdout and sys.stderr, so that it can be captured, e.g. by
+    the Jupytext daemon. When no input is given, the standard output of the command
+    is always shown, and None is returned."""
     assert isinstance(command, list)
     if not quiet:
         sys.stdout.write("[jupytext] Executing {}\n".format(" ".join(command)))
     process = subprocess.Popen(
         command,
-        **(dict(stdout=subprocess.PIPE, stdin=subprocess.PIPE) if input is not None else {}),
+        stdin=subprocess.PIPE if input is not None else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
     )
     out, err = process.communicate(input=input)
-    if out and not capture and not quiet:
+    if input is None:
+        if out:
+            sys.stdout.write(out.decode("utf-8"))
+        out = None
+    elif out and not capture and not quiet:
         sys.stdout.write(out.decode("utf-8"))
     if err:
         sys.stderr.write(err.decode("utf-8"))
@@ -1279,6 +1963,104 @@ def exec_command(command, input=None, capture=False, warn_only=False, quiet=Fals
     return out
 
 
+# The commands that read the notebook from stdin when they are used without arguments,
+# and their equivalent on files (used with --pipe-batch)
+_PIPE_COMMANDS_ON_STDIN = {"black": "black -", "flake8": "flake8 -", "autopep8": "autopep8 -"}
+_PIPE_COMMANDS_ON_FILES = {"black": "black {}", "flake8": "flake8 {}", "autopep8": "autopep8 --in-place {}"}
+
+# The maximum number of files passed to a single command with --pipe-batch
+PIPE_BATCH_SIZE = 128
+
+
+def _pipe_command(command, on_files=False):
+    """The command to execute, as a list of arguments"""
+    if command in _PIPE_COMMANDS_ON_STDIN:
+        command = _PIPE_COMMANDS_ON_FILES[command] if on_files else _PIPE_COMMANDS_ON_STDIN[command]
+    elif command in ["pytest", "unittest"]:
+        command = command + " {}"
+    return shlex.split(command)
+
+
+def _pipe_format(notebook, fmt):
+    from .formats import check_auto_ext, long_form_one_format
+
+    fmt = long_form_one_format(fmt, notebook.metadata, auto_ext_requires_language_info=False)
+    return check_auto_ext(fmt, notebook.metadata, "--pipe-fmt")
+
+
+def _write_temporary_file(text, prefix, suffix, directory):
+    """Write the text to a temporary file, and return the path to that file"""
+    if prefix is not None:
+        prefix = prefix + "-"
+    tmp_file_args = dict(
+        mode="w+",
+        encoding="utf8",
+        prefix=prefix,
+        suffix=suffix,
+        dir=directory,
+        delete=False,
+    )
+    try:
+        tmp = NamedTemporaryFile(**tmp_file_args)
+    except TypeError:
+        # NamedTemporaryFile does not have an 'encoding' argument on pypy
+        tmp_file_args.pop("encoding")
+        tmp = NamedTemporaryFile(**tmp_file_args)
+    try:
+        tmp.write(text)
+    finally:
+        tmp.close()
+    return tmp.name
+
+
+def _combine_piped_notebook(piped_notebook, notebook, fmt):
+    """Restore the outputs and the Jupytext metadata of the original notebook"""
+    from .combine import combine_inputs_with_outputs
+
+    if fmt["extension"] != ".ipynb":
+        piped_notebook = combine_inputs_with_outputs(piped_notebook, notebook, fmt)
+
+    # Remove jupytext / text_representation entry
+    if "jupytext" in notebook.metadata:
+        piped_notebook.metadata["jupytext"] = notebook.metadata["jupytext"]
+    else:
+        piped_notebook.metadata.pop("jupytext", None)
+
+    return piped_notebook
+
+
+def exec_adapter(command, text, quiet=False):
+    """Format the text in-process like the command would do, if the command has an adapter
+    (see jupytext.pipe_adapters). Return None if the command should be run in a subprocess."""
+    from .pipe_adapters import find_pipe_adapter
+
+    try:
+        adapter = find_pipe_adapter(command)
+    except Exception as err:
+        # The adapter could not be loaded, or could not read the configuration of the program
+        _warn_adapter_error(command, err)
+        return None
+    if adapter is None:
+        return None
+    if not quiet:
+        sys.stdout.write("[jupytext] Executing {} in-process\n".format(" ".join(command)))
+    try:
+        return adapter(text)
+    except Exception as err:
+        # The errors in the text are reported by the command
+        _warn_adapter_error(command, err)
+        return None
+
+
+def _warn_adapter_error(command, err):
+    """Warn that the adapter for this command failed. A given warning is shown only once"""
+    warnings.warn(
+        "The in-process adapter for '{}' raised {}: {}. Running the command instead.".format(
+            " ".join(command), type(err).__name__, err
+        )
+    )
+
+
 def pipe_notebook(
     notebook,
     command,
@@ -1288,42 +2070,22 @@ def pipe_notebook(
     prefix=None,
     directory=None,
     warn_only=False,
+    in_process=True,
 ):
     """Pipe the notebook, in the desired representation, to the given command. Update the notebook
-    with the returned content if desired."""
-    if command in ["black", "flake8", "autopep8"]:
-        command = command + " -"
-    elif command in ["pytest", "unittest"]:
-        command = command + " {}"
+    with the returned content if desired. When in_process is True, the commands that have
+    an adapter in jupytext.pipe_adapters are run in the current process."""
+    from .jupytext import read, reads, writes
 
-    fmt = long_form_one_format(fmt, notebook.metadata, auto_ext_requires_language_info=False)
-    fmt = check_auto_ext(fmt, notebook.metadata, "--pipe-fmt")
+    fmt = _pipe_format(notebook, fmt)
     text = writes(notebook, fmt)
 
-    command = shlex.split(command)
+    command = _pipe_command(command)
     if "{}" in command:
-        if prefix is not None:
-            prefix = prefix + "-"
-        tmp_file_args = dict(
-            mode="w+",
-            encoding="utf8",
-            prefix=prefix,
-            suffix=fmt["extension"],
-            dir=directory,
-            delete=False,
-        )
+        tmp_name = _write_temporary_file(text, prefix, fmt["extension"], directory)
         try:
-            tmp = NamedTemporaryFile(**tmp_file_args)
-        except TypeError:
-            # NamedTemporaryFile does not have an 'encoding' argument on pypy
-            tmp_file_args.pop("encoding")
-            tmp = NamedTemporaryFile(**tmp_file_args)
-        try:
-            tmp.write(text)
-            tmp.close()
-
             exec_command(
-                [cmd if cmd != "{}" else tmp.name for cmd in command],
+                [cmd if cmd != "{}" else tmp_name for cmd in command],
                 capture=update,
                 quiet=quiet,
                 warn_only=warn_only,
@@ -1332,39 +2094,131 @@ def pipe_notebook(
             if not update:
                 return notebook
 
-            piped_notebook = read(tmp.name, fmt=fmt)
+            piped_notebook = read(tmp_name, fmt=fmt)
         finally:
-            os.remove(tmp.name)
+            os.remove(tmp_name)
     else:
-        cmd_output = exec_command(
-            command,
-            text.encode("utf-8"),
-            capture=update,
-            warn_only=warn_only,
-            quiet=quiet,
-        )
+        piped_text = exec_adapter(command, text, quiet=quiet) if update and in_process else None
+        if piped_text is None:
+            cmd_output = exec_command(
+                command,
+                text.encode("utf-8"),
+                capture=update,
+                warn_only=warn_only,
+                quiet=quiet,
+            )
 
-        if not update:
-            return notebook
+            if not update:
+                return notebook
 
-        if not cmd_output:
-            sys.stderr.write(
-                "[jupytext] The command '{}' had no output. As a result, the notebook is empty. "
-                "Is this expected? If not, use --check rather than --pipe for this command.".format(command)
-            )
+            if not cmd_output:
+                sys.stderr.write(
+                    "[jupytext] The command '{}' had no output. As a result, the notebook is empty. "
+                    "Is this expected? If not, use --check rather than --pipe for this command.".format(command)
+                )
 
-        piped_notebook = reads(cmd_output.decode("utf-8"), fmt)
+            piped_text = cmd_output.decode("utf-8")
 
-    if fmt["extension"] != ".ipynb":
-        piped_notebook = combine_inputs_with_outputs(piped_notebook, notebook, fmt)
+        piped_notebook = reads(piped_text, fmt)
 
-    # Remove jupytext / text_representation entry
-    if "jupytext" in notebook.metadata:
-        piped_notebook.metadata["jupytext"] = notebook.metadata["jupytext"]
-    else:
-        piped_notebook.metadata.pop("jupytext", None)
+    return _combine_piped_notebook(piped_notebook, notebook, fmt)
 
-    return piped_notebook
+
+def pipe_notebooks(requests, batch_size=PIPE_BATCH_SIZE):
+    """Pipe the notebooks into the commands of the PipeRequest objects, and return the resulting
+    notebooks, or the exception raised when piping each notebook.
+
+    The requests that share the same command are run with a single call to the command
+    (or one call per batch_size notebooks), on temporary files written next to the notebooks.
+    When such a call fails, the command is run again on each file, in order to report the
+    errors for each notebook. The commands that read the notebook from stdin are run once
+    per notebook."""
+    from .jupytext import read, writes
+
+    results = [None] * len(requests)
+    batches = {}
+    for i, request in enumerate(requests):
+        command = _pipe_command(request.command, on_files=True)
+        # The commands that run in-process are not batched
+        in_process = request.update and request.in_process and _has_adapter(_pipe_command(request.command))
+        if in_process or "{}" not in command:
+            try:
+                results[i] = request.run()
+            except Exception as err:
+                results[i] = err
+            continue
+        key = (tuple(command), request.update, request.quiet, request.warn_only)
+        batches.setdefault(key, []).append(i)
+
+    for (command, update, quiet, warn_only), indices in batches.items():
+        for start in range(0, len(indices), batch_size):
+            tmp_names = {}
+            fmts = {}
+            for i in indices[start : start + batch_size]:
+                request = requests[i]
+                try:
+                    fmts[i] = _pipe_format(request.notebook, request.fmt)
+                    text = writes(request.notebook, fmts[i])
+                    tmp_names[i] = _write_temporary_file(text, request.prefix, fmts[i]["extension"], request.directory)
+                except Exception as err:
+                    results[i] = err
+
+            try:
+                files = list(tmp_names.values())
+                if files and not _exec_command_on_files(list(command), files, capture=update, quiet=quiet):
+                    # Run the command on each file to report the errors per notebook
+                    for file in files:
+                        exec_command(
+                            [cmd if cmd != "{}" else file for cmd in command],
+                            capture=update,
+                            quiet=quiet,
+                            warn_only=warn_only,
+                        )
+
+                for i, tmp_name in tmp_names.items():
+                    notebook = requests[i].notebook
+                    try:
+                        results[i] = (
+                            _combine_piped_notebook(read(tmp_name, fmt=fmts[i]), notebook, fmts[i]) if update else notebook
+                        )
+                    except Exception as err:
+                        results[i] = err
+            except Exception as err:
+                for i in tmp_names:
+                    results[i] = err
+            finally:
+                for tmp_name in tmp_names.values():
+                    os.remove(tmp_name)
+
+    return results
+
+
+def _has_adapter(command):
+    from .pipe_adapters import find_pipe_adapter
+
+    try:
+        return find_pipe_adapter(command) is not None
+    except Exception as err:
+        _warn_adapter_error(command, err)
+        return False
+
+
+def _exec_command_on_files(command, files, capture=False, quiet=False):
+    """Execute the command, in which the {} placeholder is replaced with the list of files.
+    Return True if the command succeeded. The output of a failed command is not shown."""
+    i = command.index("{}")
+    command = command[:i] + files + command[i + 1 :]
+    if not quiet:
+        sys.stdout.write("[jupytext] Executing {}\n".format(" ".join(command)))
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = process.communicate()
+    if process.returncode:
+        return False
+    if out and not capture and not quiet:
+        sys.stdout.write(out.decode("utf-8"))
+    if err:
+        sys.stderr.write(err.decode("utf-8"))
+    return True
 
 
 def execution_counts_are_in_order(notebook):
@@ -1380,6 +2234,8 @@ def execution_counts_are_in_order(notebook):
 
 def code_cells_have_changed(notebook, nb_files):
     """The source for the code cells has not changed"""
+    from .jupytext import read
+
     for nb_file in nb_files:
         if not os.path.exists(nb_file):
             return True
@@ -1,6 +1,7 @@
 """Combine source and outputs from two notebooks"""
 
 import re
+from bisect import bisect_left
 from copy import copy
 
 from nbformat import NotebookNode
@@ -8,7 +9,7 @@ from nbformat import NotebookNode
 from .cell_metadata import _IGNORE_CELL_METADATA
 from .formats import long_form_one_format
 from .header import _DEFAULT_NOTEBOOK_METADATA
-from .metadata_filter import restore_filtered_metadata
+from .metadata_filter import compile_metadata_filter, restore_filtered_metadata
 
 _BLANK_LINE = re.compile(r"^\s*$")
 
@@ -78,6 +79,9 @@ def combine_inputs_with_outputs(nb_source, nb_outputs, fmt=None):
         cell_metadata_filter = nb_metadata.get("jupytext", {}).get("cell_metadata_filter")
 
     outputs_map = map_outputs_to_inputs(nb_source.cells, nb_outputs.cells)
+    cell_metadata_filter = compile_metadata_filter(cell_metadata_filter, _IGNORE_CELL_METADATA)
+    # The 'spin' format does not allow metadata on non-code cells
+    spin_text_cell_metadata_filter = compile_metadata_filter("-all", _IGNORE_CELL_METADATA)
 
     cells = []
     for source_cell, j in zip(nb_source.cells, outputs_map):
@@ -94,13 +98,10 @@ def combine_inputs_with_outputs(nb_source, nb_outputs, fmt=None):
         cell.source = source_cell.source
 
         # We also restore the cell metadata that has been filtered
-        cell.metadata = restore_filtered_metadata(
-            source_cell.metadata,
-            output_cell.metadata,
-            # The 'spin' format does not allow metadata on non-code cells
-            ("-all" if format_name == "spin" and source_cell.cell_type != "code" else cell_metadata_filter),
-            _IGNORE_CELL_METADATA,
-        )
+        if format_name == "spin" and source_cell.cell_type != "code":
+            cell.metadata = spin_text_cell_metadata_filter.restore(source_cell.metadata, output_cell.metadata)
+        else:
+            cell.metadata = cell_metadata_filter.restore(source_cell.metadata, output_cell.metadata)
 
         cells.append(cell)
 
@@ -118,47 +119,79 @@ def combine_inputs_with_outputs(nb_source, nb_outputs, fmt=None):
 
 def map_outputs_to_inputs(cells_inputs, cells_outputs):
     """Returns a map i->(j or None) that maps the cells with outputs to the input cells"""
-    n_in = len(cells_inputs)
     n_out = len(cells_outputs)
-    outputs_map = [None] * n_in
+    outputs_map = [None] * len(cells_inputs)
+
+    # Cells are compared on their type and on their content, up to reformatting by black
+    keys_inputs = [(cell.cell_type, black_invariant(cell.source)) for cell in cells_inputs]
+    keys_outputs = [(cell.cell_type, black_invariant(cell.source)) for cell in cells_outputs]
+    outputs_with_key = {}
+    for j, key in enumerate(keys_outputs):
+        outputs_with_key.setdefault(key, []).append(j)
 
     # First rule: match based on cell type, content, in increasing order, for each cell type
     first_unmatched_output_per_cell_type = {}
-    for i in range(n_in):
-        cell_input = cells_inputs[i]
-        for j in range(first_unmatched_output_per_cell_type.get(cell_input.cell_type, 0), n_out):
-            cell_output = cells_outputs[j]
-            if cell_input.cell_type == cell_output.cell_type and same_content(cell_input.source, cell_output.source):
-                outputs_map[i] = j
-                first_unmatched_output_per_cell_type[cell_input.cell_type] = j + 1
-                break
+    for i, key in enumerate(keys_inputs):
+        candidates = outputs_with_key.get(key)
+        if not candidates:
+            continue
+        cell_type = key[0]
+        k = bisect_left(candidates, first_unmatched_output_per_cell_type.get(cell_type, 0))
+        if k < len(candidates):
+            outputs_map[i] = candidates[k]
+            first_unmatched_output_per_cell_type[cell_type] = candidates[k] + 1
+
+    unused_ouputs = set(range(n_out)).difference(outputs_map)
+    if not unused_ouputs:
+        return outputs_map
 
     # Second rule: match unused outputs based on cell type and content
+    first_candidate_with_key = {}
+
+    def first_unused_output_with_key(key):
+        candidates = outputs_with_key.get(key, [])
+        k = first_candidate_with_key.get(key, 0)
+        while k < len(candidates) and candidates[k] not in unused_ouputs:
+            k += 1
+        first_candidate_with_key[key] = k
+        return candidates[k] if k < len(candidates) else None
+
+    for i, key in enumerate(keys_inputs):
+        if outputs_map[i] is None:
+            j = first_unused_output_with_key(key)
+            if j is not None:
+                outputs_map[i] = j
+                unused_ouputs.remove(j)
+
+    if not unused_ouputs:
+        return outputs_map
+
     # Third rule: is the new cell the final part of a previous cell with outputs?
-    unused_ouputs = set(range(n_out)).difference(outputs_map)
-    for endswith in [False, True]:
-        if not unused_ouputs:
-            return outputs_map
-
-        for i in range(n_in):
-            if outputs_map[i] is not None:
-                continue
-            cell_input = cells_inputs[i]
-            for j in unused_ouputs:
-                cell_output = cells_outputs[j]
-                if cell_input.cell_type == cell_output.cell_type and same_content(
-                    cell_output.source, cell_input.source, endswith
-                ):
-                    outputs_map[i] = j
-                    unused_ouputs.remove(j)
-                    break
+    unused_outputs_per_cell_type = {}
+    for j in sorted(unused_ouputs):
+        cell_type, text = keys_outputs[j]
+        unused_outputs_per_cell_type.setdefault(cell_type, []).append((j, text))
+    outputs_by_suffix = {cell_type: _OutputsBySuffix(outputs) for cell_type, outputs in unused_outputs_per_cell_type.items()}
+
+    for i, (cell_type, text) in enumerate(keys_inputs):
+        if outputs_map[i] is not None or cell_type not in outputs_by_suffix:
+            continue
+        if text:
+            j = outputs_by_suffix[cell_type].first_output_ending_with(text)
+        else:
+            # An empty input can only match an empty output
+            j = first_unused_output_with_key((cell_type, text))
+        if j is not None:
+            outputs_map[i] = j
+            unused_ouputs.remove(j)
+            outputs_by_suffix[cell_type].remove(j)
 
     # Fourth rule: match based on increasing index (and cell type) for non-empty cells
     if not unused_ouputs:
         return outputs_map
 
     prev_j = -1
-    for i in range(n_in):
+    for i in range(len(cells_inputs)):
         if outputs_map[i] is not None:
             prev_j = outputs_map[i]
             continue
@@ -175,3 +208,55 @@ def map_outputs_to_inputs(cells_inputs, cells_outputs):
             prev_j = j
 
     return outputs_map
+
+
+class _OutputsBySuffix:
+    """The output cells sorted on their reversed text, so that the cells that end with
+    a given text are contiguous. A segment tree gives the first of these cells."""
+
+    def __init__(self, outputs):
+        entries = sorted((text[::-1], j) for j, text in outputs)
+        self.reversed_texts = [reversed_text for reversed_text, _ in entries]
+        self.position = {j: k for k, (_, j) in enumerate(entries)}
+        self.size = 1
+        while self.size < len(entries):
+            self.size *= 2
+        self.first_output = [float("inf")] * (2 * self.size)
+        for k, (_, j) in enumerate(entries):
+            self.first_output[self.size + k] = j
+        for k in range(self.size - 1, 0, -1):
+            self.first_output[k] = min(self.first_output[2 * k], self.first_output[2 * k + 1])
+
+    def remove(self, j):
+        """Remove the output j"""
+        k = self.size + self.position[j]
+        self.first_output[k] = float("inf")
+        while k > 1:
+            k //= 2
+            self.first_output[k] = min(self.first_output[2 * k], self.first_output[2 * k + 1])
+
+    def first_output_ending_with(self, text):
+        """The first output that ends with the given text, or None"""
+        reversed_text = text[::-1]
+        start = bisect_left(self.reversed_texts, reversed_text)
+        end, upper = start, len(self.reversed_texts)
+        while end < upper:
+            middle = (end + upper) // 2
+            if self.reversed_texts[middle].startswith(reversed_text):
+                end = middle + 1
+            else:
+                upper = middle
+
+        first = float("inf")
+        start += self.size
+        end += self.size
+        while start < end:
+            if start % 2:
+                first = min(first, self.first_output[start])
+                start += 1
+            if end % 2:
+                end -= 1
+                first = min(first, self.first_output[end])
+            start //= 2
+            end //= 2
+        return None if first == float("inf") else first
@@ -13,7 +13,7 @@ from .combine import combine_inputs_with_outputs
 from .formats import check_auto_ext, long_form_one_format
 from .header import _DEFAULT_NOTEBOOK_METADATA
 from .jupytext import read, reads, write, writes
-from .metadata_filter import filter_metadata
+from .metadata_filter import compile_metadata_filter, filter_metadata
 
 _BLANK_LINE = re.compile(r"^\s*$")
 
@@ -48,11 +48,11 @@ def compare(actual, expected, actual_name="actual", expected_name="expected", re
 
 
 def filtered_cell(cell, preserve_outputs, cell_metadata_filter):
-    """Cell type, metadata and source from given cell"""
+    """Cell type, metadata and source from given cell. The cell metadata filter is a CompiledMetadataFilter"""
     filtered = {
         "cell_type": cell.cell_type,
         "source": cell.source,
-        "metadata": filter_metadata(cell.metadata, cell_metadata_filter, _IGNORE_CELL_METADATA),
+        "metadata": cell_metadata_filter.apply(cell.metadata),
     }
 
     if preserve_outputs:
@@ -186,6 +186,7 @@ def compare_cells(
 ):
     """Compare two collection of notebook cells"""
     test_cell_iter = iter(actual_cells)
+    compiled_cell_metadata_filter = compile_metadata_filter(cell_metadata_filter, _IGNORE_CELL_METADATA)
     modified_cells = set()
     modified_cell_metadata = set()
 
@@ -275,12 +276,12 @@ def compare_cells(
         ref_cell = filtered_cell(
             ref_cell,
             preserve_outputs=compare_outputs,
-            cell_metadata_filter=cell_metadata_filter,
+            cell_metadata_filter=compiled_cell_metadata_filter,
         )
         test_cell = filtered_cell(
             test_cell,
             preserve_outputs=compare_outputs,
-            cell_metadata_filter=cell_metadata_filter,
+            cell_metadata_filter=compiled_cell_metadata_filter,
         )
 
         try:
@@ -2,6 +2,8 @@
 
 import json
 import os
+import time
+from collections import OrderedDict
 from pathlib import Path
 
 try:
@@ -12,7 +14,7 @@ except ImportError:
 import warnings
 
 import yaml
-from traitlets import Bool, Dict, Enum, Float, List, Unicode, Union
+from traitlets import Bool, Dict, Enum, Float, Int, List, Unicode, Union
 from traitlets.config import Configurable
 from traitlets.config.loader import PyFileConfigLoader
 from traitlets.traitlets import TraitError
@@ -44,6 +46,16 @@ PYPROJECT_FILE = "pyproject.toml"
 
 JUPYTEXT_CEILING_DIRECTORIES = [path for path in os.environ.get("JUPYTEXT_CEILING_DIRECTORIES", "").split(":") if path]
 
+# The configuration file found in each directory, and the configuration loaded from each
+# file. The entries are validated with the modification time of the directory (or file),
+# and the least recently used entries are dropped when a cache has more than
+# _CONFIG_CACHE_SIZE entries
+_CONFIG_FILE_IN_DIRECTORY: "OrderedDict[str, tuple[tuple, typing.Optional[str]]]" = OrderedDict()
+_CONFIG_FROM_FILE: "OrderedDict[str, tuple[tuple, typing.Optional[JupytextConfiguration]]]" = OrderedDict()
+_PYPROJECT_HAS_JUPYTEXT_SECTION: "OrderedDict[str, tuple[tuple, bool]]" = OrderedDict()
+_CONFIG_CACHE_SIZE = 128
+_RECENT_MODIFICATION_NS = 2_000_000_000
+
 
 class JupytextConfiguration(Configurable):
     """Jupytext Configuration's options"""
@@ -145,6 +157,33 @@ class JupytextConfiguration(Configurable):
         config=True,
     )
 
+    cell_export_cache = Bool(
+        False,
+        help="Cache the text representation of the cells in the Jupytext contents manager, "
+        "so that only the cells that changed since the previous save are exported again "
+        "(NB: This option is ignored by Jupytext CLI)",
+        config=True,
+    )
+
+    conversion_executor = Enum(
+        values=["none", "thread", "process"],
+        default_value="none",
+        help="Where the Jupytext contents manager converts the notebooks to and from text, and "
+        "combines the paired files: in the event loop of the Jupyter server ('none'), in a pool "
+        "of threads, or in a pool of processes. With a pool, the Jupyter server remains responsive "
+        "while large notebooks are opened or saved (NB: This option is ignored by Jupytext CLI "
+        "and by the synchronous contents manager)",
+        config=True,
+    )
+
+    conversion_max_workers = Int(
+        None,
+        allow_none=True,
+        help="The maximum number of workers in the pool of threads or processes used by the "
+        "contents manager for the conversions (defaults to that of concurrent.futures)",
+        config=True,
+    )
+
     cm_config_log_level = Enum(
         values=["warning", "info", "info_if_changed", "debug", "none"],
         default_value="info_if_changed",
@@ -324,17 +363,9 @@ def find_jupytext_configuration_file(path: typing.Union[str, Path], search_paren
     path = Path(path).absolute()
 
     if path.is_dir():
-        for filename in JUPYTEXT_CONFIG_FILES:
-            full_path = path / filename
-            if full_path.is_file():
-                return str(full_path)
-
-    pyproject_path = path / PYPROJECT_FILE
-    if pyproject_path.is_file():
-        with pyproject_path.open() as stream:
-            doc = tomllib.loads(stream.read())
-            if doc.get("tool", {}).get("jupytext") is not None:
-                return str(pyproject_path)
+        config_file = find_jupytext_configuration_file_in_directory(path)
+        if config_file:
+            return config_file
 
     if not search_parent_dirs:
         return None
@@ -351,6 +382,78 @@ def find_jupytext_configuration_file(path: typing.Union[str, Path], search_paren
     return find_jupytext_configuration_file(parent_dir, True)
 
 
+def _signature(path):
+    """The modification time and size of a file or directory, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _can_be_cached(*signatures):
+    """A recent modification might be followed by another one with the same
+    modification time, so we only cache the files that were not modified recently"""
+    recent = time.time_ns() - _RECENT_MODIFICATION_NS
+    return all(signature is None or signature[0] < recent for signature in signatures)
+
+
+def _get_cached(cache, key, signature):
+    """Return the (found, value) pair for that key, if its signature did not change"""
+    cached = cache.get(key)
+    if cached is None or cached[0] != signature:
+        return False, None
+    cache.move_to_end(key)
+    return True, cached[1]
+
+
+def _set_cached(cache, key, signature, value):
+    cache[key] = signature, value
+    cache.move_to_end(key)
+    while len(cache) > _CONFIG_CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+def _pyproject_has_jupytext_section(pyproject_path):
+    signature = _signature(pyproject_path)
+    if signature is None:
+        return False
+    found, has_jupytext_section = _get_cached(_PYPROJECT_HAS_JUPYTEXT_SECTION, str(pyproject_path), signature)
+    if found:
+        return has_jupytext_section
+
+    with pyproject_path.open() as stream:
+        doc = tomllib.loads(stream.read())
+    has_jupytext_section = doc.get("tool", {}).get("jupytext") is not None
+    if _can_be_cached(signature):
+        _set_cached(_PYPROJECT_HAS_JUPYTEXT_SECTION, str(pyproject_path), signature, has_jupytext_section)
+    return has_jupytext_section
+
+
+def find_jupytext_configuration_file_in_directory(path: Path) -> typing.Optional[str]:
+    """Return the jupytext configuration file in this directory, if any. The result is
+    cached until the directory or its pyproject.toml file are modified."""
+    pyproject_path = path / PYPROJECT_FILE
+    signature = (_signature(path), _signature(pyproject_path))
+    found, config_file = _get_cached(_CONFIG_FILE_IN_DIRECTORY, str(path), signature)
+    if found:
+        return config_file
+
+    config_file = None
+    for filename in JUPYTEXT_CONFIG_FILES:
+        full_path = path / filename
+        if full_path.is_file():
+            config_file = str(full_path)
+            break
+    else:
+        if pyproject_path.is_file() and _pyproject_has_jupytext_section(pyproject_path):
+            config_file = str(pyproject_path)
+
+    if _can_be_cached(*signature):
+        _set_cached(_CONFIG_FILE_IN_DIRECTORY, str(path), signature, config_file)
+    return config_file
+
+
 def parse_jupytext_configuration_file(jupytext_config_file, stream=None):
     """Read a Jupytext config file, and return a dict"""
     if not jupytext_config_file.endswith(".py") and stream is None:
@@ -414,7 +517,23 @@ def normalize_formats(formats) -> list[str]:
 
 
 def load_jupytext_configuration_file(config_file, stream=None):
-    """Read and validate a Jupytext configuration file, and return a JupytextConfiguration object"""
+    """Read and validate a Jupytext configuration file, and return a JupytextConfiguration object.
+    When no stream is given, the configuration is cached until the file is modified, and the
+    same object is returned to all the callers, so it must not be modified."""
+    if stream is None:
+        signature = _signature(config_file)
+        found, config = _get_cached(_CONFIG_FROM_FILE, config_file, signature)
+        if found:
+            return config
+        config = _load_jupytext_configuration_file(config_file)
+        if _can_be_cached(signature):
+            _set_cached(_CONFIG_FROM_FILE, config_file, signature, config)
+        return config
+
+    return _load_jupytext_configuration_file(config_file, stream)
+
+
+def _load_jupytext_configuration_file(config_file, stream=None):
     config_dict = parse_jupytext_configuration_file(config_file, stream)
     config = validate_jupytext_configuration_file(config_file, config_dict)
     config.formats = normalize_formats(config.formats or config.default_jupytext_formats)
@@ -425,13 +544,13 @@ def load_jupytext_configuration_file(config_file, stream=None):
 
 
 def load_jupytext_config(nb_file):
-    """Return the jupytext configuration file in the same folder, or in a parent folder, of the current file, if any"""
+    """Return the jupytext configuration file in the same folder, or in a parent folder, of the current file, if any.
+    The configuration is cached, and must not be modified by the caller"""
     config_file = find_jupytext_configuration_file(nb_file)
     if config_file is None:
         return None
     if os.path.isfile(nb_file) and os.path.samefile(config_file, nb_file):
         return None
-    config_file = find_jupytext_configuration_file(nb_file)
     return load_jupytext_configuration_file(config_file)
 
 
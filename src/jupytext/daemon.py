@@ -0,0 +1,341 @@
+"""A long-lived Jupytext process that runs the jupytext commands sent by the
+jupytext CLI, so that these commands do not pay for the Python start-up time,
+for the imports, or for loading the configuration files and parsing the notebooks
+again.
+
+The daemon is started with 'jupytext --daemon', and listens on a Unix socket,
+or on stdin/stdout with 'jupytext --daemon -'. The requests and the responses are
+JSON-RPC 2.0 messages, one per line, e.g.
+
+    {"jsonrpc": "2.0", "id": 1, "method": "jupytext", "params": {"args": ["--sync", "nb.ipynb"], "cwd": "/path"}}
+    {"jsonrpc": "2.0", "id": 1, "result": {"exit_code": 0, "stdout": "...", "stderr": "..."}}
+
+The commands are run one at a time, in the directory and with the environment
+variables given by the client. The daemon only accepts commands from clients that
+run the same Python executable, and the clients only send commands to a socket
+that belongs to the current user and that other users cannot access.
+
+This module only imports the standard library at the top level, as the client
+functions are called before any notebook is processed."""
+
+import json
+import os
+import socket
+import stat
+import sys
+import tempfile
+import traceback
+
+from .version import __version__
+
+# Set this environment variable to use another socket than the default one
+JUPYTEXT_DAEMON_SOCKET = "JUPYTEXT_DAEMON_SOCKET"
+
+# JSON-RPC error codes
+_PARSE_ERROR = -32700
+_METHOD_NOT_FOUND = -32601
+_INVALID_PARAMS = -32602
+
+
+def daemon_socket_path():
+    """The path to the Unix socket of the Jupytext daemon"""
+    path = os.environ.get(JUPYTEXT_DAEMON_SOCKET)
+    if path:
+        return path
+    # The runtime directory is private to the user
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "jupytext-daemon.sock")
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "")
+    return os.path.join(tempfile.gettempdir(), f"jupytext-daemon-{user}.sock")
+
+
+class DaemonShutdown(Exception):
+    """Raised when the daemon is asked to stop"""
+
+
+def run_jupytext_command(args, cwd=None, env=None):
+    """Run the jupytext command in the given directory and with the given environment
+    variables, and return the exit code, the standard output and the standard error
+    of that command"""
+    import warnings
+    from contextlib import redirect_stderr, redirect_stdout
+    from io import BytesIO, StringIO, TextIOWrapper
+
+    from .cli import jupytext
+    from .parse_cache import JUPYTEXT_PARSE_CACHE_DIR, get_parse_cache
+    from .pipe_adapters import clear_pipe_adapter_cache
+
+    # The standard output has a buffer, as notebooks written to '-' are written as bytes
+    out = TextIOWrapper(BytesIO(), encoding="utf-8", write_through=True)
+    err = TextIOWrapper(BytesIO(), encoding="utf-8", write_through=True)
+    current_dir = os.getcwd()
+    # The commands run by the daemon cannot read from stdin
+    stdin = sys.stdin
+    sys.stdin = StringIO()
+    environ = dict(os.environ)
+    parse_cache = get_parse_cache()
+    parse_cache_dir = parse_cache.cache_dir if parse_cache is not None else None
+    try:
+        if cwd:
+            os.chdir(cwd)
+        if env is not None:
+            os.environ.clear()
+            os.environ.update(env)
+            if parse_cache is not None:
+                # The notebooks are stored on disk where the client expects them
+                parse_cache.cache_dir = os.environ.get(JUPYTEXT_PARSE_CACHE_DIR)
+        # The adapters of the --pipe commands read the configuration of the project
+        clear_pipe_adapter_cache()
+        # Warnings are shown once per command, as in a new process
+        with warnings.catch_warnings(), redirect_stdout(out), redirect_stderr(err):
+            try:
+                exit_code = jupytext(args)
+            except SystemExit as system_exit:
+                if system_exit.code is None or isinstance(system_exit.code, int):
+                    exit_code = system_exit.code or 0
+                else:
+                    sys.stderr.write(f"{system_exit.code}\n")
+                    exit_code = 1
+            except Exception:
+                sys.stderr.write(traceback.format_exc())
+                exit_code = 1
+    finally:
+        sys.stdin = stdin
+        os.chdir(current_dir)
+        if env is not None:
+            os.environ.clear()
+            os.environ.update(environ)
+            if parse_cache is not None:
+                parse_cache.cache_dir = parse_cache_dir
+
+    return {
+        "exit_code": exit_code,
+        "stdout": out.buffer.getvalue().decode("utf-8"),
+        "stderr": err.buffer.getvalue().decode("utf-8"),
+    }
+
+
+def handle_request(line):
+    """Return the response to a JSON-RPC request. Raise DaemonShutdown on a 'shutdown' request"""
+    try:
+        request = json.loads(line)
+    except ValueError as err:
+        return _error(None, _PARSE_ERROR, str(err))
+    if not isinstance(request, dict):
+        return _error(None, _PARSE_ERROR, "Expected a JSON object")
+
+    request_id = request.get("id")
+    method = request.get("method")
+    params = request.get("params") or {}
+    if not isinstance(params, dict):
+        return _error(request_id, _INVALID_PARAMS, "Expected a JSON object in 'params'")
+
+    if method == "shutdown":
+        raise DaemonShutdown(json.dumps({"jsonrpc": "2.0", "id": request_id, "result": None}))
+
+    if method == "version":
+        return json.dumps({"jsonrpc": "2.0", "id": request_id, "result": __version__})
+
+    if method != "jupytext":
+        return _error(request_id, _METHOD_NOT_FOUND, f"Unknown method {method}")
+
+    args = params.get("args")
+    if not isinstance(args, list) or not all(isinstance(arg, str) for arg in args):
+        return _error(request_id, _INVALID_PARAMS, "Expected a list of arguments in 'args'")
+    if params.get("version", __version__) != __version__:
+        return _error(
+            request_id,
+            _INVALID_PARAMS,
+            f"The daemon runs Jupytext {__version__}, not {params['version']}",
+        )
+    if params.get("executable", sys.executable) != sys.executable:
+        return _error(
+            request_id,
+            _INVALID_PARAMS,
+            f"The daemon runs {sys.executable}, not {params['executable']}",
+        )
+    env = params.get("env")
+    if env is not None and (
+        not isinstance(env, dict) or not all(isinstance(key, str) and isinstance(value, str) for key, value in env.items())
+    ):
+        return _error(request_id, _INVALID_PARAMS, "Expected a JSON object with string values in 'env'")
+
+    result = run_jupytext_command(args, params.get("cwd"), env)
+    return json.dumps({"jsonrpc": "2.0", "id": request_id, "result": result})
+
+
+def _error(request_id, code, message):
+    return json.dumps({"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}})
+
+
+def _warm_up():
+    """Import the modules used by the CLI"""
+    # The CLI imports most of these modules in the functions that use them
+    from . import cli, combine, compare, jupytext, kernels, signatures, sync_pairs  # noqa: F401
+
+
+def _parse_cache():
+    """A context in which the parse cache is enabled, unless a cache is already enabled.
+    The previous cache (or the absence of cache) is restored when the daemon stops"""
+    from contextlib import nullcontext
+
+    from .parse_cache import enable_parse_cache, get_parse_cache
+
+    cache = get_parse_cache()
+    return nullcontext(cache) if cache is not None else enable_parse_cache()
+
+
+def serve_stdio(stdin=None, stdout=None):
+    """Serve the requests read from stdin (one per line) until the end of the input,
+    or until a 'shutdown' request is received"""
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    _warm_up()
+    with _parse_cache():
+        for line in stdin:
+            if not line.strip():
+                continue
+            try:
+                response = handle_request(line)
+            except DaemonShutdown as shutdown:
+                stdout.write(str(shutdown) + "\n")
+                stdout.flush()
+                return 0
+            stdout.write(response + "\n")
+            stdout.flush()
+        return 0
+
+
+def serve_socket(path=None, log=None):
+    """Serve the requests sent on the Unix socket at the given path,
+    until a 'shutdown' request is received"""
+    if not hasattr(socket, "AF_UNIX"):
+        raise ValueError("Unix sockets are not available on this platform. Please use 'jupytext --daemon -'")
+
+    path = path or daemon_socket_path()
+    if os.path.exists(path):
+        client = _connect(path)
+        if client is not None:
+            client.close()
+            raise ValueError(f"A Jupytext daemon is already listening on {path}")
+        # A socket left by a daemon that did not stop properly
+        os.remove(path)
+
+    _warm_up()
+    with _parse_cache():
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            # The socket is created with no access for the other users
+            umask = os.umask(0o177)
+            try:
+                server.bind(path)
+            finally:
+                os.umask(umask)
+            server.listen()
+            if log is not None:
+                log(f"[jupytext] Daemon listening on {path}")
+
+            while True:
+                connection, _ = server.accept()
+                try:
+                    with connection, connection.makefile("rw", encoding="utf-8", newline="\n") as stream:
+                        for line in stream:
+                            if not line.strip():
+                                continue
+                            try:
+                                response = handle_request(line)
+                            except DaemonShutdown as shutdown:
+                                stream.write(str(shutdown) + "\n")
+                                stream.flush()
+                                return 0
+                            stream.write(response + "\n")
+                            stream.flush()
+                except OSError:
+                    # The client disconnected
+                    continue
+        finally:
+            server.close()
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _connect(path, timeout=1.0):
+    """Return a socket connected to the daemon, or None if no daemon listens on that path"""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(timeout)
+    try:
+        client.connect(path)
+    except OSError:
+        client.close()
+        return None
+    # The commands may take some time to complete
+    client.settimeout(None)
+    return client
+
+
+def _is_private_socket(path):
+    """Is this a socket that belongs to the current user, and that only this user can access?"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid() and stat.S_IMODE(st.st_mode) == 0o600
+
+
+def send_request(method, params=None, path=None):
+    """Send a request to the daemon and return the response,
+    or None if no daemon is listening on the socket, or if the socket
+    does not belong to the current user"""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    path = path or daemon_socket_path()
+    if not _is_private_socket(path):
+        return None
+    client = _connect(path)
+    if client is None:
+        return None
+
+    request = {"jsonrpc": "2.0", "id": 1, "method": method}
+    if params is not None:
+        request["params"] = params
+    with client, client.makefile("rw", encoding="utf-8", newline="\n") as stream:
+        stream.write(json.dumps(request) + "\n")
+        stream.flush()
+        line = stream.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+def forward_to_daemon(args, path=None):
+    """Run the jupytext command in the daemon, if one is running, and return its exit code.
+    Return None if the command could not be run by the daemon."""
+    try:
+        response = send_request(
+            "jupytext",
+            {
+                "args": list(args),
+                "cwd": os.getcwd(),
+                "env": dict(os.environ),
+                "executable": sys.executable,
+                "version": __version__,
+            },
+            path=path,
+        )
+    except (OSError, ValueError):
+        return None
+    if not response or "result" not in response:
+        return None
+
+    result = response["result"]
+    for stream, text in [(sys.stdout, result["stdout"]), (sys.stderr, result["stderr"])]:
+        if not text:
+            continue
+        stream.flush()
+        try:
+            stream.buffer.write(text.encode("utf-8"))
+            stream.buffer.flush()
+        except AttributeError:
+            stream.write(text)
+    return result["exit_code"]
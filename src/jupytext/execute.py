@@ -0,0 +1,324 @@
+"""Execute the notebooks of a jupytext --execute run on a pool of kernels"""
+
+import glob
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+
+# The execution cache is limited to this size (in bytes) unless another size is given
+DEFAULT_EXECUTION_CACHE_SIZE = 512 * 2**20
+
+# Increase this number when the content of the entries of the execution cache changes
+_EXECUTION_CACHE_VERSION = 1
+
+
+class NotebookExecutionTimeout(TimeoutError):
+    """The execution of a notebook did not complete in the allowed time"""
+
+
+class ExecutionReport:
+    """The outcome of the execution of a notebook"""
+
+    def __init__(self, nb_file, kernel_name, duration, error=None, cached=False):
+        self.nb_file = nb_file
+        self.kernel_name = kernel_name
+        self.duration = duration
+        self.error = error
+        self.cached = cached
+
+    @property
+    def failed(self):
+        return self.error is not None
+
+
+class ExecutionCache:
+    """An on-disk cache for the outputs of the notebooks executed by Jupytext.
+
+    The cache is keyed on the source of the code cells, the kernel name, the
+    directory in which the notebook is executed, and the content of the data files
+    that match the 'dependencies' patterns (relative to that directory). The entries
+    are stored in cache_dir. When the cache is larger than max_size bytes, the entries
+    that were used least recently are removed.
+    """
+
+    def __init__(self, cache_dir, max_size=DEFAULT_EXECUTION_CACHE_SIZE, dependencies=()):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.dependencies = list(dependencies)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, notebook, kernel_name=None, path=None):
+        """The cache key for the execution of this notebook"""
+        run_path = os.path.abspath(path or os.getcwd())
+        data_files = []
+        for pattern in self.dependencies:
+            matches = sorted(glob.glob(os.path.join(run_path, pattern), recursive=True))
+            data_files.append(
+                [pattern, [[os.path.relpath(file, run_path), _file_hash(file)] for file in matches if os.path.isfile(file)]]
+            )
+
+        context = json.dumps(
+            [
+                _EXECUTION_CACHE_VERSION,
+                kernel_name,
+                run_path,
+                data_files,
+                [cell.source for cell in notebook.cells if cell.cell_type == "code"],
+            ]
+        )
+        return hashlib.sha256(context.encode("utf-8")).hexdigest()
+
+    def restore(self, key, notebook):
+        """Copy the cached outputs into the notebook, and return True on a hit"""
+        import nbformat
+
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as fp:
+                entry = json.load(fp)
+        except (OSError, ValueError):
+            self.misses += 1
+            return False
+
+        code_cells = [cell for cell in notebook.cells if cell.cell_type == "code"]
+        if len(code_cells) != len(entry["cells"]):
+            self.misses += 1
+            return False
+
+        for cell, cached in zip(code_cells, entry["cells"]):
+            cell.outputs = [nbformat.from_dict(output) for output in cached["outputs"]]
+            cell.execution_count = cached["execution_count"]
+        if entry.get("language_info"):
+            notebook.metadata["language_info"] = nbformat.from_dict(entry["language_info"])
+
+        try:
+            # The most recently used entries are kept when the cache is full
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return True
+
+    def put(self, key, notebook):
+        """Store the outputs of the executed notebook"""
+        entry = {
+            "cells": [
+                {"outputs": cell.outputs, "execution_count": cell.execution_count}
+                for cell in notebook.cells
+                if cell.cell_type == "code"
+            ],
+            "language_info": notebook.metadata.get("language_info"),
+        }
+        path = self._path(key)
+        tmp_path = path + f".tmp_{os.getpid()}"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as fp:
+                json.dump(entry, fp)
+            os.replace(tmp_path, path)
+        except OSError:
+            # The notebook was executed, caching its outputs is optional
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries until the cache is smaller than max_size"""
+        entries = []
+        for path in glob.glob(os.path.join(self.cache_dir, "*", "*.json")):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # Another process may have removed that entry
+                pass
+            total -= size
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+
+def _file_hash(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(2**20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class KernelPool:
+    """The kernels used to execute notebooks in this process.
+
+    The pool keeps at most one kernel per kernel name and working directory.
+    When a notebook has been executed successfully, and more notebooks are expected,
+    its kernel is restarted (the kernel process is replaced, but the kernel manager,
+    the connection file and the ports are kept) and is used by the next notebook with
+    the same kernel and working directory. The kernel of a notebook that failed or
+    timed out is shut down.
+
+    When an execution cache is given, the notebooks found in the cache are not executed,
+    instead their outputs are restored from the cache."""
+
+    def __init__(self, notebooks_left=0, cache=None):
+        self.notebooks_left = notebooks_left
+        self.cache = cache
+        self.kernels = {}
+        self.reports = []
+
+    def _kernel_manager(self, kernel_name, path):
+        """A kernel that is alive, either from the pool or a new one"""
+        km = self.kernels.pop((kernel_name, path), None)
+        if km is not None:
+            if km.is_alive():
+                return km
+            self._shutdown(km)
+
+        from jupyter_client.manager import KernelManager
+
+        km = KernelManager(kernel_name=kernel_name) if kernel_name else KernelManager()
+        km.start_kernel(**({"cwd": path} if path else {}))
+        return km
+
+    def _release(self, kernel_name, path, km):
+        """Keep the kernel for the next notebook if any, or shut it down"""
+        key = (kernel_name, path)
+        if self.notebooks_left <= 0 or key in self.kernels:
+            self._shutdown(km)
+            return
+        try:
+            km.restart_kernel(now=True)
+        except Exception:
+            self._shutdown(km)
+            return
+        self.kernels[key] = km
+
+    @staticmethod
+    def _wait_for_ready(km, startup_timeout):
+        """Wait until the kernel replies to a kernel_info request"""
+        kc = km.client()
+        kc.start_channels()
+        try:
+            kc.wait_for_ready(timeout=startup_timeout)
+        finally:
+            kc.stop_channels()
+
+    @staticmethod
+    def _stop_client(exec_proc):
+        """The kernel client is not stopped by nbclient when the kernel manager is ours"""
+        kc = getattr(exec_proc, "kc", None)
+        if kc is not None:
+            kc.stop_channels()
+            exec_proc.kc = None
+
+    @staticmethod
+    def _shutdown(km):
+        try:
+            km.shutdown_kernel(now=True)
+        except Exception:
+            pass
+
+    def execute(self, notebook, kernel_name=None, path=None, nb_file=None, timeout=None):
+        """Execute the notebook in place and return an ExecutionReport. The execution is interrupted
+        after 'timeout' seconds, in which case a NotebookExecutionTimeout error is raised."""
+        from nbconvert.preprocessors import ExecutePreprocessor
+
+        self.notebooks_left = max(self.notebooks_left - 1, 0)
+        cache_key = None
+        if self.cache is not None:
+            start = time.perf_counter()
+            cache_key = self.cache.key(notebook, kernel_name, path)
+            if self.cache.restore(cache_key, notebook):
+                report = ExecutionReport(nb_file, kernel_name, time.perf_counter() - start, cached=True)
+                self.reports.append(report)
+                return report
+
+        km = self._kernel_manager(kernel_name, path)
+
+        timed_out = threading.Event()
+        timer = None
+        start = time.perf_counter()
+        # The cell timeout of nbclient (an integer) is a backstop for the notebook timeout
+        exec_proc = ExecutePreprocessor(timeout=math.ceil(timeout) if timeout else None, kernel_name=kernel_name or "")
+        try:
+            if timeout:
+                # The start-up time of the kernel does not count in the timeout
+                self._wait_for_ready(km, exec_proc.startup_timeout)
+
+                def interrupt():
+                    timed_out.set()
+                    km.interrupt_kernel()
+
+                timer = threading.Timer(timeout, interrupt)
+                timer.daemon = True
+                timer.start()
+
+            exec_proc.preprocess(notebook, resources={"metadata": {"path": path}} if path else {}, km=km)
+        except BaseException as err:
+            self._stop_client(exec_proc)
+            if timer is not None:
+                timer.cancel()
+            self._shutdown(km)
+            duration = time.perf_counter() - start
+            if timed_out.is_set() or isinstance(err, TimeoutError):
+                timeout_err = NotebookExecutionTimeout(
+                    f"The execution of {nb_file or 'the notebook'} did not complete in {timeout} seconds"
+                )
+                self.reports.append(ExecutionReport(nb_file, kernel_name, duration, str(timeout_err)))
+                raise timeout_err from err
+            self.reports.append(ExecutionReport(nb_file, kernel_name, duration, f"{type(err).__name__}: {err}"))
+            raise
+
+        if timer is not None:
+            timer.cancel()
+        self._stop_client(exec_proc)
+        report = ExecutionReport(nb_file, kernel_name, time.perf_counter() - start)
+        self.reports.append(report)
+        self._release(kernel_name, path, km)
+        if cache_key is not None:
+            self.cache.put(cache_key, notebook)
+        return report
+
+    def skip(self, nb_file=None, kernel_name=None):
+        """Record a notebook that did not need to be executed"""
+        self.notebooks_left = max(self.notebooks_left - 1, 0)
+        report = ExecutionReport(nb_file, kernel_name, 0.0)
+        self.reports.append(report)
+        return report
+
+    def close(self):
+        """Shut down the kernels of the pool"""
+        kernels, self.kernels = self.kernels, {}
+        for km in kernels.values():
+            self._shutdown(km)
+
+
+def execution_summary(reports):
+    """A summary of the execution of the notebooks, and the list of the notebooks that failed"""
+    failed = [report for report in reports if report.failed]
+    total = sum(report.duration for report in reports)
+    lines = [
+        f"[jupytext] Executed {len(reports)} notebook{'s' if len(reports) > 1 else ''} in {total:.1f}s: "
+        f"{len(reports) - len(failed)} succeeded, {len(failed)} failed"
+    ]
+    cached = sum(report.cached for report in reports)
+    if cached:
+        lines[0] += f" ({cached} restored from the execution cache)"
+    for report in failed:
+        # The last line of the error is enough here, the full error was shown before
+        error = report.error.strip().splitlines()[-1] if report.error.strip() else report.error
+        lines.append(f"[jupytext]   {report.nb_file}: {error}")
+    return lines
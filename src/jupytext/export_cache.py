@@ -0,0 +1,77 @@
+"""An opt-in cache for the text representation of the cells, used by the
+contents manager to save notebooks in which only a few cells have changed"""
+
+import hashlib
+import json
+from copy import copy
+
+
+class CellExportCache:
+    """The text representation of the cells of a notebook in a given format.
+
+    The cache is keyed on the hash of the cell type, source and metadata, of the default
+    language, and of the format options. It stores the cell exporter (after the call to
+    cell_to_text) and the cell text, i.e. the part of the export that does not depend
+    on the neighbouring cells. The blank lines between cells and the end-of-cell markers
+    are always recomputed, so the text of the notebook is the same as without the cache.
+
+    Only the cells used by the most recent export are kept in the cache.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        # The hits and misses of the most recent export
+        self.last_hits = 0
+        self.last_misses = 0
+        self._hits_before_export = 0
+        self._misses_before_export = 0
+        self._exports = {}
+        self._current_exports = {}
+
+    @staticmethod
+    def format_signature(fmt):
+        """A string that represents the format options"""
+        return json.dumps(fmt, sort_keys=True, default=str)
+
+    def key(self, exporter_class, cell, default_language, format_signature):
+        """The cache key for that cell"""
+        cell_signature = json.dumps(
+            [exporter_class.__name__, cell.cell_type, cell.source, cell.metadata, default_language],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256((format_signature + "\n" + cell_signature).encode("utf-8")).hexdigest()
+
+    def export_cell(self, exporter_class, cell, default_language, fmt, format_signature, unsupported_keys=None):
+        """Return a cell exporter on which cell_to_text was called, and the cell text"""
+        key = self.key(exporter_class, cell, default_language, format_signature)
+        cached = self._current_exports.get(key) or self._exports.get(key)
+        if cached is None:
+            self.misses += 1
+            cell_unsupported_keys = set()
+            exporter = exporter_class(cell, default_language, fmt, unsupported_keys=cell_unsupported_keys)
+            cached = exporter, exporter.cell_to_text(), cell_unsupported_keys
+        else:
+            self.hits += 1
+
+        self._current_exports[key] = cached
+        exporter, text, cell_unsupported_keys = cached
+        if isinstance(unsupported_keys, set):
+            unsupported_keys.update(cell_unsupported_keys)
+
+        # The exporter and the text are modified when the cells are concatenated
+        return copy(exporter), list(text)
+
+    def end_export(self):
+        """Forget the cells that were not used by the last export"""
+        self.last_hits = self.hits - self._hits_before_export
+        self.last_misses = self.misses - self._misses_before_export
+        self._hits_before_export = self.hits
+        self._misses_before_export = self.misses
+        self._exports = self._current_exports
+        self._current_exports = {}
+
+    def stats(self):
+        """The number of hits, misses, and of cells in the cache"""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._exports)}
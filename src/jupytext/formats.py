@@ -6,6 +6,7 @@ new formats here!
 import os
 import re
 import warnings
+from copy import deepcopy
 
 import nbformat
 import yaml
@@ -29,7 +30,7 @@ from .cell_to_text import (
     RScriptCellExporter,
     SphinxGalleryCellExporter,
 )
-from .header import header_to_metadata_and_cell, insert_or_test_version_number
+from .header import TextDocument, insert_or_test_version_number
 from .languages import _COMMENT_CHARS, _SCRIPT_EXTENSIONS, same_language
 from .magics import is_magic
 from .metadata_filter import metadata_filter_as_string
@@ -269,10 +270,11 @@ def get_format_implementation(ext, format_name=None):
     raise JupytextFormatError(f"No format associated to extension '{ext}'")
 
 
-def read_metadata(text, ext):
+def read_metadata(text, ext, document=None):
     """Return the header metadata"""
     ext = "." + ext.split(".")[-1]
-    lines = text.splitlines()
+    if document is None:
+        document = TextDocument(text)
 
     if ext in [".md", ".markdown", ".Rmd"]:
         comment = comment_suffix = ""
@@ -280,9 +282,9 @@ def read_metadata(text, ext):
         comment = _SCRIPT_EXTENSIONS.get(ext, {}).get("comment", "#")
         comment_suffix = _SCRIPT_EXTENSIONS.get(ext, {}).get("comment_suffix", "")
 
-    metadata, _, _, _ = header_to_metadata_and_cell(lines, comment, comment_suffix, ext)
+    metadata, _, _, _ = document.header(comment, comment_suffix, ext)
     if ext in [".r", ".R"] and not metadata:
-        metadata, _, _, _ = header_to_metadata_and_cell(lines, "#'", "", ext)
+        metadata, _, _, _ = document.header("#'", "", ext)
 
     # metadata in MyST format may be at root level (i.e. not caught above)
     if not metadata and ext in myst_extensions() and text.startswith("---"):
@@ -296,16 +298,44 @@ def read_metadata(text, ext):
     return metadata
 
 
-def read_format_from_metadata(text, ext):
+def read_format_from_metadata(text, ext, metadata=None):
     """Return the format of the file, when that information is available from the metadata"""
-    metadata = read_metadata(text, ext)
+    metadata = read_metadata(text, ext) if metadata is None else deepcopy(metadata)
     rearrange_jupytext_metadata(metadata)
     return format_name_for_ext(metadata, ext, explicit_default=False)
 
 
-def guess_format(text, ext):
-    """Guess the format and format options of the file, given its extension and content"""
-    metadata = read_metadata(text, ext)
+# The fused regular expression that classifies the lines of a script, per extension
+_CELL_MARKERS_RE = {}
+
+
+def cell_markers_re(ext):
+    """Return a regular expression that tells which cell marker, if any, starts a line
+    of a script with that extension. The alternatives are ordered by priority, as
+    in guess_format, and the name of the group that matches is the marker kind."""
+    if ext not in _CELL_MARKERS_RE:
+        comment = re.escape(_SCRIPT_EXTENSIONS[ext]["comment"])
+        # Don't count escaped Jupyter magics (no space between %% and command) as cells
+        alternatives = [rf"(?P<percent>{comment}( %%|%%)(\s|$)|{comment}( <codecell>| In\[[0-9 ]*\]:?))"]
+        if ext == ".py":
+            alternatives.append(r"(?P<marimo>import marimo\Z|app = marimo\.App\(\)\Z|@app.cell)")
+        alternatives.append(rf"(?P<vim>{comment}\s*\{{\{{\{{)")
+        alternatives.append(rf"(?P<vscode>{comment}\s*region)")
+        if ext == ".py":
+            alternatives.append(r"(?P<sphinx>#( |)#{19,}\s*$)")
+        if ext in [".R", ".r"]:
+            alternatives.append(r"(?P<spin>#')")
+        _CELL_MARKERS_RE[ext] = re.compile("|".join(alternatives))
+    return _CELL_MARKERS_RE[ext]
+
+
+def guess_format(text, ext, lines=None, metadata=None):
+    """Guess the format and format options of the file, given its extension and content.
+    The lines of the text, and the header metadata, can be passed if already available."""
+    document = TextDocument(text, lines)
+    lines = document.lines
+    if metadata is None:
+        metadata = read_metadata(text, ext, document)
 
     if "text_representation" in metadata.get("jupytext", {}):
         return format_name_for_ext(metadata, ext), {}
@@ -313,76 +343,56 @@ def guess_format(text, ext):
     if is_myst_available() and ext in myst_extensions() and matches_mystnb(text, ext, requires_meta=False):
         return MYST_FORMAT_NAME, {}
 
-    lines = text.splitlines()
-
     # Is this a Hydrogen-like script?
     # Or a Sphinx-gallery script?
     if ext in _SCRIPT_EXTENSIONS:
         unescaped_comment = _SCRIPT_EXTENSIONS[ext]["comment"]
-        comment = re.escape(unescaped_comment)
         language = _SCRIPT_EXTENSIONS[ext]["language"]
-        twenty_hash_re = re.compile(r"^#( |)#{19,}\s*$")
-        double_percent_re = re.compile(rf"^{comment}( %%|%%)$")
-        double_percent_and_space_re = re.compile(rf"^{comment}( %%|%%)\s")
-        nbconvert_script_re = re.compile(rf"^{comment}( <codecell>| In\[[0-9 ]*\]:?)")
-        vim_folding_markers_re = re.compile(rf"^{comment}\s*" + "{{{")
-        vscode_folding_markers_re = re.compile(rf"^{comment}\s*region")
-        marimo_cell_re = re.compile(r"^@app.cell.*")
-
-        twenty_hash_count = 0
-        double_percent_count = 0
-        magic_command_count = 0
-        rspin_comment_count = 0
-        vim_folding_markers_count = 0
-        vscode_folding_markers_count = 0
-        marimo_app_count = 0
+        match_cell_marker = cell_markers_re(ext).match
+        counts = dict.fromkeys(["percent", "marimo", "vim", "vscode", "sphinx", "spin"], 0)
+        has_magic_commands = False
 
         parser = StringParser(language="R" if ext in [".r", ".R"] else "python")
         for line in lines:
-            parser.read_line(line)
-            if parser.is_quoted():
-                continue
-
-            # Don't count escaped Jupyter magics (no space between %% and command) as cells
-            if double_percent_re.match(line) or double_percent_and_space_re.match(line) or nbconvert_script_re.match(line):
-                double_percent_count += 1
-
-            if not line.startswith(unescaped_comment) and is_magic(line, language):
-                magic_command_count += 1
-
-            if twenty_hash_re.match(line) and ext == ".py":
-                twenty_hash_count += 1
-
-            if line.startswith("#'") and ext in [".R", ".r"]:
-                rspin_comment_count += 1
-
-            if vim_folding_markers_re.match(line):
-                vim_folding_markers_count += 1
+            # The parser state only changes on lines that have quotes
+            if parser.is_quoted() or "'" in line or '"' in line:
+                parser.read_line(line)
+                if parser.is_quoted():
+                    continue
+
+            if not has_magic_commands and not line.startswith(unescaped_comment) and is_magic(line, language):
+                has_magic_commands = True
+                if counts["percent"]:
+                    break
 
-            if vscode_folding_markers_re.match(line):
-                vscode_folding_markers_count += 1
+            if counts["percent"]:
+                # The verdict is either percent or hydrogen, depending on magic commands
+                continue
 
-            if ext == ".py" and (line in {"import marimo", "app = marimo.App()"} or marimo_cell_re.match(line)):
-                marimo_app_count += 1
+            marker = match_cell_marker(line)
+            if marker:
+                counts[marker.lastgroup] += 1
+                if marker.lastgroup == "percent" and has_magic_commands:
+                    break
 
-        if double_percent_count >= 1:
-            if magic_command_count:
+        if counts["percent"] >= 1:
+            if has_magic_commands:
                 return "hydrogen", {}
             return "percent", {}
 
-        if marimo_app_count >= 2:
+        if counts["marimo"] >= 2:
             return "marimo", {}
 
-        if vim_folding_markers_count:
+        if counts["vim"]:
             return "light", {"cell_markers": "{{{,}}}"}
 
-        if vscode_folding_markers_count:
+        if counts["vscode"]:
             return "light", {"cell_markers": "region,endregion"}
 
-        if twenty_hash_count >= 2:
+        if counts["sphinx"] >= 2:
             return "sphinx", {}
 
-        if rspin_comment_count >= 1:
+        if counts["spin"] >= 1:
             return "spin", {}
 
     if ext in [".md", ".markdown"]:
@@ -394,7 +404,7 @@ def guess_format(text, ext):
     return get_format_implementation(ext).format_name, {}
 
 
-def divine_format(text):
+def divine_format(text, document=None):
     """Guess the format of the notebook, based on its content #148"""
     try:
         nbformat.reads(text, as_version=4)
@@ -402,19 +412,21 @@ def divine_format(text):
     except nbformat.reader.NotJSONError:
         pass
 
-    lines = text.splitlines()
+    if document is None:
+        document = TextDocument(text)
+    lines = document.lines
     for comment in ["", "#"] + _COMMENT_CHARS:
-        metadata, _, _, _ = header_to_metadata_and_cell(lines, comment, "")
+        metadata, _, _, _ = document.header(comment, "")
         ext = metadata.get("jupytext", {}).get("text_representation", {}).get("extension")
         if ext:
-            return ext[1:] + ":" + guess_format(text, ext)[0]
+            return ext[1:] + ":" + guess_format(text, ext, lines, read_metadata(text, ext, document))[0]
 
     # No metadata, but ``` on at least one line => markdown
     for line in lines:
         if line == "```":
             return "md"
 
-    return "py:" + guess_format(text, ".py")[0]
+    return "py:" + guess_format(text, ".py", lines, read_metadata(text, ".py", document))[0]
 
 
 def check_file_version(notebook, source_path, outputs_path):
@@ -2,6 +2,7 @@
 
 import logging
 import re
+from copy import deepcopy
 
 import nbformat
 import yaml
@@ -261,7 +262,7 @@ def header_to_metadata_and_cell(lines, header_prefix, header_suffix, ext=None, r
                     source="\n".join(["---"] + header + ["---"]),
                     metadata=(
                         {}
-                        if lines_to_next_cell == pep8_lines_between_cells(["---"], lines[i + 1 :], ext)
+                        if lines_to_next_cell == pep8_lines_between_cells(["---"], lines, ext, i + 1)
                         else {"lines_to_next_cell": lines_to_next_cell}
                     ),
                 )
@@ -339,3 +340,33 @@ def metadata_and_cell_to_metadata(nb, fmt, unsupported_keys=None):
                         metadata = recursive_update(frontmatter, metadata, overwrite=False)
     nb.metadata = metadata
     return nb
+
+
+class TextDocument:
+    """The text of a notebook, as it flows through the read pipeline: the lines of the
+    text (split on first use, unless given), and the headers that were parsed with a given comment
+    prefix. Parsing the YAML header is comparatively slow, so each header is parsed at most once
+    per document."""
+
+    def __init__(self, text, lines=None):
+        self.text = text
+        self._lines = lines
+        self._headers = {}
+
+    @property
+    def lines(self):
+        """The lines of the text"""
+        if self._lines is None:
+            self._lines = self.text.splitlines()
+        return self._lines
+
+    def header(self, header_prefix, header_suffix, ext=None, root_level_metadata_as_raw_cell=True):
+        """Same as header_to_metadata_and_cell on the lines of the document. The metadata
+        and the cell are copies, so the caller can modify them"""
+        key = (header_prefix, header_suffix, ext, root_level_metadata_as_raw_cell)
+        if key not in self._headers:
+            self._headers[key] = header_to_metadata_and_cell(
+                self.lines, header_prefix, header_suffix, ext, root_level_metadata_as_raw_cell
+            )
+        metadata, jupyter, cell, pos = self._headers[key]
+        return deepcopy(metadata), jupyter, deepcopy(cell), pos
@@ -0,0 +1,246 @@
+"""Find the cells that need to be executed again when a notebook changes.
+
+The code cells of the notebook are compared with the cells of the notebook
+with outputs. The cells that changed, or that have no outputs, are executed again,
+together with the cells that depend on them (the cells that follow them and that
+use the names that they define) and the cells that are required to run these
+(the cells before them that define the names that they use).
+
+The analysis is conservative: the names passed to a function, or on which
+a method is called, are considered to be modified by that call, and calling
+a function can modify any name that the function uses. When the analysis is
+not possible (star imports, magic commands, global statements, exec or eval,
+code cells that were reordered, a notebook that is not a Python notebook),
+all the cells are executed.
+
+Note that the dependencies through files, or through the state of the
+imported modules (e.g. a random seed), are not tracked.
+"""
+
+import ast
+from copy import deepcopy
+
+# Calls to these functions can read or write any name
+_UNSURE_FUNCTIONS = {"exec", "eval", "globals", "locals", "vars", "get_ipython", "__import__"}
+
+_NESTED_SCOPES = (
+    ast.FunctionDef,
+    ast.AsyncFunctionDef,
+    ast.ClassDef,
+    ast.Lambda,
+    ast.ListComp,
+    ast.SetComp,
+    ast.DictComp,
+    ast.GeneratorExp,
+)
+
+
+class IncrementalExecutionUnsure(ValueError):
+    """The dependencies between the cells cannot be determined"""
+
+
+class CellNames:
+    """The names used, bound, modified and called in a code cell. For each name
+    bound in the cell, 'carried' gives the names used in the statement that binds it,
+    e.g. the global names used by a function."""
+
+    def __init__(self, source):
+        try:
+            tree = ast.parse(source)
+        except SyntaxError as err:
+            # Magic commands are not Python code
+            raise IncrementalExecutionUnsure(f"cannot parse the code cell {source!r}") from err
+
+        self.uses = set()
+        self.bound = set()
+        self.modified = set()
+        self.called = set()
+        self.carried = {}
+        for stmt in tree.body:
+            uses = {node.id for node in ast.walk(stmt) if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load)}
+            bound = set(_bound_names(stmt))
+            self.uses.update(uses)
+            self.bound.update(bound)
+            for name in bound:
+                self.carried.setdefault(name, set()).update(uses)
+
+            for node in ast.walk(stmt):
+                if isinstance(node, ast.ImportFrom) and any(alias.name == "*" for alias in node.names):
+                    raise IncrementalExecutionUnsure("the notebook has a star import")
+                if isinstance(node, (ast.Global, ast.Nonlocal)):
+                    raise IncrementalExecutionUnsure("the notebook has a global or nonlocal statement")
+                if isinstance(node, ast.NamedExpr):
+                    self.bound.add(node.target.id)
+                elif isinstance(node, ast.Call):
+                    func = _root_name(node.func)
+                    if func in _UNSURE_FUNCTIONS:
+                        raise IncrementalExecutionUnsure(f"the notebook calls {func}")
+                    if func is not None:
+                        self.called.add(func)
+                        if not isinstance(node.func, ast.Name):
+                            # A method call can modify the object
+                            self.modified.add(func)
+                    for arg in node.args + [keyword.value for keyword in node.keywords]:
+                        self.modified.update(n.id for n in ast.walk(arg) if isinstance(n, ast.Name))
+                elif isinstance(node, (ast.Assign, ast.AugAssign, ast.AnnAssign, ast.Delete)):
+                    targets = node.targets if isinstance(node, (ast.Assign, ast.Delete)) else [node.target]
+                    for target in targets:
+                        for element in ast.walk(target):
+                            if isinstance(element, (ast.Attribute, ast.Subscript)):
+                                name = _root_name(element)
+                                if name is not None:
+                                    self.modified.add(name)
+
+    def defs(self, carried):
+        """The names that the cell can bind or modify. A function can modify the names it uses"""
+        return self.bound | self.modified | _closure(self.called, carried, include_roots=False)
+
+
+def _bound_names(node):
+    """The names bound by a statement in the scope of the notebook"""
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        yield node.name
+        return
+    if isinstance(node, _NESTED_SCOPES):
+        return
+    if isinstance(node, ast.ExceptHandler) and node.name:
+        yield node.name
+    # Names captured by the patterns of a match statement
+    for field in ("name", "rest"):
+        if type(node).__name__.startswith("Match") and isinstance(getattr(node, field, None), str):
+            yield getattr(node, field)
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        for alias in node.names:
+            yield (alias.asname or alias.name).split(".")[0]
+        return
+    if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+        yield node.id
+    for child in ast.iter_child_nodes(node):
+        yield from _bound_names(child)
+
+
+def _root_name(node):
+    """The name at the root of an expression like a.b[0].c"""
+    while isinstance(node, (ast.Attribute, ast.Subscript, ast.Call)):
+        node = node.func if isinstance(node, ast.Call) else node.value
+    return node.id if isinstance(node, ast.Name) else None
+
+
+def _closure(names, carried, include_roots=True):
+    """The names, and the names that they carry, recursively"""
+    result = set(names) if include_roots else set()
+    stack = list(names)
+    while stack:
+        for name in carried.get(stack.pop(), ()):
+            if name not in result:
+                result.add(name)
+                stack.append(name)
+    return result
+
+
+def cells_to_execute(notebook, nb_outputs):
+    """Return the indices (in notebook.cells) of the code cells that need to be executed again,
+    given the notebook with outputs. Raise IncrementalExecutionUnsure when all the cells should
+    be executed."""
+    from .combine import map_outputs_to_inputs
+
+    language = notebook.metadata.get("kernelspec", {}).get("language") or notebook.metadata.get("jupytext", {}).get(
+        "main_language"
+    )
+    if language != "python":
+        raise IncrementalExecutionUnsure("this is not a Python notebook")
+
+    code_cells = [i for i, cell in enumerate(notebook.cells) if cell.cell_type == "code"]
+    outputs_map = map_outputs_to_inputs(notebook.cells, nb_outputs.cells)
+    matched_outputs = [outputs_map[i] for i in code_cells if outputs_map[i] is not None]
+    if matched_outputs != sorted(matched_outputs):
+        # The outputs were computed with the cells in another order
+        raise IncrementalExecutionUnsure("the code cells were reordered")
+
+    names = [CellNames(notebook.cells[i].source) for i in code_cells]
+    carried = {}
+    for cell_names in names:
+        for name, uses in cell_names.carried.items():
+            carried.setdefault(name, set()).update(uses)
+
+    uses = [_closure(cell_names.uses, carried) for cell_names in names]
+    defs = [cell_names.defs(carried) for cell_names in names]
+
+    # The cells that changed, or that have no outputs
+    dirty = set()
+    for k, i in enumerate(code_cells):
+        j = outputs_map[i]
+        if j is None:
+            dirty.add(k)
+        elif nb_outputs.cells[j].source != notebook.cells[i].source:
+            dirty.add(k)
+            # The names that the previous version of the cell defined may not be defined any more
+            defs[k] = defs[k] | CellNames(nb_outputs.cells[j].source).defs(carried)
+        elif nb_outputs.cells[j].get("execution_count") is None:
+            dirty.add(k)
+
+    # The same holds for the cells that were removed
+    matched = set(outputs_map)
+    removed_defs = set()
+    for j, cell in enumerate(nb_outputs.cells):
+        if cell.cell_type == "code" and j not in matched:
+            removed_defs.update(CellNames(cell.source).defs(carried))
+    dirty.update(k for k in range(len(code_cells)) if uses[k] & removed_defs)
+
+    def depends_on(later, earlier):
+        return bool(defs[earlier] & uses[later])
+
+    # The cells that depend on the cells that changed
+    for k in range(len(code_cells)):
+        if k not in dirty and any(depends_on(k, d) for d in dirty if d < k):
+            dirty.add(k)
+
+    # The cells that are required to execute these cells
+    required = set(dirty)
+    stack = sorted(dirty)
+    while stack:
+        k = stack.pop()
+        for earlier in range(k):
+            if earlier not in required and depends_on(k, earlier):
+                required.add(earlier)
+                stack.append(earlier)
+
+    return [code_cells[k] for k in sorted(required)]
+
+
+def execute_cells(kernel_pool, notebook, nb_outputs, cells, kernel_name=None, path=None, nb_file=None, timeout=None):
+    """Execute the given code cells of the notebook, and take the outputs of the other
+    code cells from the notebook with outputs. Return the execution report."""
+    from nbformat.v4.nbbase import new_notebook
+
+    from .combine import map_outputs_to_inputs
+
+    if not cells:
+        return kernel_pool.skip(nb_file, kernel_name)
+
+    outputs_map = map_outputs_to_inputs(notebook.cells, nb_outputs.cells)
+    partial = new_notebook(cells=[deepcopy(notebook.cells[i]) for i in cells], metadata=deepcopy(notebook.metadata))
+    report = kernel_pool.execute(partial, kernel_name, path=path, nb_file=nb_file, timeout=timeout)
+
+    executed = dict(zip(cells, partial.cells))
+    for i, cell in enumerate(notebook.cells):
+        if cell.cell_type != "code":
+            continue
+        source_cell = executed[i] if i in executed else nb_outputs.cells[outputs_map[i]]
+        cell.outputs = deepcopy(source_cell.outputs)
+        cell.execution_count = source_cell.execution_count
+    if partial.metadata.get("language_info"):
+        notebook.metadata["language_info"] = partial.metadata["language_info"]
+
+    # The execution counts are in order, as if the notebook had been executed in full
+    count = 0
+    for cell in notebook.cells:
+        if cell.cell_type != "code" or cell.execution_count is None:
+            continue
+        count += 1
+        cell.execution_count = count
+        for output in cell.outputs:
+            if "execution_count" in output:
+                output["execution_count"] = count
+
+    return report
@@ -5,6 +5,7 @@ import os
 import sys
 import warnings
 from copy import copy, deepcopy
+from itertools import chain, islice
 
 import nbformat
 from nbformat.v4.nbbase import NotebookNode, new_code_cell, new_notebook
@@ -20,13 +21,14 @@ from .formats import (
     guess_format,
     long_form_one_format,
     read_format_from_metadata,
+    read_metadata,
     rearrange_jupytext_metadata,
     update_jupytext_formats_metadata,
 )
 from .header import (
     _JUPYTER_METADATA_NAMESPACE,
+    TextDocument,
     encoding_and_executable,
-    header_to_metadata_and_cell,
     insert_jupytext_info_and_filter_metadata,
     insert_or_test_version_number,
     metadata_and_cell_to_header,
@@ -36,11 +38,13 @@ from .header import (
 from .languages import (
     _SCRIPT_EXTENSIONS,
     default_language_from_metadata_and_ext,
+    set_cell_language,
     set_main_and_cell_language,
 )
-from .metadata_filter import filter_metadata, update_metadata_filters
+from .metadata_filter import compile_metadata_filter, update_metadata_filters
 from .myst import MYST_FORMAT_NAME, myst_extensions, myst_to_notebook, notebook_to_myst
 from .pandoc import md_to_notebook, notebook_to_md
+from .parse_cache import get_parse_cache
 from .pep8 import pep8_lines_between_cells
 from .quarto import notebook_to_qmd, qmd_to_notebook
 from .marimo import notebook_to_marimo_py, marimo_py_to_notebook
@@ -51,6 +55,45 @@ class NotSupportedNBFormatVersion(NotImplementedError):
     """An error issued when the current notebook format is not supported by this version of Jupytext"""
 
 
+class _LinesBelow:
+    """The lines below the current cell, when the cells of a notebook are written in reverse
+    order. The lines are stored in reverse order, so that prepending the text of a cell takes
+    a time proportional to the length of that text, not to the length of the notebook."""
+
+    def __init__(self):
+        self._reversed_lines = []
+
+    def prepend(self, lines):
+        self._reversed_lines.extend(reversed(lines))
+
+    def __len__(self):
+        return len(self._reversed_lines)
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self._reversed_lines):
+            raise IndexError(index)
+        return self._reversed_lines[len(self._reversed_lines) - 1 - index]
+
+    def __iter__(self):
+        return reversed(self._reversed_lines)
+
+
+# The number of lines per chunk when a text notebook is written to a stream
+_LINES_PER_CHUNK = 1024
+
+
+def _join_lines_in_chunks(lines, chunk_size=_LINES_PER_CHUNK):
+    """Yield the same text as '\\n'.join(lines), chunk_size lines at a time"""
+    lines = iter(lines)
+    separator = ""
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield separator + "\n".join(chunk)
+        separator = "\n"
+
+
 class TextNotebookConverter(NotebookReader, NotebookWriter):
     """A class that can read or write a Jupyter notebook as text"""
 
@@ -95,8 +138,9 @@ class TextNotebookConverter(NotebookReader, NotebookWriter):
         if metadata.get("jupytext", {}).get("rst2md") is True:
             metadata["jupytext"]["rst2md"] = False
 
-    def reads(self, s, **_):
-        """Read a notebook represented as text"""
+    def reads(self, s, document=None, **_):
+        """Read a notebook represented as text. Pass the TextDocument used to
+        find the format of the notebook to reuse its lines and parsed header"""
         if self.fmt.get("format_name") == "pandoc":
             return md_to_notebook(s)
 
@@ -110,40 +154,24 @@ class TextNotebookConverter(NotebookReader, NotebookWriter):
             nb = myst_to_notebook(s)
             return self.split_frontmatter(nb)
 
-        lines = s.splitlines()
+        if document is None:
+            document = TextDocument(s)
+        lines = document.lines
 
-        cells = []
-        metadata, jupyter_md, header_cell, pos = header_to_metadata_and_cell(
-            lines,
-            self.implementation.header_prefix,
-            self.implementation.header_suffix,
-            self.implementation.extension,
-            self.fmt.get(
-                "root_level_metadata_as_raw_cell",
-                (self.config.root_level_metadata_as_raw_cell if self.config is not None else True),
-            ),
-        )
+        metadata, jupyter_md, header_cell, pos = self.read_header(document)
         default_language = default_language_from_metadata_and_ext(metadata, self.implementation.extension)
-        self.update_fmt_with_notebook_options(metadata, read=True)
 
+        cells = []
         if header_cell:
             cells.append(header_cell)
 
-        lines = lines[pos:]
-
         if self.implementation.format_name and self.implementation.format_name.startswith("sphinx"):
             cells.append(new_code_cell(source="%matplotlib inline"))
 
         cell_metadata_json = False
-
-        while lines:
-            reader = self.implementation.cell_reader_class(self.fmt, default_language)
-            cell, pos = reader.read(lines)
+        for cell, cell_metadata_json_in_cell in self.iter_cells(lines, pos, default_language):
             cells.append(cell)
-            cell_metadata_json = cell_metadata_json or reader.cell_metadata_json
-            if pos <= 0:
-                raise Exception("Blocked at lines " + "\n".join(lines[:6]))  # pragma: no cover
-            lines = lines[pos:]
+            cell_metadata_json = cell_metadata_json or cell_metadata_json_in_cell
 
         custom_cell_magics = self.fmt.get("custom_cell_magics", "").split(",")
         custom_language_magics = self.fmt.get("custom_language_magics", "").split(",")
@@ -172,6 +200,34 @@ class TextNotebookConverter(NotebookReader, NotebookWriter):
 
         return new_notebook(cells=cells, metadata=metadata)
 
+    def read_header(self, document):
+        """Parse the header of the text notebook, and update the format options accordingly.
+        Return the notebook metadata, whether it has a Jupyter section, the header cell
+        (if any) and the position of the first line after the header"""
+        metadata, jupyter_md, header_cell, pos = document.header(
+            self.implementation.header_prefix,
+            self.implementation.header_suffix,
+            self.implementation.extension,
+            self.fmt.get(
+                "root_level_metadata_as_raw_cell",
+                (self.config.root_level_metadata_as_raw_cell if self.config is not None else True),
+            ),
+        )
+        self.update_fmt_with_notebook_options(metadata, read=True)
+        return metadata, jupyter_md, header_cell, pos
+
+    def iter_cells(self, lines, pos, default_language):
+        """Yield the cells found in lines[pos:], together with a flag that indicates
+        whether the cell metadata was in JSON format"""
+        # The cell readers share the list of lines, and start at the given position
+        while pos < len(lines):
+            reader = self.implementation.cell_reader_class(self.fmt, default_language)
+            cell, next_pos = reader.read(lines, pos)
+            if next_pos <= pos:
+                raise Exception("Blocked at lines " + "\n".join(lines[pos : pos + 6]))  # pragma: no cover
+            pos = next_pos
+            yield cell, reader.cell_metadata_json
+
     def filter_notebook(self, nb, metadata, preserve_cell_ids=True):
         self.update_fmt_with_notebook_options(nb.metadata)
         unsupported_keys = set()
@@ -181,15 +237,11 @@ class TextNotebookConverter(NotebookReader, NotebookWriter):
         # We sort the notebook metadata for consistency with v1.16
         metadata = dict(sorted(metadata.items()))
 
+        cell_metadata_filter = compile_metadata_filter(self.fmt.get("cell_metadata_filter"), _IGNORE_CELL_METADATA)
         cells = []
         for cell in nb.cells:
             cell_kwargs = dict(cell)
-            cell_kwargs["metadata"] = filter_metadata(
-                cell.metadata,
-                self.fmt.get("cell_metadata_filter"),
-                _IGNORE_CELL_METADATA,
-                unsupported_keys=unsupported_keys,
-            )
+            cell_kwargs["metadata"] = cell_metadata_filter.apply(cell.metadata, unsupported_keys=unsupported_keys)
             if not preserve_cell_ids:
                 cell_kwargs.pop("id", None)
             elif hasattr(cell, "id"):
@@ -210,21 +262,37 @@ class TextNotebookConverter(NotebookReader, NotebookWriter):
             cells=cells,
         )
 
-    def writes(self, nb, metadata=None, **kwargs):
-        """Return the text representation of the notebook"""
+    def writes(self, nb, metadata=None, cell_export_cache=None, **kwargs):
+        """Return the text representation of the notebook. Pass a CellExportCache
+        to reuse the text of the cells that did not change since the previous call"""
+        return "".join(self.iter_text(nb, metadata, cell_export_cache=cell_export_cache))
+
+    def write(self, nb, fp, metadata=None, cell_export_cache=None, **kwargs):
+        """Write the text representation of the notebook to a text stream"""
+        for chunk in self.iter_text(nb, metadata, cell_export_cache=cell_export_cache):
+            fp.write(chunk)
+
+    def iter_text(self, nb, metadata=None, cell_export_cache=None):
+        """Yield the text representation of the notebook in chunks, starting with the header.
+        The chunks of the header and of the cells are yielded as soon as the text of
+        all the cells has been assembled, without joining them into a single string"""
         if self.fmt.get("format_name") == "pandoc":
-            return notebook_to_md(self.filter_notebook(nb, metadata))
+            yield notebook_to_md(self.filter_notebook(nb, metadata))
+            return
         if self.fmt.get("format_name") == "quarto" or self.ext == ".qmd":
-            return notebook_to_qmd(self.filter_notebook(nb, metadata))
+            yield notebook_to_qmd(self.filter_notebook(nb, metadata))
+            return
         if self.fmt.get("format_name") == "marimo":
-            return notebook_to_marimo_py(self.filter_notebook(nb, metadata))
+            yield notebook_to_marimo_py(self.filter_notebook(nb, metadata))
+            return
         if self.fmt.get("format_name") == MYST_FORMAT_NAME or self.ext in myst_extensions(no_md=True):
             default_lexer_from_language_info = metadata.get("language_info", {}).get("pygments_lexer", None)
             default_lexer_from_jupytext_metadata = metadata.get("jupytext", {}).pop("default_lexer", None)
             default_lexer = default_lexer_from_language_info or default_lexer_from_jupytext_metadata
             nb = self.filter_notebook(nb, metadata)
             nb = self.merge_frontmatter(nb)
-            return notebook_to_myst(nb, default_lexer=default_lexer)
+            yield notebook_to_myst(nb, default_lexer=default_lexer)
+            return
 
         # Copy the notebook, in order to be sure we do not modify the original notebook
         nb = NotebookNode(
@@ -260,19 +328,38 @@ class TextNotebookConverter(NotebookReader, NotebookWriter):
         )
         split_at_heading = self.fmt.get("split_at_heading", False)
 
+        texts = []
+        format_signature = cell_export_cache.format_signature(self.fmt) if cell_export_cache is not None else None
+
         for cell in nb.cells:
             if looking_for_first_markdown_cell and cell.cell_type == "markdown":
                 cell.metadata.setdefault("cell_marker", '"""')
                 looking_for_first_markdown_cell = False
 
+            if cell_export_cache is not None:
+                exporter, text = cell_export_cache.export_cell(
+                    self.implementation.cell_exporter_class,
+                    cell,
+                    default_language,
+                    self.fmt,
+                    format_signature,
+                    unsupported_keys=unsupported_keys,
+                )
+                cell_exporters.append(exporter)
+                texts.append(text)
+                continue
+
             cell_exporters.append(
                 self.implementation.cell_exporter_class(cell, default_language, self.fmt, unsupported_keys=unsupported_keys)
             )
 
         _warn_on_unsupported_keys(unsupported_keys)
 
-        texts = [cell.cell_to_text() for cell in cell_exporters]
-        lines = []
+        if cell_export_cache is None:
+            texts = [cell.cell_to_text() for cell in cell_exporters]
+        else:
+            cell_export_cache.end_export()
+        lines = _LinesBelow()
 
         # concatenate cells in reverse order to determine how many blank lines (pep8)
         for i, cell in reversed(list(enumerate(cell_exporters))):
@@ -308,14 +395,14 @@ class TextNotebookConverter(NotebookReader, NotebookWriter):
                 if i + 1 < len(cell_exporters) and cell_exporters[i + 1].is_code():
                     text.append('""')
 
-            lines = text + lines
+            lines.prepend(text)
 
         if header_lines_to_next_cell is None:
             header_lines_to_next_cell = pep8_lines_between_cells(header_content, lines, self.implementation.extension)
 
         header.extend([""] * header_lines_to_next_cell)
 
-        return "\n".join(header + lines)
+        yield from _join_lines_in_chunks(chain(header, lines))
 
     def split_frontmatter(self, nb):
         """Use during self.reads to separate notebook metadata from other frontmatter."""
@@ -344,7 +431,8 @@ class TextNotebookConverter(NotebookReader, NotebookWriter):
 
 def reads(text, fmt=None, as_version=nbformat.NO_CONVERT, config=None, **kwargs):
     """
-    Read a notebook from a string
+    Read a notebook from a string. Text notebooks are cached when the
+    parse cache is enabled with `jupytext.parse_cache.enable_parse_cache`.
 
     :param text: the text representation of the notebook
     :param fmt: (optional) the jupytext format like `md`, `py:percent`, ...
@@ -353,8 +441,23 @@ def reads(text, fmt=None, as_version=nbformat.NO_CONVERT, config=None, **kwargs)
     :param kwargs: (not used) additional parameters for nbformat.reads
     :return: the notebook
     """
-    fmt = copy(fmt) if fmt else divine_format(text)
-    fmt = long_form_one_format(fmt)
+    parse_cache = get_parse_cache()
+    key = parse_cache.key(text, fmt, as_version, config) if parse_cache is not None and not kwargs else None
+    if key is not None:
+        notebook = parse_cache.get(key)
+        if notebook is not None:
+            return notebook
+
+    notebook = _reads(text, fmt, as_version, config, **kwargs)
+    if key is not None:
+        parse_cache.put(key, notebook)
+    return notebook
+
+
+def _reads(text, fmt, as_version, config, **kwargs):
+    """Read a notebook from a string, without using the parse cache"""
+    document = TextDocument(text)
+    fmt = text_notebook_format(text, fmt, document)
     ext = fmt["extension"]
 
     if ext == ".ipynb":
@@ -368,27 +471,48 @@ def reads(text, fmt=None, as_version=nbformat.NO_CONVERT, config=None, **kwargs)
             )
         return nb
 
-    format_name = read_format_from_metadata(text, ext) or fmt.get("format_name")
+    reader = TextNotebookConverter(fmt, config)
+    notebook = reader.reads(text, document=document, **kwargs)
+    set_text_representation_metadata(notebook.metadata, fmt)
 
-    if format_name:
-        format_options = {}
-    else:
-        format_name, format_options = guess_format(text, ext)
+    return notebook
 
-    if format_name:
-        fmt["format_name"] = format_name
 
-    fmt.update(format_options)
-    reader = TextNotebookConverter(fmt, config)
-    notebook = reader.reads(text, **kwargs)
-    rearrange_jupytext_metadata(notebook.metadata)
+def text_notebook_format(text, fmt=None, document=None):
+    """Return the long form of the format of the given text notebook, including the format name
+    and the format options that were either found in the notebook metadata, or guessed.
+    Pass a TextDocument to share the lines and the parsed header with the notebook reader."""
+    if document is None:
+        document = TextDocument(text)
+    fmt = copy(fmt) if fmt else divine_format(text, document)
+    fmt = long_form_one_format(fmt)
+    ext = fmt["extension"]
 
-    if format_name and insert_or_test_version_number():
-        notebook.metadata.setdefault("jupytext", {}).setdefault("text_representation", {}).update(
-            {"extension": ext, "format_name": format_name}
-        )
+    if ext != ".ipynb":
+        metadata = read_metadata(text, ext, document)
+        format_name = read_format_from_metadata(text, ext, metadata) or fmt.get("format_name")
+
+        if format_name:
+            format_options = {}
+        else:
+            format_name, format_options = guess_format(text, ext, document.lines, metadata)
+
+        if format_name:
+            fmt["format_name"] = format_name
+
+        fmt.update(format_options)
+
+    return fmt
 
-    return notebook
+
+def set_text_representation_metadata(metadata, fmt):
+    """Rearrange the metadata of a notebook that was read from a text file, and record its format"""
+    rearrange_jupytext_metadata(metadata)
+
+    if fmt.get("format_name") and insert_or_test_version_number():
+        metadata.setdefault("jupytext", {}).setdefault("text_representation", {}).update(
+            {"extension": fmt["extension"], "format_name": fmt["format_name"]}
+        )
 
 
 def read(fp, as_version=nbformat.NO_CONVERT, fmt=None, config=None, **kwargs):
@@ -432,16 +556,88 @@ def read(fp, as_version=nbformat.NO_CONVERT, fmt=None, config=None, **kwargs):
     return reads(fp.read(), fmt, config=config, **kwargs)
 
 
-def writes(notebook, fmt, version=nbformat.NO_CONVERT, config=None, **kwargs):
+def iter_cells(fp, fmt=None, config=None):
+    """Iterate over the cells of a notebook read from a file name or a file object.
+
+    The first item is the notebook metadata, and the following items are the
+    notebook cells, which are yielded one at a time as they are parsed. This is faster
+    and uses less memory than `read` when the cells are processed one by one.
+
+    Unlike `read`, the notebook metadata does not include the metadata filters
+    that are inferred from the cell metadata, and when the notebook has no
+    kernel and is not a script, the main language is assumed to be Python.
+    The pandoc, quarto, marimo, MyST and Sphinx Gallery formats are not streamed:
+    these notebooks are read in full before their cells are yielded.
+
+    :param fp: a file name or a file object
+    :param fmt: (optional) the jupytext format like `md`, `py:percent`, ...
+    :param config: (optional) a Jupytext configuration object
+    :return: an iterator over the notebook metadata and cells
+    """
+    if not hasattr(fp, "read"):
+        # Treat fp as a file name
+        fp = str(fp)
+        _, ext = os.path.splitext(fp)
+        fmt = copy(fmt or {})
+        if not isinstance(fmt, dict):
+            fmt = long_form_one_format(fmt)
+        fmt.update({"extension": ext})
+        with open(fp, encoding="utf-8") as stream:
+            yield from iter_cells(stream, fmt=fmt, config=config)
+        return
+
+    text = fp.read()
+    document = TextDocument(text)
+    fmt = text_notebook_format(text, fmt, document)
+    format_name = fmt.get("format_name") or ""
+    if (
+        fmt["extension"] == ".ipynb"
+        or format_name in ["pandoc", "quarto", "marimo", MYST_FORMAT_NAME]
+        or format_name.startswith("sphinx")
+    ):
+        notebook = reads(text, fmt=fmt, config=config)
+        yield notebook.metadata
+        yield from notebook.cells
+        return
+
+    converter = TextNotebookConverter(fmt, config)
+    ext = converter.implementation.extension
+    lines = document.lines
+    metadata, _, header_cell, pos = converter.read_header(document)
+    default_language = default_language_from_metadata_and_ext(metadata, ext)
+    main_language = default_language or "python"
+    if "language" not in metadata.get("kernelspec", {}):
+        metadata.setdefault("jupytext", {})["main_language"] = main_language
+    set_text_representation_metadata(metadata, fmt)
+    yield NotebookNode(metadata)
+
+    if header_cell:
+        yield header_cell
+
+    custom_cell_magics = converter.fmt.get("custom_cell_magics", "").split(",")
+    custom_language_magics = converter.fmt.get("custom_language_magics", "").split(",")
+    for cell, _ in converter.iter_cells(lines, pos, default_language):
+        set_cell_language(cell, main_language, custom_cell_magics + custom_language_magics)
+        yield cell
+
+
+def writes(notebook, fmt, version=nbformat.NO_CONVERT, config=None, cell_export_cache=None, **kwargs):
     """Return the text representation of the notebook
 
     :param notebook: the notebook
     :param fmt: the jupytext format like `md`, `py:percent`, ...
     :param version: see nbformat.writes
     :param config: (optional) a Jupytext configuration object
+    :param cell_export_cache: (optional) a `jupytext.export_cache.CellExportCache` object,
+        used to reuse the text representation of the cells that did not change
     :param kwargs: (not used) additional parameters for nbformat.writes
     :return: the text representation of the notebook
     """
+    return "".join(_iter_text(notebook, fmt, version=version, config=config, cell_export_cache=cell_export_cache, **kwargs))
+
+
+def _iter_text(notebook, fmt, version=nbformat.NO_CONVERT, config=None, cell_export_cache=None, **kwargs):
+    """Yield the text representation of the notebook in chunks"""
     if version is not nbformat.NO_CONVERT:
         if not isinstance(version, int):
             raise TypeError("The argument 'version' should be either nbformat.NO_CONVERT, or an integer.")
@@ -467,11 +663,12 @@ def writes(notebook, fmt, version=nbformat.NO_CONVERT, config=None, **kwargs):
     format_name = fmt.get("format_name")
 
     if ext == ".ipynb":
-        return nbformat.writes(
+        yield nbformat.writes(
             drop_text_representation_metadata(notebook, metadata),
             version,
             **kwargs,
         )
+        return
 
     if not format_name:
         format_name = format_name_for_ext(metadata, ext, explicit_default=False)
@@ -486,7 +683,7 @@ def writes(notebook, fmt, version=nbformat.NO_CONVERT, config=None, **kwargs):
         update_jupytext_formats_metadata(metadata, fmt)
 
     writer = TextNotebookConverter(fmt, config)
-    return writer.writes(notebook, metadata)
+    yield from writer.iter_text(notebook, metadata, cell_export_cache=cell_export_cache)
 
 
 def drop_text_representation_metadata(notebook, metadata=None):
@@ -511,7 +708,8 @@ def drop_text_representation_metadata(notebook, metadata=None):
 
 
 def write(nb, fp, version=nbformat.NO_CONVERT, fmt=None, config=None, **kwargs):
-    """Write a notebook to a file name or a file object
+    """Write a notebook to a file name or a file object. The text is written
+    to the file in chunks, without building the whole document as a string.
 
     :param nb: the notebook
     :param fp: a file name or a file object
@@ -522,12 +720,13 @@ def write(nb, fp, version=nbformat.NO_CONVERT, fmt=None, config=None, **kwargs):
     """
     if fp == "-":
         # Use sys.stdout.buffer when possible, and explicit utf-8 encoding, cf. #331
-        content = writes(nb, version=version, fmt=fmt, config=config, **kwargs)
         try:
             # Python 3
-            sys.stdout.buffer.write(content.encode("utf-8"))
+            stdout = sys.stdout.buffer
         except AttributeError:
-            sys.stdout.write(content.encode("utf-8"))
+            stdout = sys.stdout
+        for chunk in _iter_text(nb, fmt, version=version, config=config, **kwargs):
+            stdout.write(chunk.encode("utf-8"))
         return
 
     if not hasattr(fp, "write"):
@@ -544,11 +743,12 @@ def write(nb, fp, version=nbformat.NO_CONVERT, fmt=None, config=None, **kwargs):
     else:
         assert fmt is not None, "'fmt' argument in jupytext.write is mandatory unless fp is a file name"
 
-    content = writes(nb, version=version, fmt=fmt, config=config, **kwargs)
-    if isinstance(content, bytes):
-        content = content.decode("utf8")
-    fp.write(content)
-    if not content.endswith("\n"):
+    chunk = ""
+    for chunk in _iter_text(nb, fmt, version=version, config=config, **kwargs):
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode("utf8")
+        fp.write(chunk)
+    if not chunk.endswith("\n"):
         fp.write("\n")
 
 
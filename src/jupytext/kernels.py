@@ -4,14 +4,22 @@ import os
 import sys
 
 from .languages import same_language
-from .reraise import reraise
-
-try:
-    # I prefer not to take a dependency on jupyter_client
-    from jupyter_client.kernelspec import find_kernel_specs, get_kernel_spec
-except ImportError as err:
-    find_kernel_specs = reraise(err)
-    get_kernel_spec = reraise(err)
+
+
+def find_kernel_specs():
+    """The kernel specifications available, as returned by jupyter_client"""
+    # I prefer not to take a dependency on jupyter_client, which is imported here
+    # rather than at the top of this module, as it takes a while to import
+    from jupyter_client.kernelspec import find_kernel_specs as _find_kernel_specs
+
+    return _find_kernel_specs()
+
+
+def get_kernel_spec(kernel_name):
+    """The kernel specification with the given name, as returned by jupyter_client"""
+    from jupyter_client.kernelspec import get_kernel_spec as _get_kernel_spec
+
+    return _get_kernel_spec(kernel_name)
 
 
 def set_kernelspec_from_language(notebook):
@@ -170,25 +170,31 @@ def set_main_and_cell_language(metadata, cells, ext, custom_cell_magics):
     if "language" not in metadata.get("kernelspec", {}) and cells:
         metadata.setdefault("jupytext", {})["main_language"] = main_language
 
-    # Remove 'language' meta data and add a magic if not main language
     for cell in cells:
-        if "language" in cell["metadata"]:
-            language = cell["metadata"]["language"]
-            if language == main_language:
-                cell["metadata"].pop("language")
-                continue
-
-            if usual_language_name(language) == main_language:
-                continue
-
-            if language in _JUPYTER_LANGUAGES or language in custom_cell_magics:
-                cell["metadata"].pop("language")
-                magic = "%%" if main_language != "csharp" else "#!"
-                if "magic_args" in cell["metadata"]:
-                    magic_args = cell["metadata"].pop("magic_args")
-                    cell["source"] = f"{magic}{language} {magic_args}\n" + cell["source"]
-                else:
-                    cell["source"] = f"{magic}{language}\n" + cell["source"]
+        set_cell_language(cell, main_language, custom_cell_magics)
+
+
+def set_cell_language(cell, main_language, custom_cell_magics):
+    """Remove the 'language' metadata from the cell, and add a magic if not main language"""
+    if "language" not in cell["metadata"]:
+        return
+
+    language = cell["metadata"]["language"]
+    if language == main_language:
+        cell["metadata"].pop("language")
+        return
+
+    if usual_language_name(language) == main_language:
+        return
+
+    if language in _JUPYTER_LANGUAGES or language in custom_cell_magics:
+        cell["metadata"].pop("language")
+        magic = "%%" if main_language != "csharp" else "#!"
+        if "magic_args" in cell["metadata"]:
+            magic_args = cell["metadata"].pop("magic_args")
+            cell["source"] = f"{magic}{language} {magic_args}\n" + cell["source"]
+        else:
+            cell["source"] = f"{magic}{language}\n" + cell["source"]
 
 
 def cell_language(source, default_language, custom_cell_magics):
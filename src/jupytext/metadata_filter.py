@@ -116,70 +116,144 @@ def update_metadata_filters(metadata, jupyter_md, cell_metadata):
             metadata.setdefault("jupytext", {})["notebook_metadata_filter"] = ",".join(nb_md_filter)
 
 
-def filter_metadata(metadata, user_filter, default_filter="", unsupported_keys=None, **kwargs):
-    """Filter the cell or notebook metadata, according to the user preference"""
-    default_filter = metadata_filter_as_dict(default_filter) or {}
-    user_filter = metadata_filter_as_dict(user_filter) or {}
-
-    default_exclude = default_filter.get("excluded", [])
-    default_include = default_filter.get("additional", [])
-
-    assert not (default_exclude == "all" and default_include == "all")
-    if isinstance(default_include, list) and default_include and default_exclude == []:
-        default_exclude = "all"
-
-    user_exclude = user_filter.get("excluded", [])
-    user_include = user_filter.get("additional", [])
-
-    # notebook default filter = include only few metadata
-    if default_exclude == "all":
-        if user_include == "all":
-            return subset_metadata(
-                metadata,
-                exclude=user_exclude,
-                unsupported_keys=unsupported_keys,
-                **kwargs,
-            )
-        if user_exclude == "all":
-            return subset_metadata(
-                metadata,
-                keep_only=user_include,
-                unsupported_keys=unsupported_keys,
-                **kwargs,
-            )
-        return subset_metadata(
-            metadata,
-            keep_only=set(user_include).union(default_include),
-            exclude=user_exclude,
-            unsupported_keys=unsupported_keys,
-            **kwargs,
-        )
-
-    # cell default filter = all metadata but removed ones
-    if user_include == "all":
-        return subset_metadata(
-            metadata,
-            exclude=user_exclude,
-            unsupported_keys=unsupported_keys,
-            **kwargs,
+class CompiledMetadataFilter:
+    """A metadata filter, parsed once from the user and the default filters. Use the
+    apply method to filter the cell or notebook metadata, and the restore method
+    to restore the metadata that were filtered out of a text notebook"""
+
+    def __init__(self, user_filter, default_filter=""):
+        default_filter = metadata_filter_as_dict(default_filter) or {}
+        user_filter = metadata_filter_as_dict(user_filter) or {}
+
+        default_exclude = default_filter.get("excluded", [])
+        default_include = default_filter.get("additional", [])
+
+        assert not (default_exclude == "all" and default_include == "all")
+        if isinstance(default_include, list) and default_include and default_exclude == []:
+            default_exclude = "all"
+
+        user_exclude = user_filter.get("excluded", [])
+        user_include = user_filter.get("additional", [])
+
+        # Do not serialize empty tags (cell default filter only)
+        self.drop_empty_tags = False
+
+        # notebook default filter = include only few metadata
+        if default_exclude == "all":
+            if user_include == "all":
+                self.subset = MetadataSubset(exclude=user_exclude)
+            elif user_exclude == "all":
+                self.subset = MetadataSubset(keep_only=user_include)
+            else:
+                self.subset = MetadataSubset(keep_only=set(user_include).union(default_include), exclude=user_exclude)
+
+        # cell default filter = all metadata but removed ones
+        elif user_include == "all":
+            self.subset = MetadataSubset(exclude=user_exclude)
+        elif user_exclude == "all":
+            self.subset = MetadataSubset(keep_only=user_include)
+        else:
+            self.drop_empty_tags = True
+            self.subset = MetadataSubset(exclude=set(user_exclude).union(set(default_exclude).difference(user_include)))
+
+    def apply(self, metadata, unsupported_keys=None, remove=False):
+        """Return the filtered metadata. The unsupported keys are added to the
+        unsupported_keys set, if any. Use remove=True to remove the
+        metadata that are kept from the original metadata"""
+        if self.drop_empty_tags and "tags" in metadata and not metadata["tags"]:
+            metadata = metadata.copy()
+            metadata.pop("tags")
+        return self.subset.apply(metadata, unsupported_keys=unsupported_keys, remove=remove)
+
+    def restore(self, filtered_metadata, unfiltered_metadata):
+        """Update the filtered metadata with the part of the unfiltered one that matches the filter"""
+        filtered_unfiltered_metadata = self.apply(unfiltered_metadata)
+
+        metadata = copy(filtered_metadata)
+        for key in unfiltered_metadata:
+            if key not in filtered_unfiltered_metadata:
+                # We don't want to restore the line_to_next_cell metadata from the ipynb file, see #761
+                if key not in _JUPYTEXT_CELL_METADATA:
+                    metadata[key] = unfiltered_metadata[key]
+
+        return metadata
+
+
+class MetadataSubset:
+    """The metadata keys to keep, and to exclude, with the nested keys
+    (e.g. 'I.a') compiled into the subsets that apply at the next level"""
+
+    def __init__(self, keep_only=None, exclude=None):
+        self.keep_only = None if keep_only is None else frozenset(keep_only)
+        self.exclude = None if exclude is None else frozenset(exclude)
+        self.sub_keep_only = (
+            {}
+            if keep_only is None
+            else {key: MetadataSubset(keep_only=sub_keys) for key, sub_keys in second_level(keep_only).items()}
         )
-    if user_exclude == "all":
-        return subset_metadata(
-            metadata,
-            keep_only=user_include,
-            unsupported_keys=unsupported_keys,
-            **kwargs,
+        self.sub_exclude = (
+            {}
+            if exclude is None
+            else {key: MetadataSubset(exclude=sub_keys) for key, sub_keys in second_level(exclude).items()}
         )
-    # Do not serialize empty tags
-    if "tags" in metadata and not metadata["tags"]:
-        metadata = metadata.copy()
-        metadata.pop("tags")
-    return subset_metadata(
-        metadata,
-        exclude=set(user_exclude).union(set(default_exclude).difference(user_include)),
-        unsupported_keys=unsupported_keys,
-        **kwargs,
-    )
+
+    def apply(self, metadata, unsupported_keys=None, remove=False):
+        """Filter the metadata"""
+        supported_keys = suppress_unsupported_keys(metadata, unsupported_keys=unsupported_keys)
+        if self.keep_only is not None:
+            include = [key for key in supported_keys if key in self.keep_only]
+            filtered_metadata = {key: metadata[key] for key in include}
+            for key in supported_keys:
+                if key in self.sub_keep_only:
+                    filtered_metadata[key] = self.sub_keep_only[key].apply(
+                        metadata[key], unsupported_keys=unsupported_keys, remove=remove
+                    )
+        else:
+            include = supported_keys
+            filtered_metadata = {key: metadata[key] for key in supported_keys}
+
+        if self.exclude is not None:
+            for key in self.exclude:
+                filtered_metadata.pop(key, None)
+            for key, sub_exclude in self.sub_exclude.items():
+                if key in filtered_metadata:
+                    filtered_metadata[key] = sub_exclude.apply(
+                        filtered_metadata[key], unsupported_keys=unsupported_keys, remove=remove
+                    )
+
+        if remove:
+            for key in set(include).difference(self.exclude or {}):
+                metadata.pop(key, None)
+
+        return filtered_metadata
+
+
+# The compiled metadata filters, indexed by the user and default filters
+_COMPILED_METADATA_FILTERS = {}
+_MAX_COMPILED_METADATA_FILTERS = 256
+
+
+def compile_metadata_filter(user_filter, default_filter=""):
+    """Return the CompiledMetadataFilter for these filters. The filters that
+    are given as strings are compiled only once."""
+    try:
+        key = (user_filter, default_filter)
+        compiled_filter = _COMPILED_METADATA_FILTERS.get(key)
+    except TypeError:
+        # Filters given as dictionaries are not hashable
+        return CompiledMetadataFilter(user_filter, default_filter)
+
+    if compiled_filter is None:
+        compiled_filter = CompiledMetadataFilter(user_filter, default_filter)
+        if len(_COMPILED_METADATA_FILTERS) >= _MAX_COMPILED_METADATA_FILTERS:
+            _COMPILED_METADATA_FILTERS.clear()
+        _COMPILED_METADATA_FILTERS[key] = compiled_filter
+    return compiled_filter
+
+
+def filter_metadata(metadata, user_filter, default_filter="", unsupported_keys=None, **kwargs):
+    """Filter the cell or notebook metadata, according to the user preference"""
+    return compile_metadata_filter(user_filter, default_filter).apply(metadata, unsupported_keys=unsupported_keys, **kwargs)
 
 
 def second_level(keys):
@@ -204,53 +278,11 @@ def suppress_unsupported_keys(metadata, unsupported_keys=None):
 
 def subset_metadata(metadata, keep_only=None, exclude=None, unsupported_keys=None, remove=False):
     """Filter the metadata"""
-    supported_keys = suppress_unsupported_keys(metadata, unsupported_keys=unsupported_keys)
-    if keep_only is not None:
-        include = [key for key in supported_keys if key in keep_only]
-        filtered_metadata = {key: metadata[key] for key in include}
-        sub_keep_only = second_level(keep_only)
-        keys = [key for key in supported_keys if key in sub_keep_only]
-        for key in keys:
-            filtered_metadata[key] = subset_metadata(
-                metadata[key],
-                keep_only=sub_keep_only[key],
-                unsupported_keys=unsupported_keys,
-                remove=remove,
-            )
-    else:
-        include = supported_keys
-        filtered_metadata = {key: metadata[key] for key in supported_keys}
-
-    if exclude is not None:
-        for key in exclude:
-            if key in filtered_metadata:
-                filtered_metadata.pop(key)
-        sub_exclude = second_level(exclude)
-        for key in sub_exclude:
-            if key in filtered_metadata:
-                filtered_metadata[key] = subset_metadata(
-                    filtered_metadata[key],
-                    exclude=sub_exclude[key],
-                    unsupported_keys=unsupported_keys,
-                    remove=remove,
-                )
-
-    if remove:
-        for key in set(include).difference(exclude or {}):
-            metadata.pop(key, None)
-
-    return filtered_metadata
+    return MetadataSubset(keep_only=keep_only, exclude=exclude).apply(
+        metadata, unsupported_keys=unsupported_keys, remove=remove
+    )
 
 
 def restore_filtered_metadata(filtered_metadata, unfiltered_metadata, user_filter, default_filter):
     """Update the filtered metadata with the part of the unfiltered one that matches the filter"""
-    filtered_unfiltered_metadata = filter_metadata(unfiltered_metadata, user_filter, default_filter)
-
-    metadata = copy(filtered_metadata)
-    for key in unfiltered_metadata:
-        if key not in filtered_unfiltered_metadata:
-            # We don't want to restore the line_to_next_cell metadata from the ipynb file, see #761
-            if key not in _JUPYTEXT_CELL_METADATA:
-                metadata[key] = unfiltered_metadata[key]
-
-    return metadata
+    return compile_metadata_filter(user_filter, default_filter).restore(filtered_metadata, unfiltered_metadata)
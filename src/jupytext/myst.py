@@ -6,6 +6,8 @@ myst formatted text documents and notebooks.
 import json
 import re
 import warnings
+from functools import cache
+from importlib.util import find_spec
 from textwrap import dedent
 
 import nbformat as nbf
@@ -15,14 +17,6 @@ from yaml.representer import SafeRepresenter
 from .cell_to_text import three_backticks_or_more
 from .metadata_filter import _JUPYTER_METADATA_NAMESPACE
 
-try:
-    from markdown_it import MarkdownIt
-    from mdit_py_plugins.front_matter import front_matter_plugin
-    from mdit_py_plugins.myst_blocks import myst_block_plugin
-    from mdit_py_plugins.myst_role import myst_role_plugin
-except ImportError:
-    MarkdownIt = None
-
 MYST_FORMAT_NAME = "myst"
 CODE_DIRECTIVE = "{code-cell}"
 RAW_DIRECTIVE = "{raw-cell}"
@@ -31,9 +25,11 @@ _DEFAULT_ROOT_LEVEL_METADATA = "all"
 SafeRepresenter.add_representer(nbf.NotebookNode, SafeRepresenter.represent_dict)
 
 
+@cache
 def is_myst_available():
-    """Whether the markdown-it-py package is available."""
-    return MarkdownIt is not None
+    """Whether the markdown-it-py package is available. The package is imported
+    only when a MyST document is parsed."""
+    return find_spec("markdown_it") is not None and find_spec("mdit_py_plugins") is not None
 
 
 def raise_if_myst_is_not_available():
@@ -55,6 +51,11 @@ def myst_extensions(no_md=False):
 
 def get_parser():
     """Return the markdown-it parser to use."""
+    from markdown_it import MarkdownIt
+    from mdit_py_plugins.front_matter import front_matter_plugin
+    from mdit_py_plugins.myst_blocks import myst_block_plugin
+    from mdit_py_plugins.myst_role import myst_role_plugin
+
     parser = (
         MarkdownIt("commonmark")
         .enable("table")
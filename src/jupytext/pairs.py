@@ -1,6 +1,9 @@
 """Functions to read or write paired notebooks"""
 
+import asyncio
+import inspect
 from collections import namedtuple
+from functools import partial
 
 from .formats import long_form_multiple_formats, long_form_one_format
 from .paired_paths import paired_paths
@@ -12,6 +15,60 @@ class PairedFilesDiffer(ValueError):
     """An error when the two representations of a paired notebook differ"""
 
 
+def gather(*results):
+    """Run the awaitables concurrently in the async contents manager. In the sync
+    contents manager (generated from the async one), the results are already there."""
+    if any(inspect.isawaitable(result) for result in results):
+        return asyncio.gather(*results)
+    return list(results)
+
+
+async def async_run_in_executor(executor, func, *args, **kwargs):
+    """Run the function in the executor, without blocking the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(executor, partial(func, *args, **kwargs))
+
+
+def sync_run_in_executor(executor, func, *args, **kwargs):
+    """The sync contents manager (generated from the async one) runs the function in the current thread"""
+    return func(*args, **kwargs)
+
+
+def async_conversion_pool(conversion_executor, max_workers):
+    """A new pool of threads or processes for the conversions of the async contents manager.
+    The processes are spawned, as forking the multi-threaded Jupyter server could deadlock."""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    if conversion_executor == "thread":
+        return ThreadPoolExecutor(max_workers=max_workers)
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def sync_conversion_pool(conversion_executor, max_workers):
+    """The sync contents manager (generated from the async one) does not use a pool"""
+    return None
+
+
+def combine_paired_notebooks(notebook, notebook_with_outputs, inputs_path, inputs_fmt, outputs_path, must_match=False):
+    """Combine the inputs and the outputs of a paired notebook. The async contents manager
+    can run this function in a pool of threads or processes."""
+    from .combine import combine_inputs_with_outputs
+    from .compare import compare
+    from .formats import check_file_version
+    from .jupytext import writes
+
+    check_file_version(notebook, inputs_path, outputs_path)
+
+    if must_match:
+        in_text = writes(notebook, inputs_fmt)
+        out_text = writes(notebook_with_outputs, inputs_fmt)
+        diff = compare(out_text, in_text, outputs_path, inputs_path, return_diff=True)
+        if diff:
+            raise PairedFilesDiffer(diff)
+
+    return combine_inputs_with_outputs(notebook, notebook_with_outputs, fmt=inputs_fmt)
+
+
 def latest_inputs_and_outputs(path, fmt, formats, get_timestamp, contents_manager_mode=False):
     """Given a notebook path, its format and paired formats, and a function that
     returns the timestamp for each (or None if the file does not exist), return
@@ -0,0 +1,187 @@
+"""An opt-in cache for the notebooks that Jupytext reads from text"""
+
+import hashlib
+import json
+import os
+import warnings
+from collections import OrderedDict
+from copy import deepcopy
+
+import nbformat
+
+from .formats import long_form_one_format
+from .header import insert_or_test_version_number
+from .version import __version__
+
+# Set this environment variable to enable the parse cache, with an on-disk store in that directory
+JUPYTEXT_PARSE_CACHE_DIR = "JUPYTEXT_PARSE_CACHE_DIR"
+
+
+class ParseCache:
+    """A cache for the notebooks parsed from text. The cache is keyed on the hash
+    of the text, the format, the configuration options that apply when reading the
+    notebook, and the version of Jupytext. The most recent notebooks are kept
+    in memory, and they are also stored in cache_dir, if provided.
+
+    As notebooks are mutable, the cache stores a copy of the notebook
+    and returns a new copy each time the notebook is requested.
+
+    The cache returned by enable_parse_cache is a context manager that
+    restores the previous cache on exit.
+    """
+
+    def __init__(self, max_entries=128, cache_dir=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._notebooks = OrderedDict()
+        self._previous = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        global _PARSE_CACHE
+        if _PARSE_CACHE is self:
+            _PARSE_CACHE = self._previous
+        self._previous = None
+
+    def key(self, text, fmt=None, as_version=nbformat.NO_CONVERT, config=None):
+        """The cache key for the notebook represented by this text, or None if
+        the notebook should not be cached (e.g. ipynb notebooks)"""
+        if fmt:
+            fmt = long_form_one_format(fmt)
+            if fmt["extension"] == ".ipynb":
+                return None
+        elif text.lstrip().startswith("{"):
+            # This is probably an ipynb notebook
+            return None
+
+        config_options = {}
+        if config is not None:
+            with warnings.catch_warnings():
+                # Warnings about deprecated options are issued when the notebook is read
+                warnings.simplefilter("ignore")
+                config.set_default_format_options(config_options, read=True)
+            config_options["root_level_metadata_as_raw_cell"] = config.root_level_metadata_as_raw_cell
+
+        context = json.dumps(
+            [fmt or None, config_options, as_version, insert_or_test_version_number(), __version__],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256((context + "\n" + text).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return a copy of the cached notebook, or None"""
+        if key in self._notebooks:
+            self._notebooks.move_to_end(key)
+            self.hits += 1
+            return deepcopy(self._notebooks[key])
+
+        notebook = self._read_from_disk(key)
+        if notebook is not None:
+            self._store_in_memory(key, notebook)
+            self.hits += 1
+            return deepcopy(notebook)
+
+        self.misses += 1
+        return None
+
+    def put(self, key, notebook):
+        """Store a copy of the notebook in the cache"""
+        self._store_in_memory(key, deepcopy(notebook))
+        self._write_to_disk(key, notebook)
+
+    def clear(self):
+        """Empty the in-memory cache and reset the counters"""
+        self._notebooks.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """The number of hits, misses, and of notebooks in memory"""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._notebooks)}
+
+    def _store_in_memory(self, key, notebook):
+        self._notebooks[key] = notebook
+        self._notebooks.move_to_end(key)
+        while len(self._notebooks) > self.max_entries:
+            self._notebooks.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def _read_from_disk(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(key), encoding="utf-8") as fp:
+                return nbformat.from_dict(json.load(fp))
+        except (OSError, ValueError):
+            return None
+
+    def _write_to_disk(self, key, notebook):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        tmp_path = path + f".tmp_{os.getpid()}"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as fp:
+                json.dump(notebook, fp)
+            os.replace(tmp_path, path)
+        except OSError:
+            # The on-disk store is optional
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+# The cache enabled with enable_parse_cache, None when the cache was disabled,
+# or _FROM_ENVIRONMENT when the JUPYTEXT_PARSE_CACHE_DIR environment variable decides
+_FROM_ENVIRONMENT = object()
+_PARSE_CACHE = _FROM_ENVIRONMENT
+_ENVIRONMENT_PARSE_CACHE = None
+
+
+def enable_parse_cache(max_entries=128, cache_dir=None, cache=None):
+    """Cache the notebooks read with jupytext.read and jupytext.reads. Use e.g.
+    cache_dir='.jupytext_cache' to also store the parsed notebooks on disk (defaults
+    to the JUPYTEXT_PARSE_CACHE_DIR environment variable), or pass an existing cache.
+    Return the cache object, which exposes the hit and miss counters. The cache is
+    enabled until disable_parse_cache is called, or, when it is used as a context
+    manager, until the end of the 'with' block:
+
+        with enable_parse_cache() as cache:
+            ...
+    """
+    global _PARSE_CACHE
+    if cache is None:
+        if cache_dir is None:
+            cache_dir = os.environ.get(JUPYTEXT_PARSE_CACHE_DIR)
+        cache = ParseCache(max_entries=max_entries, cache_dir=cache_dir)
+    cache._previous = _PARSE_CACHE
+    _PARSE_CACHE = cache
+    return cache
+
+
+def disable_parse_cache():
+    """Stop caching the notebooks parsed from text"""
+    global _PARSE_CACHE
+    _PARSE_CACHE = None
+
+
+def get_parse_cache():
+    """Return the current parse cache, or None if the cache is not enabled. When neither
+    enable_parse_cache nor disable_parse_cache were called, the cache is enabled by the
+    JUPYTEXT_PARSE_CACHE_DIR environment variable"""
+    global _ENVIRONMENT_PARSE_CACHE
+    if _PARSE_CACHE is not _FROM_ENVIRONMENT:
+        return _PARSE_CACHE
+    cache_dir = os.environ.get(JUPYTEXT_PARSE_CACHE_DIR)
+    if not cache_dir:
+        return None
+    if _ENVIRONMENT_PARSE_CACHE is None or _ENVIRONMENT_PARSE_CACHE.cache_dir != cache_dir:
+        _ENVIRONMENT_PARSE_CACHE = ParseCache(cache_dir=cache_dir)
+    return _ENVIRONMENT_PARSE_CACHE
@@ -3,16 +3,18 @@
 from .stringparser import StringParser
 
 
-def next_instruction_is_function_or_class(lines):
-    """Is the first non-empty, non-commented line of the cell either a function or a class?"""
+def next_instruction_is_function_or_class(lines, start=0):
+    """Is the first non-empty, non-commented line of the cell (starting at lines[start])
+    either a function or a class?"""
     parser = StringParser("python")
-    for i, line in enumerate(lines):
+    for i in range(start, len(lines)):
+        line = lines[i]
         if parser.is_quoted():
             parser.read_line(line)
             continue
         parser.read_line(line)
         if not line.strip():  # empty line
-            if i > 0 and not lines[i - 1].strip():
+            if i > start and not lines[i - 1].strip():
                 return False
             continue
         if line.startswith("def ") or line.startswith("async ") or line.startswith("class "):
@@ -61,16 +63,16 @@ def cell_ends_with_code(lines):
     return True
 
 
-def cell_has_code(lines):
-    """Is there any code in this cell?"""
-    for i, line in enumerate(lines):
-        stripped_line = line.strip()
+def cell_has_code(lines, start=0):
+    """Is there any code in this cell (starting at lines[start])?"""
+    for i in range(start, len(lines)):
+        stripped_line = lines[i].strip()
         if stripped_line.startswith("#"):
             continue
 
         # Two consecutive blank lines?
         if not stripped_line:
-            if i > 0 and not lines[i - 1].strip():
+            if i > start and not lines[i - 1].strip():
                 return False
             continue
 
@@ -79,16 +81,17 @@ def cell_has_code(lines):
     return False
 
 
-def pep8_lines_between_cells(prev_lines, next_lines, ext):
-    """How many blank lines should be added between the two python paragraphs to make them pep8?"""
-    if not next_lines:
+def pep8_lines_between_cells(prev_lines, next_lines, ext, next_start=0):
+    """How many blank lines should be added between the two python paragraphs to make them pep8?
+    The next paragraph is read from next_lines, starting at next_start"""
+    if len(next_lines) <= next_start:
         return 1
     if not prev_lines:
         return 0
     if ext != ".py":
         return 1
     if cell_ends_with_function_or_class(prev_lines):
-        return 2 if cell_has_code(next_lines) else 1
-    if cell_ends_with_code(prev_lines) and next_instruction_is_function_or_class(next_lines):
+        return 2 if cell_has_code(next_lines, next_start) else 1
+    if cell_ends_with_code(prev_lines) and next_instruction_is_function_or_class(next_lines, next_start):
         return 2
     return 1
@@ -0,0 +1,168 @@
+"""In-process adapters for the commands used with 'jupytext --pipe'.
+
+An adapter replaces a command that reads the notebook text on stdin and writes
+the formatted text on stdout, like 'black -', with a call to the Python API of
+that program. This saves the start-up time of a new interpreter for each notebook.
+
+An adapter is registered under the name of the program, and is a function that
+takes the arguments of the command (e.g. ['-'] for 'black -') and returns either
+a function that maps the text of the notebook to the formatted text, or None
+when the program is not installed, or when the adapter does not support these
+arguments or the configuration of the program. In that case Jupytext runs the
+command in a subprocess, as it does when the formatting function raises an error.
+
+Other packages can register adapters with an entry point in the
+'jupytext.pipe_adapters' group, e.g. in their pyproject.toml:
+
+    [project.entry-points."jupytext.pipe_adapters"]
+    my_formatter = "my_package.jupytext_adapter:my_formatter_adapter"
+
+The adapters registered by entry points take precedence over the ones below.
+"""
+
+import os
+from functools import cache, lru_cache
+
+PIPE_ADAPTERS_ENTRY_POINT_GROUP = "jupytext.pipe_adapters"
+
+# These options of black only select the files to format
+_BLACK_FILE_SELECTION_OPTIONS = {
+    "include",
+    "exclude",
+    "extend_exclude",
+    "force_exclude",
+    "quiet",
+    "verbose",
+    "color",
+}
+
+
+def black_adapter(args):
+    """An adapter for 'black -'. The options in the pyproject.toml file of the current
+    project are supported, except for the less common ones"""
+    if args != ["-"]:
+        return None
+    try:
+        import black
+    except ImportError:
+        return None
+
+    config_path = black.find_pyproject_toml((os.getcwd(),))
+    config = black.parse_pyproject_toml(config_path) if config_path else {}
+    config = {key: value for key, value in config.items() if key not in _BLACK_FILE_SELECTION_OPTIONS}
+    try:
+        target_versions = {black.TargetVersion[version.upper()] for version in config.pop("target_version", [])}
+        mode = black.Mode(
+            target_versions=target_versions,
+            line_length=config.pop("line_length", black.DEFAULT_LINE_LENGTH),
+            string_normalization=not config.pop("skip_string_normalization", False),
+            magic_trailing_comma=not config.pop("skip_magic_trailing_comma", False),
+            preview=config.pop("preview", False),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+    if config:
+        # Other options are only supported by the black command
+        return None
+
+    def format_with_black(text):
+        try:
+            return black.format_file_contents(text, fast=False, mode=mode)
+        except black.NothingChanged:
+            return text
+
+    return format_with_black
+
+
+def isort_adapter(args):
+    """An adapter for 'isort -' with optional arguments, e.g. --float-to-top"""
+    if not args or args[0] != "-":
+        return None
+    try:
+        import isort
+        import isort.main
+    except ImportError:
+        return None
+
+    try:
+        arguments = isort.main.parse_args(args)
+        if arguments.pop("files", None) != ["-"]:
+            return None
+        arguments.setdefault("settings_path", os.getcwd())
+        config = isort.Config(**arguments)
+    except (Exception, SystemExit):
+        # Unsupported arguments or settings are reported by the isort command
+        return None
+
+    def format_with_isort(text):
+        return isort.code(text, config=config)
+
+    return format_with_isort
+
+
+def autopep8_adapter(args):
+    """An adapter for 'autopep8 -', with optional arguments"""
+    if not args or args[0] != "-":
+        return None
+    try:
+        import autopep8
+    except ImportError:
+        return None
+
+    try:
+        options = autopep8.parse_args(args, apply_config=True)
+    except (Exception, SystemExit):
+        return None
+    if options.files != ["-"] or options.in_place or options.diff or options.list_fixes:
+        return None
+
+    def format_with_autopep8(text):
+        return autopep8.fix_code(text, options=options)
+
+    return format_with_autopep8
+
+
+_BUILTIN_PIPE_ADAPTERS = {
+    "black": black_adapter,
+    "isort": isort_adapter,
+    "autopep8": autopep8_adapter,
+}
+
+
+@cache
+def entry_point_pipe_adapters():
+    """The adapters registered by other packages with an entry point"""
+    from importlib.metadata import entry_points
+
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        eps = eps.select(group=PIPE_ADAPTERS_ENTRY_POINT_GROUP)
+    else:
+        # Python 3.9
+        eps = eps.get(PIPE_ADAPTERS_ENTRY_POINT_GROUP, [])
+    return {ep.name: ep for ep in eps}
+
+
+def find_pipe_adapter(command):
+    """Return a function that formats the notebook text in-process like the command
+    (a list of arguments) would do, or None if no adapter supports that command.
+    The adapters are cached per command and working directory, as they may read
+    the configuration of the program"""
+    if not command:
+        return None
+    return _find_pipe_adapter(tuple(command), os.getcwd())
+
+
+def clear_pipe_adapter_cache():
+    """Forget the adapters found previously, e.g. when the configuration files may have changed"""
+    _find_pipe_adapter.cache_clear()
+
+
+@lru_cache(maxsize=128)
+def _find_pipe_adapter(command, cwd):
+    program, args = command[0], list(command[1:])
+    entry_point = entry_point_pipe_adapters().get(program)
+    adapter = entry_point.load() if entry_point is not None else _BUILTIN_PIPE_ADAPTERS.get(program)
+    if adapter is None:
+        return None
+    return adapter(args)
@@ -0,0 +1,120 @@
+"""Sign the notebooks written by the Jupytext CLI. The signatures are computed
+from the notebooks in memory, and stored in the notary database in a single
+transaction at the end of the run"""
+
+from copy import copy, deepcopy
+from datetime import datetime, timezone
+
+from nbformat.sign import SQLiteSignatureStore
+
+from .formats import rearrange_jupytext_metadata
+from .jupytext import drop_text_representation_metadata
+
+
+def ipynb_notebook_as_read(notebook):
+    """Return the notebook that reading the output of jupytext.writes(notebook, "ipynb")
+    would return, up to the representation of multiline strings, which does not affect
+    the notebook signature. The cells are shallow copies of the cells of the notebook."""
+    metadata = deepcopy(notebook.metadata)
+    rearrange_jupytext_metadata(metadata)
+    # These metadata are not saved to ipynb files, cf. nbformat.v4.rwbase.strip_transient
+    metadata.pop("orig_nbformat", None)
+    metadata.pop("orig_nbformat_minor", None)
+    metadata.pop("signature", None)
+    nb = drop_text_representation_metadata(notebook, metadata)
+
+    cells = []
+    for cell in nb.cells:
+        if "trusted" in cell.metadata:
+            cell = copy(cell)
+            cell.metadata = copy(cell.metadata)
+            cell.metadata.pop("trusted")
+        cells.append(cell)
+    nb.cells = cells
+    return nb
+
+
+class BatchedNotary:
+    """A wrapper around a NotebookNotary. The signatures of the notebooks signed
+    with this object, and the signatures found when checking notebooks, are kept in
+    memory until flush is called. They are then written to the signature store
+    (or their 'last_seen' timestamp is updated) in a single transaction."""
+
+    def __init__(self, notary):
+        self.notary = notary
+        self.pending_signatures = set()
+
+    def check_signature(self, nb):
+        """Is the notebook signed, either in the store or in the pending signatures?"""
+        if nb.nbformat < 3:
+            return False
+        signature = (self.notary.compute_signature(nb), self.notary.algorithm)
+        if signature in self.pending_signatures:
+            return True
+
+        store = self.notary.store
+        if not isinstance(store, SQLiteSignatureStore):
+            return store.check_signature(*signature)
+        if store.db is None or not self._is_known(store, *signature):
+            return False
+        # The 'last_seen' timestamp of this signature is updated on flush
+        self.pending_signatures.add(signature)
+        return True
+
+    @staticmethod
+    def _is_known(store, signature, algorithm):
+        return (
+            store.db.execute(
+                "SELECT id FROM nbsignatures WHERE algorithm = ? AND signature = ?;",
+                (algorithm, signature),
+            ).fetchone()
+            is not None
+        )
+
+    def sign(self, nb):
+        """Sign the notebook. The signature is stored when flush is called"""
+        if nb.nbformat < 3:
+            return
+        self.pending_signatures.add((self.notary.compute_signature(nb), self.notary.algorithm))
+
+    def mark_cells(self, nb, trusted):
+        self.notary.mark_cells(nb, trusted)
+
+    def check_cells(self, nb):
+        return self.notary.check_cells(nb)
+
+    def flush(self):
+        """Write the pending signatures to the signature store"""
+        if not self.pending_signatures:
+            return
+        signatures = sorted(self.pending_signatures)
+        self.pending_signatures = set()
+
+        store = self.notary.store
+        if not isinstance(store, SQLiteSignatureStore):
+            for signature, algorithm in signatures:
+                store.store_signature(signature, algorithm)
+            return
+
+        if store.db is None:
+            return
+
+        # Same as SQLiteSignatureStore.store_signature, with a single commit for all the signatures
+        now = datetime.now(tz=timezone.utc)
+        for signature, algorithm in signatures:
+            if not self._is_known(store, signature, algorithm):
+                store.db.execute(
+                    "INSERT INTO nbsignatures (algorithm, signature, last_seen) VALUES (?, ?, ?)",
+                    (algorithm, signature, now),
+                )
+            else:
+                store.db.execute(
+                    "UPDATE nbsignatures SET last_seen = ? WHERE algorithm = ? AND signature = ?;",
+                    (now, algorithm, signature),
+                )
+        store.db.commit()
+
+        (n,) = store.db.execute("SELECT Count(*) FROM nbsignatures").fetchone()
+        if n > store.cache_size:
+            store.cull_db()
+            store.db.commit()
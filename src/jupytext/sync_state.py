@@ -0,0 +1,125 @@
+"""Record the state of the paired files after a successful 'jupytext --sync',
+so that unchanged pairs can be skipped on the next run"""
+
+import hashlib
+import json
+import os
+
+from .version import __version__
+
+SYNC_STATE_FILE = ".jupytext-sync-state"
+
+
+def file_signature(path):
+    """The modification time, size and content hash of the file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+        with open(path, "rb") as fp:
+            content_hash = hashlib.sha256(fp.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime, stat.st_size, content_hash]
+
+
+def config_signature(nb_file):
+    """A signature for the Jupytext configuration file that applies to the notebook.
+    The signature is [config_file, None] when the configuration file cannot be read"""
+    from .config import find_jupytext_configuration_file
+
+    config_file = find_jupytext_configuration_file(os.path.abspath(nb_file))
+    if config_file is None:
+        return None
+    signature = file_signature(config_file)
+    if signature is None:
+        # The configuration file was removed after it was found
+        return [config_file, None]
+    return [config_file] + signature
+
+
+class SyncState:
+    """The paired files of the notebooks that were successfully synchronized,
+    with their modification time, size and content hash, the Jupytext version
+    and the configuration file in use at that time"""
+
+    def __init__(self, path=SYNC_STATE_FILE):
+        self.path = path
+        self.notebooks = {}
+        self.updated = {}
+        try:
+            with open(path, encoding="utf-8") as fp:
+                self.notebooks = json.load(fp).get("notebooks", {})
+        except (OSError, ValueError, AttributeError):
+            # A missing or corrupted state file is ignored
+            self.notebooks = {}
+
+    def pair_is_unchanged(self, nb_file):
+        """Are the paired files of this notebook unchanged since the last successful sync?"""
+        nb_file = os.path.abspath(nb_file)
+        entry = self.notebooks.get(nb_file)
+        if not entry or entry.get("jupytext_version") != __version__:
+            return False
+        if entry.get("config") != config_signature(nb_file):
+            return False
+
+        files = {}
+        for path, signature in entry.get("files", {}).items():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                if signature is not None:
+                    return False
+                files[path] = None
+                continue
+
+            if signature is None or stat.st_size != signature[1]:
+                return False
+            if stat.st_mtime != signature[0]:
+                # The file was touched, maybe its content is unchanged
+                new_signature = file_signature(path)
+                if new_signature is None or new_signature[2] != signature[2]:
+                    return False
+                signature = new_signature
+            files[path] = signature
+
+        if files != entry["files"]:
+            self._set(nb_file, dict(entry, files=files))
+        return True
+
+    def record(self, nb_file, paths):
+        """Record the state of the paired files after a successful sync"""
+        nb_file = os.path.abspath(nb_file)
+        config = config_signature(nb_file)
+        if config is not None and config[1] is None:
+            # The pair is synchronized again on the next run
+            self._set(nb_file, None)
+            return
+        self._set(
+            nb_file,
+            {
+                "jupytext_version": __version__,
+                "config": config,
+                "files": {os.path.abspath(path): file_signature(path) for path in paths},
+            },
+        )
+
+    def _set(self, nb_file, entry):
+        self.updated[nb_file] = entry
+        if entry is None:
+            self.notebooks.pop(nb_file, None)
+        else:
+            self.notebooks[nb_file] = entry
+
+    def update(self, updated):
+        """Apply the updates made by another SyncState object, e.g. in a worker process"""
+        for nb_file, entry in updated.items():
+            self._set(nb_file, entry)
+
+    def save(self):
+        """Save the state file, if anything changed"""
+        if not self.updated:
+            return
+        tmp_path = self.path + f"_tmp_jupytext_{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as fp:
+            json.dump({"notebooks": self.notebooks}, fp, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.updated = {}
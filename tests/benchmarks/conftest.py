@@ -0,0 +1,57 @@
+"""Benchmarks for Jupytext. As they take some time, they are skipped unless
+the JUPYTEXT_BENCHMARKS environment variable is set, e.g.
+
+    JUPYTEXT_BENCHMARKS=1 pytest tests/benchmarks -s -p no:xdist
+"""
+
+import os
+import time
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def skip_unless_benchmarks_are_enabled():
+    if not os.environ.get("JUPYTEXT_BENCHMARKS"):
+        pytest.skip("Set JUPYTEXT_BENCHMARKS=1 to run the benchmarks")
+
+
+def best_time(func, *args, repeat=3, **kwargs):
+    """The best execution time of func(*args, **kwargs) over a few runs"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+@pytest.fixture
+def time_curve():
+    """Return a function that times 'func(make_input(size))' for each size,
+    prints the resulting curve, and returns the times"""
+
+    def _time_curve(func, make_input, sizes, repeat=3):
+        times = []
+        for size in sizes:
+            arg = make_input(size)
+            times.append(best_time(func, arg, repeat=repeat))
+            print(f"{func.__name__}: size={size} time={times[-1]:.4f}s")
+        return times
+
+    return _time_curve
+
+
+@pytest.fixture
+def assert_linear_time(time_curve):
+    """Assert that the execution time of func(make_input(size)) grows linearly with size.
+    The tolerance is large enough to avoid false positives on busy machines, but still
+    small enough to catch a quadratic behavior."""
+
+    def _assert_linear_time(func, make_input, size, factor=4, repeat=3):
+        small, large = time_curve(func, make_input, [size, factor * size], repeat=repeat)
+        assert large < 2 * factor * small, (
+            f"{func.__name__} does not scale linearly: {small:.4f}s at size={size} vs {large:.4f}s at size={factor * size}"
+        )
+
+    return _assert_linear_time
@@ -0,0 +1,73 @@
+import asyncio
+import time
+from unittest import mock
+
+import pytest
+from jupyter_server.services.contents.largefilemanager import AsyncLargeFileManager
+from nbformat.v4.nbbase import new_code_cell, new_markdown_cell, new_notebook
+
+import jupytext
+from jupytext.compare import notebook_model
+
+pytestmark = pytest.mark.asyncio
+
+
+class SlowAsyncLargeFileManager(AsyncLargeFileManager):
+    """A stand-in for a network-backed contents manager, e.g. jupyter-fs on S3"""
+
+    latency = 0.05
+
+    async def get(self, path, *args, **kwargs):
+        await asyncio.sleep(self.latency)
+        return await super().get(path, *args, **kwargs)
+
+    async def save(self, model, path=""):
+        await asyncio.sleep(self.latency)
+        return await super().save(model, path)
+
+
+def sequential_gather(*awaitables):
+    async def run_one_after_the_other():
+        return [await awaitable for awaitable in awaitables]
+
+    return run_one_after_the_other()
+
+
+async def time_save_and_get(cm):
+    notebook = new_notebook(
+        cells=[new_markdown_cell("A Markdown cell"), new_code_cell("1 + 1")],
+        metadata={"kernelspec": {"name": "python3", "language": "python", "display_name": "Python 3"}},
+    )
+    await cm.save(notebook_model(notebook), "notebook.ipynb")
+
+    start = time.perf_counter()
+    await cm.save(notebook_model(notebook), "notebook.ipynb")
+    save_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await cm.get("notebook.ipynb")
+    get_time = time.perf_counter() - start
+
+    return save_time, get_time
+
+
+async def test_paired_files_are_read_and_written_concurrently(tmpdir):
+    cm = jupytext.build_async_jupytext_contents_manager_class(SlowAsyncLargeFileManager)()
+    cm.root_dir = str(tmpdir)
+    cm.formats = "ipynb,py:percent,md,auto//R:percent"
+
+    save_time, get_time = await time_save_and_get(cm)
+
+    with (
+        mock.patch("jupytext.async_contentsmanager.gather", sequential_gather),
+        mock.patch("jupytext.async_pairs.gather", sequential_gather),
+    ):
+        sequential_save_time, sequential_get_time = await time_save_and_get(cm)
+
+    print(
+        f"With a latency of {SlowAsyncLargeFileManager.latency}s, save takes {save_time:.3f}s "
+        f"(vs {sequential_save_time:.3f}s with sequential I/O) and get takes {get_time:.3f}s "
+        f"(vs {sequential_get_time:.3f}s)"
+    )
+    assert save_time < 0.75 * sequential_save_time
+    assert get_time < 0.75 * sequential_get_time
@@ -0,0 +1,26 @@
+import pytest
+
+import jupytext
+
+
+def percent_script(n_cells):
+    return "\n".join(f"# %%\nx{i} = {i}\n\n# %% [markdown]\n# Cell {i}\n" for i in range(n_cells))
+
+
+def light_script(n_cells):
+    return "\n".join(f"def f{i}(x):\n    return x + {i}\n\n\n# A comment for cell {i}\n" for i in range(n_cells))
+
+
+def markdown_document(n_cells):
+    return "\n".join(f"Cell {i}\n\n```python\nx{i} = {i}\n```\n" for i in range(n_cells))
+
+
+@pytest.mark.parametrize(
+    "fmt,make_text",
+    [("py:percent", percent_script), ("py:light", light_script), ("md", markdown_document)],
+)
+def test_reads_is_linear_in_the_number_of_cells(fmt, make_text, assert_linear_time):
+    def reads(text):
+        return jupytext.reads(text, fmt)
+
+    assert_linear_time(reads, make_text, size=2000, repeat=1)
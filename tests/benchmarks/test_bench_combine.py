@@ -0,0 +1,33 @@
+from nbformat.v4.nbbase import new_code_cell, new_markdown_cell
+
+from jupytext.combine import map_outputs_to_inputs
+
+
+def reordered_cells(n_cells):
+    """Cells with outputs, and the same cells in reverse order, some of them
+    being split, edited, or new"""
+    cells_outputs = []
+    for i in range(n_cells):
+        cells_outputs.append(new_markdown_cell(f"## Section {i}"))
+        cells_outputs.append(new_code_cell(f"def f{i}(x):\n    return x + {i}\n\ny{i} = f{i}({i})"))
+
+    cells_inputs = []
+    for i in reversed(range(n_cells)):
+        cells_inputs.append(new_markdown_cell(f"## Section {i}"))
+        if i % 3 == 0:
+            # The final part of a cell that was split
+            cells_inputs.append(new_code_cell(f"y{i} = f{i}({i})"))
+        elif i % 3 == 1:
+            # A new cell
+            cells_inputs.append(new_code_cell(f"z{i} = {i}"))
+        else:
+            cells_inputs.append(new_code_cell(f"def f{i}(x):\n    return x + {i}\n\ny{i} = f{i}({i})"))
+
+    return cells_inputs, cells_outputs
+
+
+def test_map_outputs_to_inputs_on_reordered_notebooks_is_quasi_linear(assert_linear_time):
+    def map_reordered_cells(cells):
+        return map_outputs_to_inputs(*cells)
+
+    assert_linear_time(map_reordered_cells, reordered_cells, size=400)
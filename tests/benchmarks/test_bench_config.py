@@ -0,0 +1,42 @@
+import os
+import time
+
+from jupytext import config as jupytext_config
+from jupytext.config import load_jupytext_config
+
+
+def test_config_of_many_notebooks_under_one_pyproject_is_parsed_once(tmp_path, n_notebooks=1000):
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text(
+        '[tool.jupytext]\nformats = "ipynb,py:percent"\n' + "".join(f"[tool.other{i}]\nx = {i}\n" for i in range(200))
+    )
+    nested = tmp_path / "a" / "b" / "c" / "d"
+    nested.mkdir(parents=True)
+    for path in [pyproject, nested, *nested.parents]:
+        if tmp_path in [path, *path.parents]:
+            stat = os.stat(path)
+            os.utime(path, (stat.st_atime - 10, stat.st_mtime - 10))
+    notebooks = [str(nested / f"notebook_{i}.ipynb") for i in range(n_notebooks)]
+
+    def load_config_of_all_notebooks():
+        for nb_file in notebooks:
+            load_jupytext_config(nb_file)
+
+    def load_config_of_all_notebooks_without_cache():
+        for nb_file in notebooks:
+            jupytext_config._CONFIG_FILE_IN_DIRECTORY.clear()
+            jupytext_config._CONFIG_FROM_FILE.clear()
+            jupytext_config._PYPROJECT_HAS_JUPYTEXT_SECTION.clear()
+            load_jupytext_config(nb_file)
+
+    load_config_of_all_notebooks()
+    start = time.perf_counter()
+    load_config_of_all_notebooks()
+    with_cache = time.perf_counter() - start
+
+    start = time.perf_counter()
+    load_config_of_all_notebooks_without_cache()
+    without_cache = time.perf_counter() - start
+
+    print(f"load_jupytext_config on {n_notebooks} notebooks: {with_cache:.4f}s (cached) vs {without_cache:.4f}s")
+    assert with_cache < without_cache / 5
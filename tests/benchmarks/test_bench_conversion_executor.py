@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+import pytest
+from nbformat.v4.nbbase import new_code_cell, new_markdown_cell, new_notebook, new_output
+
+import jupytext
+from jupytext.compare import notebook_model
+
+pytestmark = pytest.mark.asyncio
+
+
+def large_notebook(n_cells=1000):
+    cells = []
+    for i in range(n_cells):
+        cells.append(new_markdown_cell(f"## Section {i}\n\nSome text about the cell below"))
+        cells.append(
+            new_code_cell(
+                f"x_{i} = {i}\ny_{i} = x_{i} ** 2\ny_{i}",
+                execution_count=i + 1,
+                outputs=[new_output("execute_result", data={"text/plain": str(i * i)}, execution_count=i + 1)],
+            )
+        )
+    return new_notebook(
+        cells=cells,
+        metadata={"kernelspec": {"name": "python3", "language": "python", "display_name": "Python 3"}},
+    )
+
+
+async def max_event_loop_stall(cm, paths, interval=0.001):
+    """Open the notebooks concurrently, and return the longest time during which
+    the event loop could not run another task"""
+    stalls = []
+    done = False
+
+    async def heartbeat():
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(interval)
+            now = time.perf_counter()
+            stalls.append(now - last - interval)
+            last = now
+
+    monitor = asyncio.create_task(heartbeat())
+    start = time.perf_counter()
+    await asyncio.gather(*(cm.get(path) for path in paths))
+    duration = time.perf_counter() - start
+    done = True
+    await monitor
+    return max(stalls), duration
+
+
+async def test_conversion_executor_keeps_the_event_loop_responsive(tmp_path, n_notebooks=4):
+    cm = jupytext.AsyncTextFileContentsManager()
+    cm.root_dir = str(tmp_path)
+    cm.formats = "ipynb,py:percent"
+    nb = large_notebook()
+    paths = []
+    for i in range(n_notebooks):
+        await cm.save(notebook_model(nb), f"nb{i}.ipynb")
+        paths.append(f"nb{i}.py")
+
+    results = {}
+    for conversion_executor in ["none", "thread", "process"]:
+        cm.conversion_executor = conversion_executor
+        # Start the pool before the measure
+        await cm.get(paths[0])
+        results[conversion_executor] = await max_event_loop_stall(cm, paths)
+        print(
+            f"Opening {n_notebooks} paired notebooks with conversion_executor={conversion_executor!r}: "
+            f"max event loop stall={results[conversion_executor][0]:.3f}s, "
+            f"total time={results[conversion_executor][1]:.3f}s"
+        )
+
+    cm.close()
+
+    assert results["thread"][0] < results["none"][0] / 2
+    assert results["process"][0] < results["none"][0] / 2
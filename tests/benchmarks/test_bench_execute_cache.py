@@ -0,0 +1,28 @@
+import time
+
+import pytest
+
+from jupytext.cli import jupytext
+
+
+@pytest.mark.requires_user_kernel_python3
+@pytest.mark.requires_nbconvert
+@pytest.mark.skip_on_windows
+def test_execute_cache_is_faster_than_executing_the_notebooks(tmp_path, n_notebooks=8):
+    scripts = []
+    for i in range(n_notebooks):
+        script = tmp_path / f"nb{i}.py"
+        script.write_text(f"x = {i}\nx + 1\n")
+        scripts.append(str(script))
+    args = ["--to", "ipynb", "--execute", "--execute-cache-dir", str(tmp_path / "cache"), "--quiet"] + scripts
+
+    start = time.perf_counter()
+    jupytext(args)
+    old_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    jupytext(args)
+    new_time = time.perf_counter() - start
+
+    print(f"Executing {n_notebooks} notebooks: {old_time:.2f}s, with the execution cache: {new_time:.2f}s")
+    assert new_time < old_time / 4
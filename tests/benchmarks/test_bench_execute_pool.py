@@ -0,0 +1,36 @@
+import time
+
+import pytest
+from nbformat.v4.nbbase import new_code_cell, new_notebook
+
+from jupytext.execute import KernelPool
+
+
+@pytest.mark.requires_user_kernel_python3
+@pytest.mark.requires_nbconvert
+@pytest.mark.skip_on_windows
+def test_kernel_pool_is_faster_than_a_new_kernel_per_notebook(python_notebook, n_notebooks=8):
+    kernel_name = python_notebook.metadata.kernelspec.name
+
+    def notebooks():
+        return [
+            new_notebook(cells=[new_code_cell(f"x = {i}\nx + 1")], metadata=python_notebook.metadata)
+            for i in range(n_notebooks)
+        ]
+
+    start = time.perf_counter()
+    for nb in notebooks():
+        pool = KernelPool()
+        pool.execute(nb, kernel_name)
+        pool.close()
+    old_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pool = KernelPool(notebooks_left=n_notebooks)
+    for nb in notebooks():
+        pool.execute(nb, kernel_name)
+    pool.close()
+    new_time = time.perf_counter() - start
+
+    print(f"Executing {n_notebooks} notebooks: {old_time:.2f}s, with a kernel pool: {new_time:.2f}s")
+    assert new_time < old_time
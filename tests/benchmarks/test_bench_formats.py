@@ -0,0 +1,48 @@
+import time
+
+from jupytext import reads
+from jupytext.formats import guess_format
+
+
+def make_light_script(n_cells):
+    """A large Python script with no cell markers, i.e. the worst case for format detection"""
+    return "\n\n".join(
+        f'def function_{i}(x):\n    """Docstring of function {i}"""\n    # A comment\n    return x + {i}\n'
+        for i in range(n_cells)
+    )
+
+
+def make_percent_script(n_cells):
+    return "\n\n".join(f"# %%\nx = {i}\n%time y = x + 1\n" for i in range(n_cells))
+
+
+def test_guess_format_is_a_small_fraction_of_parse_time(assert_linear_time, n_cells=2000):
+    text = make_light_script(n_cells)
+    assert_linear_time(lambda text: guess_format(text, ".py"), make_light_script, n_cells // 4)
+
+    start = time.perf_counter()
+    guess_format(text, ".py")
+    guess_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reads(text, fmt="py:light")
+    parse_time = time.perf_counter() - start
+
+    print(f"guess_format: {guess_time:.4f}s vs reads: {parse_time:.4f}s on a script with {n_cells} functions")
+    assert guess_time < parse_time / 4
+
+
+def test_guess_format_stops_at_the_first_percent_cell_with_a_magic(n_cells=20000):
+    text = make_percent_script(n_cells)
+    lines = text.splitlines()
+
+    start = time.perf_counter()
+    assert guess_format(text, ".py", lines, {}) == ("hydrogen", {})
+    guess_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    text.splitlines()
+    split_time = time.perf_counter() - start
+
+    print(f"guess_format: {guess_time:.4f}s vs splitlines: {split_time:.4f}s on a script with {n_cells} cells")
+    assert guess_time < split_time
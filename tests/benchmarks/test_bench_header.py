@@ -0,0 +1,39 @@
+from unittest import mock
+
+import pytest
+import yaml
+from nbformat.v4.nbbase import new_code_cell, new_markdown_cell, new_notebook
+
+from jupytext import reads, writes
+from jupytext.formats import long_form_one_format
+from jupytext.header import header_to_metadata_and_cell
+
+
+def make_header_heavy_text(fmt, n_entries=500):
+    """The text of a notebook with a large YAML header and only a few cells"""
+    notebook = new_notebook(
+        cells=[new_markdown_cell("A short notebook"), new_code_cell("1 + 1")],
+        metadata={
+            "kernelspec": {"name": "python3", "display_name": "Python 3", "language": "python"},
+            "widgets": {
+                f"widget_{i}": {"model": f"model_{i}", "state": {"value": i, "visible": True}} for i in range(n_entries)
+            },
+        },
+    )
+    return writes(notebook, long_form_one_format(fmt, update={"notebook_metadata_filter": "all"}))
+
+
+@pytest.mark.parametrize("fmt", ["py:percent", "py:light", "md", "Rmd", "R:spin"])
+def test_reads_parses_a_large_header_only_once(fmt, time_curve):
+    text = make_header_heavy_text(fmt)
+    with mock.patch("yaml.safe_load", wraps=yaml.safe_load) as safe_load:
+        reads(text, fmt.split(":")[0])
+    assert safe_load.call_count == 1
+
+    (reads_time,) = time_curve(lambda text: reads(text, fmt.split(":")[0]), lambda _: text, [1])
+    header_prefix = {"py:percent": "#", "py:light": "#", "R:spin": "#'"}.get(fmt, "")
+    (header_time,) = time_curve(
+        lambda lines: header_to_metadata_and_cell(lines, header_prefix, ""), lambda _: text.splitlines(), [1]
+    )
+    print(f"{fmt}: reads in {reads_time:.4f}s vs {header_time:.4f}s for a single header parse")
+    assert reads_time < 1.5 * header_time
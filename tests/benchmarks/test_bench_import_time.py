@@ -0,0 +1,70 @@
+"""Start-up time of Jupytext, measured with 'python -X importtime'"""
+
+import subprocess
+import sys
+
+import pytest
+
+# Modules that 'import jupytext' and 'jupytext --version' should not import
+HEAVY_MODULES = [
+    "nbformat",
+    "jsonschema",
+    "yaml",
+    "traitlets",
+    "markdown_it",
+    "jupyter_client",
+    "jupyter_server",
+    "nbconvert",
+    "concurrent.futures",
+]
+
+
+def import_times(code, repeat=3):
+    """Run the code in a new Python process with '-X importtime', and return the best
+    cumulative import time (in seconds) of each module over a few runs"""
+    best = {}
+    for _ in range(repeat):
+        stderr = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stderr
+        for line in stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:") :].split("|")
+            name = name.strip()
+            cumulative = int(cumulative) / 1e6
+            best[name] = min(best.get(name, cumulative), cumulative)
+    return best
+
+
+def print_slowest_imports(times, n=10):
+    for name, cumulative in sorted(times.items(), key=lambda item: -item[1])[:n]:
+        print(f"{cumulative:.4f}s {name}")
+
+
+@pytest.mark.parametrize(
+    "code, module, budget",
+    [
+        ("import jupytext", "jupytext", 0.05),
+        ("from jupytext.cli import jupytext; jupytext(['--version'])", "jupytext.cli", 0.25),
+    ],
+)
+def test_import_time_is_within_budget(code, module, budget):
+    times = import_times(code)
+    print_slowest_imports(times)
+
+    for heavy_module in HEAVY_MODULES:
+        assert heavy_module not in times, f"'{code}' imports {heavy_module}"
+
+    assert times[module] < budget, f"Importing {module} took {times[module]:.4f}s, more than {budget}s"
+
+
+def test_reading_a_notebook_does_not_import_the_optional_dependencies():
+    times = import_times("import jupytext; jupytext.reads('1 + 1', 'py:percent')")
+    print_slowest_imports(times)
+
+    for optional_module in ["markdown_it", "jupyter_client", "jupyter_server", "nbconvert"]:
+        assert optional_module not in times
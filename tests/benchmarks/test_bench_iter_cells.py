@@ -0,0 +1,21 @@
+import time
+from io import StringIO
+
+import jupytext
+
+
+def test_time_to_first_cell_is_small_compared_to_read(n_cells=5000):
+    text = "\n".join(f"# %%\nx{i} = {i}\n\n# %% [markdown]\n# Cell {i}\n" for i in range(n_cells))
+
+    start = time.perf_counter()
+    jupytext.read(StringIO(text), fmt="py:percent")
+    time_to_read = time.perf_counter() - start
+
+    start = time.perf_counter()
+    items = jupytext.iter_cells(StringIO(text), fmt="py:percent")
+    next(items)
+    next(items)
+    time_to_first_cell = time.perf_counter() - start
+
+    print(f"read: {time_to_read:.4f}s, iter_cells (first cell): {time_to_first_cell:.4f}s")
+    assert time_to_first_cell < time_to_read / 2
@@ -0,0 +1,29 @@
+import time
+
+from jupytext.metadata_filter import CompiledMetadataFilter, filter_metadata
+
+
+def test_filter_metadata_does_not_depend_on_the_filter_length(n_cells=5000, n_filter_keys=500):
+    cell_metadata = {"tags": ["parameters"], "ExecuteTime": {"end_time": "now"}, "scrolled": True}
+    short_filter = "-ExecuteTime"
+    long_filter = ",".join(["-ExecuteTime"] + [f"key_{i}.sub_{i}" for i in range(n_filter_keys)])
+
+    def filter_cells(user_filter, compile_each_time=False):
+        start = time.perf_counter()
+        for _ in range(n_cells):
+            if compile_each_time:
+                CompiledMetadataFilter(user_filter, "-scrolled").apply(cell_metadata)
+            else:
+                filter_metadata(cell_metadata, user_filter, "-scrolled")
+        return time.perf_counter() - start
+
+    short_time = filter_cells(short_filter)
+    long_time = filter_cells(long_filter)
+    uncompiled_time = filter_cells(long_filter, compile_each_time=True)
+    print(
+        f"filter_metadata on {n_cells} cells: {short_time:.4f}s with a short filter, "
+        f"{long_time:.4f}s with a filter of {n_filter_keys} keys, "
+        f"and {uncompiled_time:.4f}s when the filter is parsed for each cell"
+    )
+    assert long_time < 2 * short_time
+    assert long_time < uncompiled_time / 10
@@ -0,0 +1,34 @@
+import time
+
+import pytest
+from nbformat.v4.nbbase import new_code_cell, new_markdown_cell, new_notebook
+
+from jupytext.cli import pipe_notebook
+
+
+def make_notebook(i, n_cells=20):
+    cells = []
+    for j in range(n_cells):
+        cells.append(new_markdown_cell(f"## Cell {j}"))
+        cells.append(new_code_cell(f"def f_{i}_{j}(x,y):\n    return {{'x':x,'y':y,'n':{i}}}"))
+    return new_notebook(cells=cells)
+
+
+@pytest.mark.parametrize("command", ["black", "isort -", "autopep8"])
+def test_in_process_adapter_is_faster_than_subprocess(command, n_notebooks=20):
+    pytest.importorskip(command.split(" ")[0])
+    notebooks = [make_notebook(i) for i in range(n_notebooks)]
+
+    start = time.perf_counter()
+    for nb in notebooks:
+        pipe_notebook(nb, command, "py:percent", quiet=True, in_process=False)
+    subprocess_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for nb in notebooks:
+        pipe_notebook(nb, command, "py:percent", quiet=True)
+    in_process_time = time.perf_counter() - start
+
+    print(f"'{command}' on {n_notebooks} notebooks: subprocess {subprocess_time:.2f}s, in-process {in_process_time:.2f}s")
+    # The time saved is the start-up time of the formatter, for each notebook
+    assert in_process_time < subprocess_time
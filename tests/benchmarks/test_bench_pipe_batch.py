@@ -0,0 +1,31 @@
+import shlex
+import sys
+import time
+
+from nbformat.v4.nbbase import new_code_cell, new_notebook
+
+from jupytext import write
+from jupytext.cli import jupytext
+
+
+def test_pipe_batch_is_faster_than_one_command_per_notebook(tmp_path, cwd_tmp_path, capsys, n_notebooks=40):
+    script = tmp_path / "formatter.py"
+    # A formatter that takes some time to start, like black or ruff
+    script.write_text("import time\nimport sys\ntime.sleep(0.1)\n")
+    command = f"{shlex.quote(sys.executable)} {shlex.quote(str(script))} {{}}"
+
+    notebooks = []
+    for i in range(n_notebooks):
+        write(new_notebook(cells=[new_code_cell(f"x = {i}")]), f"nb{i}.ipynb")
+        notebooks.append(f"nb{i}.ipynb")
+
+    start = time.perf_counter()
+    jupytext(["--check", command, "--pipe-fmt", "py:percent", "--quiet"] + notebooks)
+    old_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    jupytext(["--check", command, "--pipe-fmt", "py:percent", "--quiet", "--pipe-batch"] + notebooks)
+    new_time = time.perf_counter() - start
+
+    print(f"--check on {n_notebooks} notebooks: {old_time:.2f}s, with --pipe-batch: {new_time:.2f}s")
+    assert new_time < old_time / 4
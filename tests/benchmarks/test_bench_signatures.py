@@ -0,0 +1,47 @@
+import time
+
+from nbformat.sign import NotebookNotary
+from nbformat.v4.nbbase import new_code_cell, new_markdown_cell, new_notebook, new_output
+
+import jupytext
+from jupytext.signatures import BatchedNotary, ipynb_notebook_as_read
+
+
+def make_notebook(i, n_cells=20):
+    cells = []
+    for j in range(n_cells):
+        cells.append(new_markdown_cell(f"## Notebook {i}, cell {j}\nSome text"))
+        cells.append(
+            new_code_cell(
+                f"x = {i} + {j}\nx",
+                outputs=[new_output("execute_result", data={"text/plain": f"{i + j}"}, execution_count=j)],
+            )
+        )
+    return new_notebook(cells=cells)
+
+
+def test_signing_from_memory_is_faster_than_reading_the_ipynb_text(tmp_path, n_notebooks=300):
+    notebooks = [make_notebook(i) for i in range(n_notebooks)]
+    texts = [jupytext.writes(nb, "ipynb") for nb in notebooks]
+
+    notary = NotebookNotary(db_file=str(tmp_path / "old.db"), secret=b"secret")
+    start = time.perf_counter()
+    for text in texts:
+        notary.sign(jupytext.reads(text, fmt="ipynb"))
+    old_time = time.perf_counter() - start
+    notary.store.close()
+
+    notary = NotebookNotary(db_file=str(tmp_path / "new.db"), secret=b"secret")
+    start = time.perf_counter()
+    batched_notary = BatchedNotary(notary)
+    for nb in notebooks:
+        batched_notary.sign(ipynb_notebook_as_read(nb))
+    batched_notary.flush()
+    new_time = time.perf_counter() - start
+
+    for text in texts:
+        assert notary.check_signature(jupytext.reads(text, fmt="ipynb"))
+    notary.store.close()
+
+    print(f"Signing {n_notebooks} notebooks: {old_time:.3f}s with a re-read, {new_time:.3f}s from memory")
+    assert new_time < old_time / 2
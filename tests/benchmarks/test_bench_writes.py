@@ -0,0 +1,51 @@
+import tracemalloc
+
+import pytest
+from nbformat.v4.nbbase import new_code_cell, new_markdown_cell, new_notebook
+
+import jupytext
+
+
+def make_notebook(n_cells):
+    cells = []
+    for i in range(n_cells):
+        cells.append(new_markdown_cell(f"## Cell {i}\nSome text"))
+        cells.append(new_code_cell(f"def f{i}(x):\n    return x + {i}"))
+        cells.append(new_code_cell(f"x{i} = f{i}(1)"))
+    return new_notebook(cells=cells)
+
+
+@pytest.mark.parametrize("fmt", ["py:percent", "py:light", "md", "Rmd", "py:sphinx"])
+def test_writes_is_linear_in_the_number_of_cells(fmt, assert_linear_time):
+    def writes(notebook):
+        return jupytext.writes(notebook, fmt)
+
+    assert_linear_time(writes, make_notebook, size=1000, repeat=1)
+
+
+class DiscardingStream:
+    def write(self, text):
+        return len(text)
+
+
+def peak_memory(func, *args, **kwargs):
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("fmt", ["py:percent", "md"])
+def test_write_to_stream_uses_less_memory_than_writes(fmt):
+    # A notebook with large cells
+    cells = []
+    for i in range(10):
+        cells.extend([new_markdown_cell(f"Some text {i}\n" * 5_000), new_code_cell(f"x = {i}\n" * 5_000)])
+    nb = new_notebook(cells=cells)
+    size = len(jupytext.writes(nb, fmt))
+    writes_peak = peak_memory(jupytext.writes, nb, fmt)
+    write_peak = peak_memory(jupytext.write, nb, DiscardingStream(), fmt=fmt)
+    print(f"{fmt}: output={size / 1e6:.1f}MB writes={writes_peak / 1e6:.1f}MB write={write_peak / 1e6:.1f}MB")
+    assert write_peak < writes_peak - size / 2
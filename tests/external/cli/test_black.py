@@ -285,3 +285,28 @@ def test_pipe_black_preserve_outputs(notebook_with_outputs, tmpdir, cwd_tmpdir,
     assert not err
     assert "replaced" not in out
     assert "--update" not in out
+
+
+@pytest.mark.requires_black
+def test_pipe_black_on_many_notebooks_in_batch(tmpdir, cwd_tmpdir, capsys):
+    for i in range(3):
+        write(new_notebook(cells=[new_code_cell(f"x  =  {i}")]), f"nb{i}.ipynb")
+
+    jupytext(
+        [
+            "--pipe",
+            "black",
+            "--pipe-fmt",
+            "py:percent",
+            "--pipe-batch",
+            "--pipe-in-subprocess",
+            "nb0.ipynb",
+            "nb1.ipynb",
+            "nb2.ipynb",
+        ]
+    )
+    out, _ = capsys.readouterr()
+    assert out.count("[jupytext] Executing black") == 1
+
+    for i in range(3):
+        assert read(f"nb{i}.ipynb").cells[0].source == f"x = {i}"
@@ -0,0 +1,54 @@
+import pytest
+
+from jupytext import read, writes
+from jupytext.cli import pipe_notebook
+from jupytext.compare import compare_notebooks
+from jupytext.pipe_adapters import find_pipe_adapter
+
+
+def assert_in_process_and_subprocess_agree(ipynb_py_file, command):
+    nb = read(ipynb_py_file)
+    nb_in_process = pipe_notebook(nb, command, "py:percent", quiet=True)
+    nb_subprocess = pipe_notebook(nb, command, "py:percent", quiet=True, in_process=False)
+    compare_notebooks(nb_in_process, nb_subprocess, "py:percent")
+    assert writes(nb_in_process, "py:percent") == writes(nb_subprocess, "py:percent")
+
+
+@pytest.mark.requires_black
+def test_black_in_process_and_subprocess_agree(ipynb_py_file):
+    assert find_pipe_adapter(["black", "-"]) is not None
+    assert_in_process_and_subprocess_agree(ipynb_py_file, "black")
+
+
+@pytest.mark.requires_isort
+def test_isort_in_process_and_subprocess_agree(ipynb_py_file):
+    command = 'isort - --treat-comment-as-code "# %%" --float-to-top'
+    assert find_pipe_adapter(["isort", "-", "--treat-comment-as-code", "# %%", "--float-to-top"]) is not None
+    assert_in_process_and_subprocess_agree(ipynb_py_file, command)
+
+
+@pytest.mark.requires_autopep8
+def test_autopep8_in_process_and_subprocess_agree(ipynb_py_file):
+    assert find_pipe_adapter(["autopep8", "-"]) is not None
+    assert_in_process_and_subprocess_agree(ipynb_py_file, "autopep8")
+
+
+@pytest.mark.requires_black
+def test_black_adapter_uses_the_project_configuration(tmp_path, monkeypatch):
+    (tmp_path / "short_lines").mkdir()
+    (tmp_path / "short_lines" / "pyproject.toml").write_text("[tool.black]\nline-length = 20\n")
+    monkeypatch.chdir(tmp_path / "short_lines")
+    assert find_pipe_adapter(["black", "-"])("x = [1111, 2222, 3333]\n") == "x = [\n    1111,\n    2222,\n    3333,\n]\n"
+
+    # Less common options are left to the black command
+    (tmp_path / "required_version").mkdir()
+    (tmp_path / "required_version" / "pyproject.toml").write_text('[tool.black]\nrequired-version = "20"\n')
+    monkeypatch.chdir(tmp_path / "required_version")
+    assert find_pipe_adapter(["black", "-"]) is None
+
+
+@pytest.mark.requires_black
+def test_black_runs_in_process(ipynb_py_file, capsys):
+    pipe_notebook(read(ipynb_py_file), "black", "py:percent")
+    out, _ = capsys.readouterr()
+    assert "[jupytext] Executing black - in-process" in out
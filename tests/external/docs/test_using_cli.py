@@ -42,6 +42,10 @@ def test_jupytext_commands_in_the_documentation_work(tmpdir):
             if "pytest {}" in cmd:
                 continue
 
+            # The daemon runs until it is stopped
+            if "--daemon" in cmd:
+                continue
+
             # We need to remove the comments that may follow the jupytext command
             if "#" in cmd:
                 left, comment = cmd.rsplit("#", 1)
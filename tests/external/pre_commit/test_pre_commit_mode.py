@@ -1,11 +1,20 @@
 import os
 import time
+import unittest.mock as mock
 
 import pytest
 from nbformat.v4.nbbase import new_code_cell, new_markdown_cell, new_notebook
 
 from jupytext import read, write
-from jupytext.cli import get_timestamp, git_timestamp, is_untracked, jupytext
+from jupytext import cli
+from jupytext.cli import (
+    GitState,
+    file_in_git_index,
+    get_timestamp,
+    git_timestamp,
+    is_untracked,
+    jupytext,
+)
 
 
 def test_is_untracked(tmpdir, cwd_tmpdir, tmp_repo):
@@ -202,6 +211,76 @@ def test_git_timestamp(tmpdir, cwd_tmpdir, tmp_repo):
     assert git_timestamp("file_3") == get_timestamp("file_3")
 
 
+def test_git_state_matches_the_per_file_queries(tmpdir, cwd_tmpdir, tmp_repo):
+    tmpdir.mkdir("sub dir")
+    paths = ["committed", "sub dir/modified", "sub dir/staged é", "renamed", "untracked", "deleted", "missing"]
+
+    # No commit yet
+    tmpdir.join("committed").write("")
+    tmp_repo.git.add("committed")
+
+    def check_git_state():
+        git_state = GitState()
+        for path in paths:
+            assert git_state.file_in_git_index(path) == file_in_git_index(path), path
+            if os.path.exists(path):
+                # NB: 'git diff' fails on missing files
+                assert git_state.is_untracked(path) == is_untracked(path), path
+            assert git_state.git_timestamp(path) == git_timestamp(path), path
+
+    check_git_state()
+
+    for path in paths[1:-1]:
+        tmpdir.join(path).write("")
+    tmp_repo.git.add(".")
+    tmp_repo.index.commit("First commit")
+    check_git_state()
+
+    time.sleep(1.2)
+    tmpdir.join("sub dir/modified").write("modified")
+    tmpdir.join("sub dir/staged é").write("staged")
+    tmp_repo.git.add("sub dir/staged é")
+    tmp_repo.git.mv("renamed", "renamed_2")
+    paths.append("renamed_2")
+    tmpdir.join("untracked").remove()
+    tmp_repo.git.rm("untracked", "--cached")
+    tmpdir.join("untracked").write("")
+    tmpdir.join("deleted").remove()
+    check_git_state()
+
+    tmp_repo.index.commit("Second commit")
+    check_git_state()
+
+    # From a subdirectory
+    with tmpdir.join("sub dir").as_cwd():
+        paths = ["modified", "staged é", "../committed", "../untracked"]
+        check_git_state()
+
+
+def test_git_state_runs_a_few_git_commands(tmpdir, cwd_tmpdir, tmp_repo):
+    paths = [f"file_{i}" for i in range(20)]
+    for path in paths:
+        tmpdir.join(path).write("")
+    tmp_repo.git.add(".")
+    tmp_repo.index.commit("Add files")
+    tmpdir.join("file_0").write("modified")
+
+    git_state = GitState()
+    with mock.patch("jupytext.cli.system", wraps=cli.system) as system:
+        for path in paths:
+            git_state.file_in_git_index(path)
+            git_state.is_untracked(path)
+            git_state.git_timestamp(path)
+
+    assert system.call_count == 4
+
+    # A file that is forgotten is queried individually
+    git_state.forget("file_1")
+    tmpdir.join("file_1").write("modified")
+    assert git_state.is_untracked("file_1")
+    assert git_state.file_in_git_index("file_1")
+
+
 @pytest.mark.parametrize("commit_order", [["test.py", "test.ipynb"], ["test.ipynb", "test.py"]])
 @pytest.mark.parametrize("sync_file", ["test.py", "test.ipynb"])
 def test_sync_pre_commit_mode_respects_commit_order_780(
@@ -1535,3 +1535,122 @@ def test_sync_in_subfolders(tmp_path, python_notebook):
     jupytext([str(ipynb_notebook_path), "--sync"])
 
     assert (tmp_path / "scripts" / "subfolder" / "notebook.py").exists()
+
+
+def test_jobs_argument():
+    assert parse_jupytext_args(["notebook.ipynb", "--to", "py"]).jobs == 1
+    assert parse_jupytext_args(["notebook.ipynb", "--to", "py", "-j", "3"]).jobs == 3
+    assert parse_jupytext_args(["notebook.ipynb", "--to", "py", "--jobs", "auto"]).jobs >= 1
+    with pytest.raises(SystemExit):
+        parse_jupytext_args(["notebook.ipynb", "--to", "py", "--jobs", "0"])
+
+
+def test_group_notebooks_by_written_paths():
+    from jupytext.cli import group_notebooks_by_written_paths
+
+    notebooks = ["a.ipynb", "b.ipynb", "a.py", "c.ipynb", "b.md"]
+    written_paths = [{"a.ipynb", "a.py"}, {"b.ipynb", "b.md"}, {"a.py", "a.ipynb"}, {"c.ipynb"}, {"b.md"}]
+    assert group_notebooks_by_written_paths(notebooks, written_paths) == [
+        ["a.ipynb", "a.py"],
+        ["b.ipynb", "b.md"],
+        ["c.ipynb"],
+    ]
+
+
+def test_sync_in_parallel(tmpdir, cwd_tmpdir, python_notebook, capsys):
+    for i in range(4):
+        nb = new_notebook(
+            cells=[new_markdown_cell(f"Notebook {i}"), new_code_cell(f"{i} + 1")],
+            metadata={**python_notebook.metadata, "jupytext": {"formats": "ipynb,py:percent"}},
+        )
+        write(nb, f"nb{i}.ipynb")
+
+    notebooks = [f"nb{i}.ipynb" for i in range(4)]
+    assert jupytext(["--sync", "--jobs", "2"] + notebooks) == 0
+
+    out, _ = capsys.readouterr()
+    for i in range(4):
+        assert f"Notebook {i}" in tmpdir.join(f"nb{i}.py").read()
+        # The log for each notebook is printed in one block
+        assert (
+            f"[jupytext] Reading nb{i}.ipynb in format ipynb\n[jupytext] Unchanged nb{i}.ipynb\n[jupytext] Updating nb{i}.py\n"
+        ) in out
+
+    # Passing both files of a pair is safe as the pair is processed by a single worker
+    assert jupytext(["--sync", "--jobs", "2"] + notebooks + [f"nb{i}.py" for i in range(4)]) == 0
+
+
+def test_paths_written_by(tmpdir, cwd_tmpdir, python_notebook):
+    from jupytext.cli import _paths_written_by
+
+    nb = new_notebook(cells=[new_code_cell("1 + 1")], metadata=python_notebook.metadata)
+    nb.metadata["jupytext"] = {"formats": "ipynb,py:percent"}
+    write(nb, "nb.ipynb")
+    write(nb, "nb.py", fmt="py:percent")
+    expected = {str(tmpdir.join("nb.ipynb")), str(tmpdir.join("nb.py"))}
+
+    args = parse_jupytext_args(["--sync", "nb.ipynb"])
+    assert _paths_written_by("nb.ipynb", args) == expected
+    # Only the header of the text notebooks is read
+    assert _paths_written_by("nb.py", args) == expected
+
+    # The paired paths of an invalid notebook cannot be determined
+    tmpdir.join("invalid.ipynb").write("not a notebook")
+    assert _paths_written_by("invalid.ipynb", args) is None
+    assert _paths_written_by("missing.ipynb", args) is None
+
+
+def test_notebooks_with_unknown_paired_paths_are_processed_last(tmpdir, cwd_tmpdir, python_notebook, capfd):
+    for i in range(3):
+        nb = new_notebook(
+            cells=[new_code_cell(f"{i} + 1")],
+            metadata={**python_notebook.metadata, "jupytext": {"formats": "ipynb,py:percent"}},
+        )
+        write(nb, f"nb{i}.ipynb")
+    tmpdir.join("invalid.ipynb").write("not a notebook")
+
+    with pytest.raises(Exception):
+        jupytext(["--sync", "--jobs", "2", "invalid.ipynb", "nb0.ipynb", "nb1.ipynb", "nb2.ipynb"])
+    # The log of the worker that failed is written by that worker
+    out, _ = capfd.readouterr()
+    for i in range(3):
+        assert tmpdir.join(f"nb{i}.py").exists()
+        assert out.index(f"Reading nb{i}.ipynb") < out.index("Reading invalid.ipynb")
+
+
+def test_jobs_use_a_process_pool(tmpdir, cwd_tmpdir, python_notebook):
+    from concurrent.futures import ProcessPoolExecutor
+
+    for i in range(4):
+        write(new_notebook(cells=[new_code_cell(f"{i} + 1")], metadata=python_notebook.metadata), f"nb{i}.ipynb")
+
+    notebooks = [f"nb{i}.ipynb" for i in range(4)]
+    with mock.patch("concurrent.futures.ProcessPoolExecutor", wraps=ProcessPoolExecutor) as pool:
+        assert jupytext(["--to", "py:percent", "--jobs", "2"] + notebooks) == 0
+    pool.assert_called_once_with(max_workers=2)
+    for i in range(4):
+        assert tmpdir.join(f"nb{i}.py").exists()
+
+    # With a single job, or a notary passed by the caller, the notebooks are processed in this process
+    with mock.patch("jupytext.cli.jupytext_parallel") as jupytext_parallel:
+        jupytext(["--to", "py:percent", "--jobs", "1"] + notebooks)
+        jupytext(["--to", "py:percent", "--jobs", "2"] + notebooks, notary=mock.MagicMock())
+    jupytext_parallel.assert_not_called()
+
+
+def test_warn_only_in_parallel(tmpdir, cwd_tmpdir, capsys):
+    with open("incorrect.ipynb", "w") as fp:
+        fp.write('{"nbformat": 4, "nbformat_minor": 2, "metadata": {INCORRECT}, "cells": []}')
+
+    with open("correct.ipynb", "w") as fp:
+        fp.write('{"nbformat": 4, "nbformat_minor": 2, "metadata": {}, "cells": []}')
+
+    jupytext(["incorrect.ipynb", "correct.ipynb", "--to", "md", "--warn-only", "--jobs", "2"])
+
+    _, err = capsys.readouterr()
+    assert "Notebook does not appear to be JSON" in str(err)
+    assert not os.path.exists("incorrect.md")
+    assert os.path.exists("correct.md")
+
+    with pytest.raises(Exception, match="Notebook does not appear to be JSON"):
+        jupytext(["incorrect.ipynb", "correct.ipynb", "--to", "md", "--jobs", "2"])
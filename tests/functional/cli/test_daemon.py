@@ -0,0 +1,242 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+from io import StringIO
+from unittest import mock
+
+import pytest
+from nbformat.v4.nbbase import new_code_cell, new_markdown_cell, new_notebook
+
+import jupytext
+from jupytext.cli import can_forward_to_daemon, parse_jupytext_args
+from jupytext.cli import jupytext as jupytext_cli
+from jupytext.daemon import daemon_socket_path, forward_to_daemon, handle_request, send_request, serve_socket, serve_stdio
+from jupytext.parse_cache import get_parse_cache
+from jupytext.version import __version__
+
+
+@pytest.fixture
+def notebook_file(tmpdir, python_notebook):
+    nb = new_notebook(cells=[new_markdown_cell("A Markdown cell"), new_code_cell("1 + 1")], metadata=python_notebook.metadata)
+    nb_file = str(tmpdir.join("notebook.ipynb"))
+    jupytext.write(nb, nb_file)
+    return nb_file
+
+
+def request(method, params=None, request_id=1):
+    return json.dumps({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}) + "\n"
+
+
+def test_daemon_on_stdio(tmpdir, notebook_file):
+    stdin = StringIO(
+        request("jupytext", {"args": ["--to", "py:percent", "notebook.ipynb"], "cwd": str(tmpdir)})
+        + request("jupytext", {"args": ["--check", "false", "notebook.py"], "cwd": str(tmpdir)}, request_id=2)
+        + request("unknown", request_id=3)
+        + "not json\n"
+        + request("shutdown", request_id=4)
+        + request("jupytext", {"args": ["--version"]}, request_id=5)
+    )
+    stdout = StringIO()
+    assert serve_stdio(stdin, stdout) == 0
+
+    responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert [response["id"] for response in responses] == [1, 2, 3, None, 4]
+
+    assert responses[0]["result"]["exit_code"] == 0
+    assert "[jupytext] Writing notebook.py in format py:percent" in responses[0]["result"]["stdout"]
+    assert tmpdir.join("notebook.py").exists()
+
+    assert responses[1]["result"]["exit_code"] != 0
+    assert responses[2]["error"]["code"] == -32601
+    assert responses[3]["error"]["code"] == -32700
+    assert responses[4]["result"] is None
+
+
+def test_daemon_reports_errors(tmpdir):
+    stdin = StringIO(
+        request("jupytext", {"args": ["--to", "py", "missing.ipynb"], "cwd": str(tmpdir)})
+        + request("jupytext", {"args": ["--unknown-option"], "cwd": str(tmpdir)}, request_id=2)
+        + request("jupytext", {"args": ["--to", "py", "nb.ipynb"], "version": "0.0.0"}, request_id=3)
+    )
+    stdout = StringIO()
+    serve_stdio(stdin, stdout)
+
+    responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert responses[0]["result"]["exit_code"] == 1
+    assert "missing.ipynb" in responses[0]["result"]["stderr"]
+    assert responses[1]["result"]["exit_code"] == 2
+    assert "--unknown-option" in responses[1]["result"]["stderr"]
+    assert responses[2]["error"]["code"] == -32602
+
+
+@pytest.fixture
+def daemon_socket():
+    if sys.platform.startswith("win"):
+        pytest.skip("Unix sockets are not available on Windows")
+    # Unix socket paths are limited to about 100 characters
+    socket_dir = tempfile.mkdtemp()
+    path = os.path.join(socket_dir, "jupytext.sock")
+    daemon = threading.Thread(target=serve_socket, args=(path,))
+    daemon.start()
+    try:
+        for _ in range(500):
+            if os.path.exists(path):
+                break
+            threading.Event().wait(0.01)
+        yield path
+    finally:
+        send_request("shutdown", path=path)
+        daemon.join()
+        os.rmdir(socket_dir)
+
+
+def test_forward_to_daemon(tmpdir, cwd_tmpdir, notebook_file, daemon_socket, capsys):
+    assert send_request("version", path=daemon_socket)["result"] == __version__
+
+    assert forward_to_daemon(["--to", "md", "notebook.ipynb"], path=daemon_socket) == 0
+    assert tmpdir.join("notebook.md").exists()
+    out, _ = capsys.readouterr()
+    assert "[jupytext] Writing notebook.md" in out
+
+    # The notebook can be written to the standard output
+    assert forward_to_daemon(["--to", "py:percent", "notebook.ipynb", "-o", "-"], path=daemon_socket) == 0
+    out, _ = capsys.readouterr()
+    assert "# %%\n1 + 1" in out
+
+    assert forward_to_daemon(["--sync", "--set-formats", "ipynb,py:percent", "notebook.ipynb"], path=daemon_socket) == 0
+    assert tmpdir.join("notebook.py").exists()
+
+
+def test_daemon_refuses_to_start_twice(daemon_socket):
+    with pytest.raises(ValueError, match="already listening"):
+        serve_socket(daemon_socket)
+
+
+def test_no_daemon(tmpdir):
+    assert forward_to_daemon(["--version"], path=str(tmpdir.join("no_daemon.sock"))) is None
+
+
+def test_daemon_takes_no_notebook(notebook_file):
+    with pytest.raises(ValueError, match="does not take notebook arguments"):
+        jupytext_cli(["--daemon", "-", notebook_file])
+
+
+def test_jupytext_command_forwards_its_arguments_to_the_daemon(tmpdir, cwd_tmpdir, notebook_file, daemon_socket, monkeypatch):
+    monkeypatch.setenv("JUPYTEXT_DAEMON_SOCKET", daemon_socket)
+    monkeypatch.setattr(sys, "argv", ["jupytext", "--to", "md", "notebook.ipynb"])
+    with mock.patch("jupytext.daemon.forward_to_daemon", wraps=forward_to_daemon) as forward:
+        assert jupytext_cli() == 0
+    forward.assert_called_once_with(["--to", "md", "notebook.ipynb"])
+    assert tmpdir.join("notebook.md").exists()
+
+
+@pytest.mark.parametrize(
+    "args, forward",
+    [
+        (["--to", "md", "notebook.ipynb"], True),
+        (["--to", "md"], False),
+        (["--to", "md", "-"], False),
+        (["--pre-commit", "--to", "md"], True),
+    ],
+)
+def test_commands_that_read_stdin_are_not_forwarded(args, forward):
+    assert can_forward_to_daemon(parse_jupytext_args(args)) is forward
+
+
+def test_daemon_socket_path(tmpdir, monkeypatch):
+    monkeypatch.delenv("JUPYTEXT_DAEMON_SOCKET", raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmpdir))
+    assert daemon_socket_path() == str(tmpdir.join("jupytext-daemon.sock"))
+
+    monkeypatch.setenv("JUPYTEXT_DAEMON_SOCKET", str(tmpdir.join("other.sock")))
+    assert daemon_socket_path() == str(tmpdir.join("other.sock"))
+
+
+def test_daemon_socket_is_private(daemon_socket):
+    assert oct(os.stat(daemon_socket).st_mode & 0o777) == oct(0o600)
+
+
+def test_no_request_is_sent_to_a_socket_that_other_users_can_access(daemon_socket):
+    os.chmod(daemon_socket, 0o666)
+    try:
+        assert send_request("version", path=daemon_socket) is None
+    finally:
+        os.chmod(daemon_socket, 0o600)
+    assert send_request("version", path=daemon_socket)["result"] == __version__
+
+
+def test_commands_use_the_environment_of_the_client(tmpdir, notebook_file):
+    env = {"PATH": os.environ["PATH"], "JUPYTEXT_TEST_VARIABLE": "value"}
+    pipe = "sh -c 'sed s/1/$JUPYTEXT_TEST_VARIABLE/'"
+    stdin = StringIO(request("jupytext", {"args": ["--pipe", pipe, "notebook.ipynb"], "cwd": str(tmpdir), "env": env}))
+    stdout = StringIO()
+    serve_stdio(stdin, stdout)
+    assert json.loads(stdout.getvalue())["result"]["exit_code"] == 0
+    assert jupytext.read(notebook_file).cells[1].source == "value + 1"
+
+    # The environment of the daemon is restored
+    assert "JUPYTEXT_TEST_VARIABLE" not in os.environ
+
+
+def test_forward_to_daemon_sends_the_environment(tmpdir, cwd_tmpdir):
+    with mock.patch("jupytext.daemon.send_request", return_value=None) as send:
+        assert forward_to_daemon(["--to", "md", "notebook.ipynb"], path="daemon.sock") is None
+    params = send.call_args[0][1]
+    assert params["env"] == dict(os.environ)
+    assert params["executable"] == sys.executable
+
+
+def test_daemon_refuses_commands_from_another_python(tmpdir):
+    stdin = StringIO(request("jupytext", {"args": ["--version"], "executable": "/another/python"}))
+    stdout = StringIO()
+    serve_stdio(stdin, stdout)
+    assert json.loads(stdout.getvalue())["error"]["code"] == -32602
+
+
+def test_the_output_of_the_commands_is_returned_in_the_response(tmpdir, notebook_file, capfd):
+    # The daemon writes the responses to the standard output of this process
+    stdin = StringIO(request("jupytext", {"args": ["--check", "echo CHILD-OUTPUT {}", "notebook.ipynb"], "cwd": str(tmpdir)}))
+    serve_stdio(stdin, sys.stdout)
+    out, _ = capfd.readouterr()
+
+    responses = [json.loads(line) for line in out.splitlines()]
+    assert len(responses) == 1
+    assert responses[0]["result"]["exit_code"] == 0
+    assert "CHILD-OUTPUT" in responses[0]["result"]["stdout"]
+
+
+def test_the_parse_cache_is_enabled_while_the_daemon_runs(tmpdir, notebook_file):
+    cache_dir = str(tmpdir.join("cache"))
+    tmpdir.join("other.md").write("A Markdown cell\n")
+    stdin = StringIO(
+        request("jupytext", {"args": ["--to", "md", "notebook.ipynb"], "cwd": str(tmpdir)})
+        + request("jupytext", {"args": ["--to", "py", "notebook.md"], "cwd": str(tmpdir)}, request_id=2)
+        + request(
+            "jupytext",
+            {
+                "args": ["--to", "ipynb", "other.md"],
+                "cwd": str(tmpdir),
+                "env": {**os.environ, "JUPYTEXT_PARSE_CACHE_DIR": cache_dir},
+            },
+            request_id=3,
+        )
+    )
+    caches = []
+
+    def handle(line):
+        caches.append(get_parse_cache())
+        return handle_request(line)
+
+    stdout = StringIO()
+    with mock.patch("jupytext.daemon.handle_request", handle):
+        serve_stdio(stdin, stdout)
+    assert all(json.loads(line)["result"]["exit_code"] == 0 for line in stdout.getvalue().splitlines())
+    assert caches[0] is not None and all(cache is caches[0] for cache in caches)
+    # The notebooks are stored in the cache directory of the client
+    assert os.listdir(cache_dir)
+    assert caches[0].cache_dir is None
+
+    # The cache is disabled when the daemon stops
+    assert get_parse_cache() is None
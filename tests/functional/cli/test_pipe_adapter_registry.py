@@ -0,0 +1,122 @@
+import os
+import shlex
+import sys
+
+import pytest
+from nbformat.v4.nbbase import new_code_cell, new_notebook
+
+import jupytext.pipe_adapters
+from jupytext.cli import exec_adapter, pipe_notebook
+
+SCRIPT = "import sys; sys.stdout.write(sys.stdin.read().replace('x = 1', 'x = 2'))"
+COMMAND = f"{shlex.quote(sys.executable)} -c {shlex.quote(SCRIPT)}"
+
+
+class EntryPoint:
+    """A mock for importlib.metadata.EntryPoint"""
+
+    def __init__(self, name, adapter):
+        self.name = name
+        self.adapter = adapter
+
+    def load(self):
+        return self.adapter
+
+
+def replace_adapter(args):
+    if args != ["-c", SCRIPT]:
+        return None
+    return lambda text: text.replace("x = 1", "x = 2")
+
+
+@pytest.fixture(autouse=True)
+def clear_pipe_adapter_cache():
+    # The adapters are cached per command and working directory
+    jupytext.pipe_adapters.clear_pipe_adapter_cache()
+    yield
+    jupytext.pipe_adapters.clear_pipe_adapter_cache()
+
+
+@pytest.fixture
+def replace_entry_point(monkeypatch):
+    monkeypatch.setattr(
+        jupytext.pipe_adapters,
+        "entry_point_pipe_adapters",
+        lambda: {sys.executable: EntryPoint(sys.executable, replace_adapter)},
+    )
+
+
+def test_adapter_registered_with_an_entry_point(replace_entry_point, capsys):
+    nb = pipe_notebook(new_notebook(cells=[new_code_cell("x = 1")]), COMMAND, "py:percent")
+    out, _ = capsys.readouterr()
+    assert out.endswith("in-process\n")
+    assert nb.cells[0].source == "x = 2"
+
+
+def test_pipe_in_subprocess(replace_entry_point, capsys):
+    nb = pipe_notebook(new_notebook(cells=[new_code_cell("x = 1")]), COMMAND, "py:percent", in_process=False)
+    out, _ = capsys.readouterr()
+    assert "in-process" not in out
+    assert nb.cells[0].source == "x = 2"
+
+
+def test_the_command_is_used_when_the_adapter_fails(monkeypatch, capsys):
+    def failing_adapter(args):
+        def format_text(text):
+            raise ValueError("Not supported")
+
+        return format_text
+
+    monkeypatch.setattr(
+        jupytext.pipe_adapters,
+        "entry_point_pipe_adapters",
+        lambda: {sys.executable: EntryPoint(sys.executable, failing_adapter)},
+    )
+    with pytest.warns(UserWarning, match="raised ValueError: Not supported"):
+        nb = pipe_notebook(new_notebook(cells=[new_code_cell("x = 1")]), COMMAND, "py:percent")
+    out, _ = capsys.readouterr()
+    assert "in-process" in out
+    assert nb.cells[0].source == "x = 2"
+
+
+def test_no_adapter_for_unknown_commands():
+    assert jupytext.pipe_adapters.find_pipe_adapter(["cat"]) is None
+    assert jupytext.pipe_adapters.find_pipe_adapter(["black", "--check", "-"]) is None
+
+
+def test_exec_adapter_falls_back_to_the_command_when_the_adapter_cannot_be_loaded(monkeypatch, capsys):
+    class BrokenEntryPoint(EntryPoint):
+        def load(self):
+            raise ImportError("Broken adapter")
+
+    monkeypatch.setattr(
+        jupytext.pipe_adapters,
+        "entry_point_pipe_adapters",
+        lambda: {sys.executable: BrokenEntryPoint(sys.executable, None)},
+    )
+    with pytest.warns(UserWarning, match="adapter for .* raised ImportError: Broken adapter"):
+        assert exec_adapter(shlex.split(COMMAND), "x = 1\n") is None
+        nb = pipe_notebook(new_notebook(cells=[new_code_cell("x = 1")]), COMMAND, "py:percent")
+    assert nb.cells[0].source == "x = 2"
+
+
+def test_adapters_are_cached_per_command_and_directory(tmp_path, monkeypatch):
+    calls = []
+
+    def counting_adapter(args):
+        calls.append(os.getcwd())
+        return replace_adapter(args)
+
+    monkeypatch.setattr(
+        jupytext.pipe_adapters,
+        "entry_point_pipe_adapters",
+        lambda: {sys.executable: EntryPoint(sys.executable, counting_adapter)},
+    )
+    command = shlex.split(COMMAND)
+    adapter = jupytext.pipe_adapters.find_pipe_adapter(command)
+    assert jupytext.pipe_adapters.find_pipe_adapter(command) is adapter
+    assert len(calls) == 1
+
+    monkeypatch.chdir(tmp_path)
+    jupytext.pipe_adapters.find_pipe_adapter(command)
+    assert calls[1:] == [str(tmp_path)]
@@ -0,0 +1,102 @@
+import shlex
+import sys
+
+import pytest
+from nbformat.v4.nbbase import new_code_cell, new_notebook, new_output
+
+from jupytext import read, write
+from jupytext.cli import PipeRequest, jupytext, pipe_notebook, pipe_notebooks
+from jupytext.compare import compare
+
+# A formatter that acts on files, and fails on the files that contain 'error'
+FORMATTER = """import sys
+
+exit_code = 0
+for path in sys.argv[1:]:
+    with open(path) as fp:
+        text = fp.read()
+    if "error" in text:
+        print(f"{path}: cannot format this file")
+        exit_code = 1
+        continue
+    with open(path, "w") as fp:
+        fp.write(text.replace("x=", "x = "))
+sys.exit(exit_code)
+"""
+
+
+@pytest.fixture
+def formatter(tmp_path):
+    script = tmp_path / "formatter.py"
+    script.write_text(FORMATTER)
+    return f"{shlex.quote(sys.executable)} {shlex.quote(str(script))} {{}}"
+
+
+@pytest.fixture
+def notebooks(tmp_path, cwd_tmp_path, python_notebook):
+    nb_files = []
+    for i in range(3):
+        nb = new_notebook(
+            cells=[
+                new_code_cell(
+                    f"x={i}",
+                    outputs=[new_output("execute_result", data={"text/plain": str(i)}, execution_count=1)],
+                )
+            ],
+            metadata=python_notebook.metadata,
+        )
+        write(nb, f"nb{i}.ipynb")
+        nb_files.append(f"nb{i}.ipynb")
+    return nb_files
+
+
+def test_pipe_batch_runs_the_command_once(notebooks, formatter, capsys):
+    assert jupytext(["--pipe", formatter, "--pipe-batch"] + notebooks) == 0
+    out, _ = capsys.readouterr()
+    assert out.count("[jupytext] Executing") == 1
+
+    for i, nb_file in enumerate(notebooks):
+        nb = read(nb_file)
+        assert nb.cells[0].source == f"x = {i}"
+        # The outputs are preserved
+        assert nb.cells[0].outputs[0]["data"]["text/plain"] == str(i)
+
+
+def test_pipe_notebooks_gives_the_same_notebooks_as_pipe_notebook(notebooks, formatter):
+    nbs = [read(nb_file) for nb_file in notebooks]
+    expected = [pipe_notebook(nb, formatter, "py:percent", quiet=True) for nb in nbs]
+    actual = pipe_notebooks([PipeRequest(nb, formatter, "py:percent", quiet=True) for nb in nbs])
+    for nb_actual, nb_expected in zip(actual, expected):
+        compare(nb_actual, nb_expected)
+
+
+def test_pipe_batch_in_chunks(notebooks, formatter, capsys):
+    requests = [PipeRequest(read(nb_file), formatter, "py:percent", quiet=False) for nb_file in notebooks]
+    piped_notebooks = pipe_notebooks(requests, batch_size=2)
+    out, _ = capsys.readouterr()
+    assert out.count("[jupytext] Executing") == 2
+    assert [nb.cells[0].source for nb in piped_notebooks] == ["x = 0", "x = 1", "x = 2"]
+
+
+def test_check_batch_reports_the_errors_per_notebook(notebooks, formatter, capfd):
+    nb = read(notebooks[1])
+    nb.cells[0].source = "error"
+    write(nb, notebooks[1])
+
+    assert jupytext(["--check", formatter, "--pipe-batch", "--warn-only"] + notebooks) == 0
+    out, err = capfd.readouterr()
+    # The command is run on all the files, then on each file
+    assert out.count("[jupytext] Executing") == 4
+    assert out.count("cannot format this file") == 1
+    assert "nb1-" in out.split("cannot format this file")[0].splitlines()[-1]
+    assert err.count("[jupytext] Warning: The command") == 1
+
+    with pytest.raises(SystemExit):
+        jupytext(["--check", formatter, "--pipe-batch"] + notebooks)
+
+
+def test_pipe_batch_with_a_command_on_stdin(notebooks, capsys):
+    cat = f"{shlex.quote(sys.executable)} -c 'import sys; sys.stdout.write(sys.stdin.read())'"
+    assert jupytext(["--pipe", cat, "--pipe-batch"] + notebooks) == 0
+    out, _ = capsys.readouterr()
+    assert out.count("[jupytext] Executing") == len(notebooks)
@@ -0,0 +1,81 @@
+import pytest
+from nbformat.sign import NotebookNotary
+from nbformat.v4.nbbase import new_code_cell, new_markdown_cell, new_notebook, new_output
+
+import jupytext
+from jupytext.cli import jupytext as jupytext_cli
+from jupytext.signatures import BatchedNotary, ipynb_notebook_as_read
+
+
+@pytest.fixture
+def trusted_notebook(python_notebook):
+    nb = new_notebook(
+        cells=[
+            new_markdown_cell("A Markdown cell"),
+            new_code_cell(
+                "HTML('<b>hello</b>')",
+                outputs=[new_output("display_data", data={"text/html": "<b>hello</b>\n<i>world</i>\n"})],
+            ),
+        ],
+        metadata={**python_notebook.metadata, "orig_nbformat": 3, "jupytext": {"formats": "ipynb,py:percent"}},
+    )
+    nb.cells[1].metadata["trusted"] = True
+    return nb
+
+
+def test_ipynb_notebook_as_read_has_the_signature_of_the_notebook_read(trusted_notebook, fresh_notary):
+    text = jupytext.writes(trusted_notebook, "ipynb")
+    expected = fresh_notary.compute_signature(jupytext.reads(text, "ipynb"))
+    assert fresh_notary.compute_signature(ipynb_notebook_as_read(trusted_notebook)) == expected
+
+    # The original notebook is not modified
+    assert trusted_notebook.cells[1].metadata["trusted"] is True
+    assert trusted_notebook.metadata["orig_nbformat"] == 3
+
+
+def test_batched_notary_stores_the_signatures_on_flush(trusted_notebook, fresh_notary):
+    notary = BatchedNotary(fresh_notary)
+    notary.sign(trusted_notebook)
+    assert notary.check_signature(trusted_notebook)
+    assert not fresh_notary.check_signature(trusted_notebook)
+
+    notary.flush()
+    assert fresh_notary.check_signature(trusted_notebook)
+
+
+def test_the_signatures_written_on_flush_are_accepted_by_nbformat(tmp_path, trusted_notebook):
+    db_file = str(tmp_path / "nbsignatures.db")
+    notary = NotebookNotary(db_file=db_file, secret=b"test-secret")
+    notebook_signed_before = jupytext.reads(jupytext.writes(trusted_notebook, "ipynb"), "ipynb")
+    notebook_signed_before.cells[0].source = "Another Markdown cell"
+    notary.sign(notebook_signed_before)
+
+    batched_notary = BatchedNotary(notary)
+    batched_notary.sign(trusted_notebook)
+    assert batched_notary.check_signature(notebook_signed_before)
+    batched_notary.flush()
+    notary.store.close()
+
+    # A new notary, with its own connection to the database, finds both signatures
+    notary = NotebookNotary(db_file=db_file, secret=b"test-secret")
+    try:
+        assert notary.check_signature(trusted_notebook)
+        assert notary.check_signature(notebook_signed_before)
+        assert not notary.check_signature(jupytext.reads("1 + 1", "py:percent"))
+    finally:
+        notary.store.close()
+
+
+def test_signatures_are_committed_once(tmpdir, cwd_tmpdir, trusted_notebook, fresh_notary):
+    for i in range(3):
+        jupytext.write(trusted_notebook, f"nb{i}.ipynb")
+        fresh_notary.sign(jupytext.read(f"nb{i}.ipynb"))
+
+    statements = []
+    fresh_notary.store.db.set_trace_callback(statements.append)
+    jupytext_cli(["--sync"] + [f"nb{i}.ipynb" for i in range(3)], notary=fresh_notary)
+    fresh_notary.store.db.set_trace_callback(None)
+
+    assert sum(statement.strip().upper() == "COMMIT" for statement in statements) == 1
+    for i in range(3):
+        assert fresh_notary.check_signature(jupytext.read(f"nb{i}.ipynb"))
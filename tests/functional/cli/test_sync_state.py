@@ -0,0 +1,130 @@
+import json
+import os
+
+import pytest
+from nbformat.v4.nbbase import new_code_cell, new_markdown_cell, new_notebook
+
+from jupytext import write
+from jupytext.cli import jupytext
+from jupytext.sync_state import SyncState, config_signature
+
+
+@pytest.fixture
+def paired_notebooks(tmpdir, cwd_tmpdir, python_notebook):
+    notebooks = []
+    for i in range(3):
+        nb = new_notebook(
+            cells=[new_markdown_cell(f"Notebook {i}"), new_code_cell(f"{i} + 1")],
+            metadata={**python_notebook.metadata, "jupytext": {"formats": "ipynb,py:percent"}},
+        )
+        write(nb, f"nb{i}.ipynb")
+        notebooks.append(f"nb{i}.ipynb")
+    return notebooks
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_sync_state_skips_unchanged_pairs(tmpdir, paired_notebooks, capsys, jobs):
+    assert jupytext(["--sync", "--sync-state", "--jobs", jobs] + paired_notebooks) == 0
+    out, _ = capsys.readouterr()
+    assert "Unchanged nb0.ipynb and paired files" not in out
+    assert tmpdir.join(".jupytext-sync-state").exists()
+
+    # Nothing changed, so no notebook is read
+    assert jupytext(["--sync", "--sync-state", "--jobs", jobs] + paired_notebooks) == 0
+    out, _ = capsys.readouterr()
+    assert "Reading" not in out
+    for nb_file in paired_notebooks:
+        assert f"[jupytext] Unchanged {nb_file} and paired files since the last sync" in out
+
+    # Modifying one of the paired files triggers the sync of that pair only
+    tmpdir.join("nb1.py").write(tmpdir.join("nb1.py").read().replace("1 + 1", "1 + 2"))
+    assert jupytext(["--sync", "--sync-state", "--jobs", jobs] + paired_notebooks) == 0
+    out, _ = capsys.readouterr()
+    assert "Unchanged nb0.ipynb and paired files" in out
+    assert "Unchanged nb1.ipynb and paired files" not in out
+    assert "1 + 2" in tmpdir.join("nb1.ipynb").read()
+
+    # And the new state is recorded
+    assert jupytext(["--sync", "--sync-state", "--jobs", jobs] + paired_notebooks) == 0
+    out, _ = capsys.readouterr()
+    assert "Reading" not in out
+
+
+def test_sync_state_is_not_used_without_the_option(tmpdir, paired_notebooks, capsys):
+    assert jupytext(["--sync", "--sync-state"] + paired_notebooks) == 0
+    assert jupytext(["--sync"] + paired_notebooks) == 0
+    out, _ = capsys.readouterr()
+    assert "Unchanged nb0.ipynb and paired files" not in out
+
+
+def test_sync_state_is_not_used_when_other_options_modify_the_notebook(tmpdir, paired_notebooks, capsys):
+    assert jupytext(["--sync", "--sync-state"] + paired_notebooks) == 0
+    assert jupytext(["--sync", "--sync-state", "--opt", "comment_magics=false"] + paired_notebooks) == 0
+    out, _ = capsys.readouterr()
+    assert "Unchanged nb0.ipynb and paired files" not in out
+
+
+def test_touched_file_with_same_content_is_unchanged(tmpdir, paired_notebooks, capsys):
+    assert jupytext(["--sync", "--sync-state"] + paired_notebooks) == 0
+    capsys.readouterr()
+    py_file = tmpdir.join("nb0.py")
+    stat = os.stat(py_file)
+    os.utime(py_file, (stat.st_atime + 10, stat.st_mtime + 10))
+
+    assert jupytext(["--sync", "--sync-state", "nb0.ipynb"]) == 0
+    out, _ = capsys.readouterr()
+    assert "Reading" not in out
+
+    # The new timestamp is recorded
+    state = json.loads(tmpdir.join(".jupytext-sync-state").read())
+    assert state["notebooks"][str(tmpdir.join("nb0.ipynb"))]["files"][str(py_file)][0] == stat.st_mtime + 10
+
+
+def test_sync_state_depends_on_config_file(tmpdir, paired_notebooks, capsys):
+    assert jupytext(["--sync", "--sync-state"] + paired_notebooks) == 0
+    tmpdir.join("jupytext.toml").write('notebook_metadata_filter = "-all"\n')
+
+    assert jupytext(["--sync", "--sync-state"] + paired_notebooks) == 0
+    out, _ = capsys.readouterr()
+    assert "Unchanged nb0.ipynb and paired files" not in out
+
+
+def test_unreadable_config_file_is_a_change(tmpdir, paired_notebooks, monkeypatch):
+    jupytext(["--sync", "--sync-state"] + paired_notebooks)
+    assert SyncState().pair_is_unchanged("nb0.ipynb")
+
+    # The configuration file is found, but removed before its signature is computed
+    monkeypatch.setattr(
+        "jupytext.config.find_jupytext_configuration_file",
+        lambda path: str(tmpdir.join("jupytext.toml")),
+    )
+    assert config_signature("nb0.ipynb") == [str(tmpdir.join("jupytext.toml")), None]
+    assert not SyncState().pair_is_unchanged("nb0.ipynb")
+
+    state = SyncState()
+    state.record("nb0.ipynb", ["nb0.ipynb", "nb0.py"])
+    assert not state.pair_is_unchanged("nb0.ipynb")
+
+
+def test_sync_state_depends_on_jupytext_version(tmpdir, paired_notebooks):
+    jupytext(["--sync", "--sync-state"] + paired_notebooks)
+    state = SyncState()
+    assert state.pair_is_unchanged("nb0.ipynb")
+
+    state.notebooks[str(tmpdir.join("nb0.ipynb"))]["jupytext_version"] = "0.0.0"
+    assert not state.pair_is_unchanged("nb0.ipynb")
+
+
+def test_deleted_paired_file_is_a_change(tmpdir, paired_notebooks):
+    jupytext(["--sync", "--sync-state"] + paired_notebooks)
+    tmpdir.join("nb0.py").remove()
+
+    assert not SyncState().pair_is_unchanged("nb0.ipynb")
+    jupytext(["--sync", "--sync-state"] + paired_notebooks)
+    assert tmpdir.join("nb0.py").exists()
+
+
+def test_corrupted_state_file_is_ignored(tmpdir, paired_notebooks):
+    tmpdir.join(".jupytext-sync-state").write("not json")
+    assert jupytext(["--sync", "--sync-state"] + paired_notebooks) == 0
+    assert SyncState().pair_is_unchanged("nb0.ipynb")
@@ -1,4 +1,6 @@
 import os
+import unittest.mock as mock
+from collections import OrderedDict
 from pathlib import Path
 from contextlib import contextmanager
 
@@ -6,6 +8,7 @@ import pytest
 
 from jupytext.config import (
     find_jupytext_configuration_file,
+    find_jupytext_configuration_file_in_directory,
     load_jupytext_configuration_file,
     notebook_formats,
 )
@@ -416,3 +419,76 @@ formats = [
 
     notebook_elsewhere = str(tmp_path / "test.ipynb")
     assert config.default_formats(notebook_elsewhere) == "ipynb,py:percent"
+
+
+def set_old_timestamp(*paths, age=10):
+    """Make the files look older, so that the configuration cache trusts their timestamp"""
+    for path in paths:
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime - age, stat.st_mtime - age))
+
+
+def test_configuration_file_search_is_cached(tmp_path):
+    nested = tmp_path / "a" / "b" / "c"
+    nested.mkdir(parents=True)
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text('[tool.jupytext]\nformats = "ipynb,py:percent"\n')
+    set_old_timestamp(pyproject, nested, nested.parent, nested.parent.parent, tmp_path)
+
+    assert find_jupytext_configuration_file(nested) == str(pyproject)
+    config = load_jupytext_config(str(nested / "notebook.ipynb"))
+    assert config.formats == ["ipynb,py:percent"]
+
+    with mock.patch("jupytext.config.tomllib.loads") as loads, mock.patch("pathlib.Path.is_file") as is_file:
+        assert find_jupytext_configuration_file(nested) == str(pyproject)
+        assert load_jupytext_config(str(nested / "notebook.ipynb")) is config
+        loads.assert_not_called()
+        is_file.assert_not_called()
+
+
+def test_configuration_cache_is_updated_when_files_change(tmp_path):
+    nested = tmp_path / "nested"
+    nested.mkdir()
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text("[tool.other]\n")
+    set_old_timestamp(pyproject, nested, tmp_path, age=20)
+    assert find_jupytext_configuration_file(nested) is None
+
+    # A [tool.jupytext] section is added to pyproject.toml
+    pyproject.write_text('[tool.jupytext]\nformats = "ipynb,py:percent"\n')
+    set_old_timestamp(pyproject)
+    assert find_jupytext_configuration_file(nested) == str(pyproject)
+    assert load_jupytext_config(str(nested / "notebook.ipynb")).formats == ["ipynb,py:percent"]
+
+    # The configuration file is modified
+    pyproject.write_text('[tool.jupytext]\nformats = "ipynb,md"\n')
+    assert load_jupytext_config(str(nested / "notebook.ipynb")).formats == ["ipynb,md"]
+
+    # A configuration file is created in the nested directory
+    (nested / "jupytext.toml").write_text('formats = "ipynb,py:light"\n')
+    assert find_jupytext_configuration_file(nested) == str(nested / "jupytext.toml")
+    assert load_jupytext_config(str(nested / "notebook.ipynb")).formats == ["ipynb,py:light"]
+
+    # And removed
+    (nested / "jupytext.toml").unlink()
+    assert find_jupytext_configuration_file(nested) == str(pyproject)
+
+
+def test_configuration_cache_is_bounded(tmp_path):
+    directories = [tmp_path / f"dir{i}" for i in range(6)]
+    for directory in directories:
+        directory.mkdir()
+    set_old_timestamp(*directories)
+
+    with (
+        mock.patch("jupytext.config._CONFIG_CACHE_SIZE", 4),
+        mock.patch("jupytext.config._CONFIG_FILE_IN_DIRECTORY", OrderedDict()) as cache,
+    ):
+        for directory in directories:
+            assert find_jupytext_configuration_file_in_directory(directory) is None
+        assert list(cache) == [str(directory) for directory in directories[2:]]
+
+        # The least recently used entry is dropped
+        find_jupytext_configuration_file_in_directory(directories[2])
+        find_jupytext_configuration_file_in_directory(directories[0])
+        assert list(cache) == [str(directories[i]) for i in [4, 5, 2, 0]]
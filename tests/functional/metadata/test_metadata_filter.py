@@ -6,7 +6,12 @@ from nbformat.v4.nbbase import new_code_cell, new_notebook
 from jupytext import reads, writes
 from jupytext.cli import jupytext as jupytext_cli
 from jupytext.compare import compare, compare_notebooks
-from jupytext.metadata_filter import filter_metadata, metadata_filter_as_dict
+from jupytext.metadata_filter import (
+    CompiledMetadataFilter,
+    compile_metadata_filter,
+    filter_metadata,
+    metadata_filter_as_dict,
+)
 
 
 def to_dict(keys):
@@ -115,6 +120,34 @@ def test_filter_nested_metadata():
     # assert filter_metadata(metadata, 'I.1.a', '-I') == {'I': {'1': {'a': 1}}}
 
 
+def test_compiled_metadata_filter_is_reused():
+    assert compile_metadata_filter("all,-widgets", "-all") is compile_metadata_filter("all,-widgets", "-all")
+    assert compile_metadata_filter("all,-widgets", "-all") is not compile_metadata_filter("all,-toc", "-all")
+
+    # Filters given as dictionaries are compiled each time
+    compiled_filter = compile_metadata_filter({"additional": "all"}, "-all")
+    assert isinstance(compiled_filter, CompiledMetadataFilter)
+    assert compiled_filter.apply({"a": 1, "b": {"c": 2}}) == {"a": 1, "b": {"c": 2}}
+
+
+def test_compiled_metadata_filter_apply_and_restore():
+    compiled_filter = CompiledMetadataFilter("I.1.a,-I.1.b,-tags", "-all")
+    metadata = {"I": {"1": {"a": 1, "b": 2}}, "tags": [], "other": 3}
+    assert compiled_filter.apply(metadata) == {"I": {"1": {"a": 1}}}
+    assert compiled_filter.restore({"I": {"1": {"a": 0}}}, metadata) == {"I": {"1": {"a": 0}}, "tags": [], "other": 3}
+
+    # The empty tags are not kept by the cell default filter
+    compiled_filter = CompiledMetadataFilter(None, "-scrolled")
+    assert compiled_filter.apply({"tags": [], "scrolled": True, "a": 1}) == {"a": 1}
+    assert compiled_filter.apply({"tags": ["x"], "a": 1}) == {"tags": ["x"], "a": 1}
+
+    # remove=True removes the metadata that are kept from the original metadata
+    compiled_filter = CompiledMetadataFilter("a", "-all")
+    metadata = {"a": 1, "b": 2}
+    assert compiled_filter.apply(metadata, remove=True) == {"a": 1}
+    assert metadata == {"b": 2}
+
+
 def test_filter_out_execution_metadata():
     nb = new_notebook(
         cells=[
@@ -1,3 +1,4 @@
+import random
 from copy import deepcopy
 
 import pytest
@@ -5,7 +6,7 @@ from jupyter_server.utils import ensure_async
 from nbformat.v4.nbbase import new_code_cell, new_markdown_cell, new_notebook
 
 import jupytext
-from jupytext.combine import combine_inputs_with_outputs
+from jupytext.combine import combine_inputs_with_outputs, map_outputs_to_inputs, same_content
 from jupytext.compare import compare, compare_notebooks
 
 
@@ -222,3 +223,80 @@ def test_combine_attachments():
 
     nb_source = combine_inputs_with_outputs(nb_source, nb_outputs)
     compare(nb_source, nb_outputs)
+
+
+def map_outputs_to_inputs_reference(cells_inputs, cells_outputs):
+    """The original (quadratic) implementation of map_outputs_to_inputs"""
+    n_in = len(cells_inputs)
+    n_out = len(cells_outputs)
+    outputs_map = [None] * n_in
+
+    first_unmatched_output_per_cell_type = {}
+    for i in range(n_in):
+        cell_input = cells_inputs[i]
+        for j in range(first_unmatched_output_per_cell_type.get(cell_input.cell_type, 0), n_out):
+            cell_output = cells_outputs[j]
+            if cell_input.cell_type == cell_output.cell_type and same_content(cell_input.source, cell_output.source):
+                outputs_map[i] = j
+                first_unmatched_output_per_cell_type[cell_input.cell_type] = j + 1
+                break
+
+    unused_ouputs = set(range(n_out)).difference(outputs_map)
+    for endswith in [False, True]:
+        if not unused_ouputs:
+            return outputs_map
+
+        for i in range(n_in):
+            if outputs_map[i] is not None:
+                continue
+            cell_input = cells_inputs[i]
+            for j in unused_ouputs:
+                cell_output = cells_outputs[j]
+                if cell_input.cell_type == cell_output.cell_type and same_content(
+                    cell_output.source, cell_input.source, endswith
+                ):
+                    outputs_map[i] = j
+                    unused_ouputs.remove(j)
+                    break
+
+    if not unused_ouputs:
+        return outputs_map
+
+    prev_j = -1
+    for i in range(n_in):
+        if outputs_map[i] is not None:
+            prev_j = outputs_map[i]
+            continue
+
+        j = prev_j + 1
+        if j not in unused_ouputs:
+            continue
+
+        cell_input = cells_inputs[i]
+        cell_output = cells_outputs[j]
+        if cell_input.cell_type == cell_output.cell_type and cell_input.source.strip() != "":
+            outputs_map[i] = j
+            unused_ouputs.remove(j)
+            prev_j = j
+
+    return outputs_map
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_map_outputs_to_inputs_matches_reference(seed):
+    rng = random.Random(seed)
+    sources = ["", " ", "a", "b", "a + b", "x = 1\nb", "print(a)", "f(a, b)", "f(a,b)", "ab", "x = 1", "# Title"]
+
+    def random_cell():
+        source = rng.choice(sources)
+        if rng.random() < 0.3:
+            source = rng.choice(sources) + "\n" + source
+        return rng.choice([new_code_cell, new_markdown_cell])(source)
+
+    cells_outputs = [random_cell() for _ in range(rng.randint(0, 30))]
+    cells_inputs = [deepcopy(cell) for cell in cells_outputs if rng.random() < 0.8]
+    rng.shuffle(cells_inputs)
+    cells_inputs.extend(random_cell() for _ in range(rng.randint(0, 10)))
+    rng.shuffle(cells_inputs)
+
+    assert map_outputs_to_inputs(cells_inputs, cells_outputs) == map_outputs_to_inputs_reference(cells_inputs, cells_outputs)
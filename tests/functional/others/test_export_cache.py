@@ -0,0 +1,64 @@
+import pytest
+from nbformat.v4.nbbase import new_code_cell, new_markdown_cell, new_notebook, new_raw_cell
+
+import jupytext
+from jupytext.export_cache import CellExportCache
+
+
+@pytest.fixture
+def notebook(python_notebook):
+    return new_notebook(
+        cells=[
+            new_markdown_cell("# A title"),
+            new_code_cell("import os\n%matplotlib inline", metadata={"tags": ["parameters"]}),
+            new_code_cell("def f(x):\n    return x + 1"),
+            new_raw_cell("a raw cell"),
+            new_code_cell("f(1)"),
+        ],
+        metadata=python_notebook.metadata,
+    )
+
+
+@pytest.mark.parametrize("fmt", ["py:percent", "py:light", "md", "Rmd", "py:sphinx", "py:hydrogen"])
+def test_writes_with_cell_export_cache_is_identical(notebook, fmt):
+    cache = CellExportCache()
+    expected = jupytext.writes(notebook, fmt)
+    assert jupytext.writes(notebook, fmt, cell_export_cache=cache) == expected
+    assert (cache.last_hits, cache.last_misses) == (0, 5)
+
+    assert jupytext.writes(notebook, fmt, cell_export_cache=cache) == expected
+    assert (cache.last_hits, cache.last_misses) == (5, 0)
+
+    # Modify one cell, and remove the cell after the function definition
+    notebook.cells[2].source = "def f(x):\n    return x + 2"
+    del notebook.cells[3]
+    expected = jupytext.writes(notebook, fmt)
+    assert jupytext.writes(notebook, fmt, cell_export_cache=cache) == expected
+    assert (cache.last_hits, cache.last_misses) == (3, 1)
+
+
+def test_cell_export_cache_depends_on_the_format(notebook):
+    cache = CellExportCache()
+    jupytext.writes(notebook, "py:percent", cell_export_cache=cache)
+    assert jupytext.writes(notebook, "py:light", cell_export_cache=cache) == jupytext.writes(notebook, "py:light")
+    assert (cache.last_hits, cache.last_misses) == (0, 5)
+
+
+def test_cell_export_cache_depends_on_the_metadata(notebook):
+    cache = CellExportCache()
+    jupytext.writes(notebook, "py:percent", cell_export_cache=cache)
+    notebook.cells[1].metadata["tags"] = ["remove_input"]
+    text = jupytext.writes(notebook, "py:percent", cell_export_cache=cache)
+    assert text == jupytext.writes(notebook, "py:percent")
+    assert "remove_input" in text
+    assert (cache.last_hits, cache.last_misses) == (4, 1)
+
+
+def test_cell_export_cache_keeps_only_the_cells_of_the_last_export(notebook):
+    cache = CellExportCache()
+    jupytext.writes(notebook, "py:percent", cell_export_cache=cache)
+    assert cache.stats() == {"hits": 0, "misses": 5, "entries": 5}
+
+    notebook.cells = notebook.cells[:2]
+    jupytext.writes(notebook, "py:percent", cell_export_cache=cache)
+    assert cache.stats() == {"hits": 2, "misses": 5, "entries": 2}
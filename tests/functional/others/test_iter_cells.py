@@ -0,0 +1,57 @@
+from io import StringIO
+
+import pytest
+from nbformat.v4.nbbase import new_code_cell, new_markdown_cell
+
+import jupytext
+from jupytext.compare import compare
+
+
+def test_iter_cells_yields_metadata_then_cells(python_notebook):
+    nb = python_notebook
+    nb.cells = [new_markdown_cell("A markdown cell"), new_code_cell("1 + 1"), new_code_cell("%%html\n<p>Hello</p>")]
+    text = jupytext.writes(nb, "py:percent")
+
+    items = iter(jupytext.iter_cells(StringIO(text), fmt="py"))
+    metadata = next(items)
+    assert metadata["kernelspec"] == nb.metadata["kernelspec"]
+    assert metadata["jupytext"]["text_representation"]["format_name"] == "percent"
+
+    cells = list(items)
+    compare([cell.source for cell in cells], [cell.source for cell in nb.cells])
+    compare([cell.cell_type for cell in cells], [cell.cell_type for cell in nb.cells])
+
+
+def test_iter_cells_is_lazy():
+    text = "# %%\n1 + 1\n\n# %%\n2 + 2\n"
+    items = jupytext.iter_cells(StringIO(text), fmt="py:percent")
+    next(items)
+    assert next(items).source == "1 + 1"
+
+
+@pytest.mark.parametrize("fmt", ["py:percent", "py:light", "md", "Rmd", "R:spin"])
+def test_iter_cells_matches_read(ipynb_py_R_file, fmt, tmp_path):
+    nb = jupytext.read(ipynb_py_R_file)
+    if fmt == "R:spin" and nb.metadata.get("kernelspec", {}).get("language") != "R":
+        pytest.skip("R:spin is only for R notebooks")
+    ext = "." + fmt.split(":")[0]
+    text_file = tmp_path / ("notebook" + ext)
+    jupytext.write(nb, text_file, fmt=fmt)
+
+    expected = jupytext.read(text_file)
+    items = list(jupytext.iter_cells(text_file))
+    compare(
+        [(cell.cell_type, cell.source, cell.metadata) for cell in items[1:]],
+        [(cell.cell_type, cell.source, cell.metadata) for cell in expected.cells],
+    )
+    for key in ["kernelspec", "language_info"]:
+        assert items[0].get(key) == expected.metadata.get(key)
+
+
+def test_iter_cells_on_ipynb(tmp_path, python_notebook):
+    nb_file = tmp_path / "notebook.ipynb"
+    jupytext.write(python_notebook, nb_file)
+
+    metadata, *cells = jupytext.iter_cells(nb_file)
+    assert metadata["kernelspec"] == python_notebook.metadata["kernelspec"]
+    compare(cells, python_notebook.cells)
@@ -0,0 +1,122 @@
+import os
+
+import pytest
+from nbformat.v4.nbbase import new_code_cell, new_markdown_cell, new_notebook
+
+import jupytext
+from jupytext.compare import compare_notebooks
+from jupytext.config import JupytextConfiguration
+from jupytext.parse_cache import ParseCache, disable_parse_cache, enable_parse_cache, get_parse_cache
+
+
+@pytest.fixture
+def parse_cache():
+    with enable_parse_cache(max_entries=2) as cache:
+        yield cache
+
+
+TEXT = """# %% [markdown]
+# A markdown cell
+
+# %%
+1 + 1
+"""
+
+
+def test_parse_cache_is_disabled_by_default():
+    assert get_parse_cache() is None
+
+
+def test_parse_cache_hit_and_miss(parse_cache):
+    nb1 = jupytext.reads(TEXT, "py:percent")
+    assert parse_cache.stats() == {"hits": 0, "misses": 1, "entries": 1}
+
+    nb2 = jupytext.reads(TEXT, "py:percent")
+    assert parse_cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+    compare_notebooks(nb2, nb1)
+
+    # A different format is a different entry
+    jupytext.reads(TEXT, "py:light")
+    assert parse_cache.stats() == {"hits": 1, "misses": 2, "entries": 2}
+
+
+def test_parse_cache_returns_copies(parse_cache):
+    nb1 = jupytext.reads(TEXT, "py:percent")
+    nb1.cells[1].source = "2 + 2"
+    nb1.metadata["modified"] = True
+
+    nb2 = jupytext.reads(TEXT, "py:percent")
+    assert nb2.cells[1].source == "1 + 1"
+    assert "modified" not in nb2.metadata
+
+
+def test_parse_cache_depends_on_config(parse_cache):
+    text = "---\ntitle: A title\n---\n\nSome text\n"
+    nb1 = jupytext.reads(text, "md")
+    config = JupytextConfiguration(root_level_metadata_as_raw_cell=False)
+    nb2 = jupytext.reads(text, "md", config=config)
+    assert parse_cache.misses == 2
+    assert nb1.cells[0].cell_type == "raw"
+    assert nb2.cells[0].cell_type == "markdown"
+
+
+def test_parse_cache_lru(parse_cache):
+    for i in range(3):
+        jupytext.reads(f"# %%\n{i} + 1\n", "py:percent")
+    assert parse_cache.stats() == {"hits": 0, "misses": 3, "entries": 2}
+
+    # The first notebook was evicted
+    jupytext.reads("# %%\n0 + 1\n", "py:percent")
+    assert parse_cache.misses == 4
+
+
+def test_parse_cache_does_not_store_ipynb(parse_cache):
+    text = jupytext.writes(new_notebook(cells=[new_markdown_cell("text")]), "ipynb")
+    jupytext.reads(text, "ipynb")
+    jupytext.reads(text)
+    assert parse_cache.stats() == {"hits": 0, "misses": 0, "entries": 0}
+
+
+def test_parse_cache_on_disk(tmp_path):
+    cache_dir = str(tmp_path / ".jupytext_cache")
+    nb_file = tmp_path / "notebook.md"
+    jupytext.write(new_notebook(cells=[new_markdown_cell("text"), new_code_cell("1 + 1")]), nb_file)
+
+    with enable_parse_cache(cache_dir=cache_dir):
+        nb1 = jupytext.read(nb_file)
+        assert os.listdir(cache_dir)
+
+    # A new cache with the same directory finds the notebook on disk
+    with enable_parse_cache(cache_dir=cache_dir) as parse_cache:
+        nb2 = jupytext.read(nb_file)
+        assert parse_cache.stats() == {"hits": 1, "misses": 0, "entries": 1}
+        compare_notebooks(nb2, nb1)
+
+
+def test_parse_cache_key_changes_with_text():
+    cache = ParseCache()
+    assert cache.key("# %%\n1 + 1\n", "py:percent") != cache.key("# %%\n1 + 2\n", "py:percent")
+    assert cache.key("# %%\n1 + 1\n", "py:percent") == cache.key(
+        "# %%\n1 + 1\n", {"extension": ".py", "format_name": "percent"}
+    )
+
+
+def test_enable_parse_cache_restores_the_previous_cache(tmp_path):
+    with enable_parse_cache() as outer:
+        assert get_parse_cache() is outer
+        with enable_parse_cache() as inner:
+            assert get_parse_cache() is inner
+        assert get_parse_cache() is outer
+    assert get_parse_cache() is None
+
+
+def test_parse_cache_dir_is_read_from_the_environment(tmp_path, monkeypatch):
+    # No cache was enabled or disabled in this process
+    monkeypatch.setattr(jupytext.parse_cache, "_PARSE_CACHE", jupytext.parse_cache._FROM_ENVIRONMENT)
+    monkeypatch.setenv("JUPYTEXT_PARSE_CACHE_DIR", str(tmp_path / "env_cache"))
+    assert get_parse_cache().cache_dir == str(tmp_path / "env_cache")
+    with enable_parse_cache() as cache:
+        assert cache.cache_dir == str(tmp_path / "env_cache")
+
+    monkeypatch.delenv("JUPYTEXT_PARSE_CACHE_DIR")
+    assert get_parse_cache() is None
@@ -2,7 +2,8 @@ from io import StringIO
 from pathlib import Path
 
 import nbformat
-from nbformat.v4.nbbase import new_markdown_cell, new_notebook
+import pytest
+from nbformat.v4.nbbase import new_code_cell, new_markdown_cell, new_notebook
 
 import jupytext
 from jupytext.compare import compare, compare_notebooks
@@ -84,3 +85,31 @@ def test_read_py_percent_from_stream():
     nb = jupytext.read(stream())
     nb2 = jupytext.read(stream(), fmt="py:percent")
     compare_notebooks(nb2, nb)
+
+
+class RecordingStream(StringIO):
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+
+    def write(self, text):
+        self.chunks.append(text)
+        return super().write(text)
+
+
+@pytest.mark.parametrize("fmt", ["py:percent", "md", "ipynb"])
+def test_write_to_stream_in_chunks(fmt):
+    nb = new_notebook(cells=[new_code_cell(f"x = {i}\n" * 10) for i in range(300)])
+    stream = RecordingStream()
+    jupytext.write(nb, stream, fmt=fmt)
+
+    text = jupytext.writes(nb, fmt)
+    assert stream.getvalue() == (text if text.endswith("\n") else text + "\n")
+    if fmt != "ipynb":
+        assert len(stream.chunks) > 2
+
+
+def test_write_empty_notebook_to_stream():
+    stream = StringIO()
+    jupytext.write(new_notebook(metadata={"jupytext": {"notebook_metadata_filter": "-all"}}), stream, fmt="py:percent")
+    assert stream.getvalue() == "\n"
@@ -0,0 +1,62 @@
+import pytest
+
+from jupytext import read
+from jupytext.cli import jupytext
+
+pytestmark = [
+    pytest.mark.requires_user_kernel_python3,
+    pytest.mark.requires_nbconvert,
+    pytest.mark.skip_on_windows,
+]
+
+
+def test_execute_cache_restores_the_outputs(tmp_path, capsys):
+    script = tmp_path / "notebook.py"
+    # The notebook reads a data file, and records how many times it was executed
+    script.write_text("with open('counter.txt', 'a') as fp:\n    fp.write('x')\n\n# +\nopen('data.csv').read()\n")
+    (tmp_path / "data.csv").write_text("1")
+    cache_dir = str(tmp_path / "cache")
+    args = [str(script), "--to", "ipynb", "--execute", "--execute-cache-dir", cache_dir, "--execute-cache-dep", "*.csv"]
+
+    jupytext(args)
+    assert (tmp_path / "counter.txt").read_text() == "x"
+    assert read(tmp_path / "notebook.ipynb").cells[1].outputs[0]["data"] == {"text/plain": "'1'"}
+
+    (tmp_path / "notebook.ipynb").unlink()
+    capsys.readouterr()
+    jupytext(args)
+    out, _ = capsys.readouterr()
+    assert "restored from the execution cache" in out
+    assert (tmp_path / "counter.txt").read_text() == "x"
+    nb = read(tmp_path / "notebook.ipynb")
+    assert nb.cells[1].outputs[0]["data"] == {"text/plain": "'1'"}
+    assert nb.cells[1].execution_count == 2
+
+    # The notebook is executed again when a data dependency changes
+    (tmp_path / "data.csv").write_text("2")
+    jupytext(args)
+    assert (tmp_path / "counter.txt").read_text() == "xx"
+    assert read(tmp_path / "notebook.ipynb").cells[1].outputs[0]["data"] == {"text/plain": "'2'"}
+
+    # or when the code changes
+    script.write_text(script.read_text() + "\n# +\n1 + 1\n")
+    jupytext(args)
+    assert (tmp_path / "counter.txt").read_text() == "xxx"
+
+
+def test_execute_cache_in_the_summary(tmp_path, capsys):
+    scripts = []
+    for i in range(2):
+        script = tmp_path / f"nb{i}.py"
+        script.write_text(f"{i} + 1\n")
+        scripts.append(str(script))
+
+    args = ["--to", "ipynb", "--execute", "--execute-cache-dir", str(tmp_path / "cache")]
+    jupytext(args + scripts[:1])
+    capsys.readouterr()
+
+    jupytext(args + scripts)
+    out, _ = capsys.readouterr()
+    assert "2 succeeded, 0 failed (1 restored from the execution cache)" in out
+    for i in range(2):
+        assert read(tmp_path / f"nb{i}.ipynb").cells[0].outputs[0]["data"] == {"text/plain": str(i + 1)}
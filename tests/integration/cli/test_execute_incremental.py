@@ -0,0 +1,80 @@
+import pytest
+
+from jupytext import read, write
+from jupytext.cli import jupytext
+
+pytestmark = [
+    pytest.mark.requires_user_kernel_python3,
+    pytest.mark.requires_nbconvert,
+    pytest.mark.skip_on_windows,
+]
+
+SCRIPT = """# +
+a = 1
+a
+
+# +
+b = {b}
+b
+
+# +
+c = a + 1
+c
+"""
+
+
+def outputs(nb):
+    return [(cell.execution_count, cell.outputs[0]["data"]["text/plain"]) for cell in nb.cells]
+
+
+def test_execute_only_the_changed_cells(tmp_path, capsys):
+    script = tmp_path / "notebook.py"
+    script.write_text(SCRIPT.format(b=2))
+    args = [str(script), "--to", "ipynb", "--execute", "--execute-incremental"]
+
+    jupytext(args)
+    ipynb = tmp_path / "notebook.ipynb"
+    assert outputs(read(ipynb)) == [(1, "1"), (2, "2"), (3, "2")]
+
+    # Mark the outputs of the cells that are not executed again
+    nb = read(ipynb)
+    nb.cells[0].outputs[0]["data"]["text/plain"] = "cached 1"
+    nb.cells[2].outputs[0]["data"]["text/plain"] = "cached 2"
+    write(nb, ipynb)
+
+    script.write_text(SCRIPT.format(b=3))
+    capsys.readouterr()
+    jupytext(args)
+    out, _ = capsys.readouterr()
+    assert "Executing 1 of the 3 code cells" in out
+    assert outputs(read(ipynb)) == [(1, "cached 1"), (2, "3"), (3, "cached 2")]
+
+
+def test_execute_incremental_falls_back_to_full_execution(tmp_path, capsys):
+    script = tmp_path / "notebook.py"
+    script.write_text("from os import *\n\n# +\nx = 1\nx\n")
+    args = [str(script), "--to", "ipynb", "--execute", "--execute-incremental"]
+    jupytext(args)
+
+    script.write_text("from os import *\n\n# +\nx = 2\nx\n")
+    capsys.readouterr()
+    jupytext(args)
+    out, _ = capsys.readouterr()
+    assert "Executing all the cells" in out
+    assert "star import" in out
+    assert read(tmp_path / "notebook.ipynb").cells[1].outputs[0]["data"] == {"text/plain": "2"}
+
+
+def test_execute_incremental_on_a_paired_notebook(tmp_path, capsys):
+    script = tmp_path / "notebook.py"
+    script.write_text(SCRIPT.format(b=2))
+    jupytext([str(script), "--set-formats", "ipynb,py:percent", "--execute"])
+    assert outputs(read(tmp_path / "notebook.ipynb")) == [(1, "1"), (2, "2"), (3, "2")]
+
+    text = (tmp_path / "notebook.py").read_text()
+    (tmp_path / "notebook.py").write_text(text.replace("c = a + 1", "c = a + 2"))
+    capsys.readouterr()
+    jupytext([str(script), "--sync", "--execute", "--execute-incremental"])
+    out, _ = capsys.readouterr()
+    assert "Executing 2 of the 3 code cells" in out
+    assert outputs(read(tmp_path / "notebook.ipynb")) == [(1, "1"), (2, "2"), (3, "3")]
@@ -0,0 +1,101 @@
+import os
+from unittest import mock
+
+import pytest
+from nbformat.v4.nbbase import new_code_cell, new_notebook
+
+from jupytext import read
+from jupytext.cli import jupytext, jupytext_parallel
+from jupytext.execute import KernelPool, NotebookExecutionTimeout, execution_summary
+
+pytestmark = [
+    pytest.mark.requires_user_kernel_python3,
+    pytest.mark.requires_nbconvert,
+    pytest.mark.skip_on_windows,
+]
+
+
+def write_scripts(tmp_path, sources):
+    scripts = []
+    for i, source in enumerate(sources):
+        script = tmp_path / f"nb{i}.py"
+        script.write_text(source)
+        scripts.append(str(script))
+    return scripts
+
+
+def test_execute_many_notebooks_with_a_summary(tmp_path, capsys):
+    scripts = write_scripts(
+        tmp_path,
+        [
+            "a = 1\na + 1\n",
+            # The kernel is restarted between the notebooks
+            "'a' in globals()\n",
+            "import os\nos.getcwd()\n",
+        ],
+    )
+    assert jupytext(["--to", "ipynb", "--execute"] + scripts) == 0
+    out, _ = capsys.readouterr()
+    assert "[jupytext] Executed 3 notebooks in" in out
+    assert "3 succeeded, 0 failed" in out
+
+    assert read(tmp_path / "nb0.ipynb").cells[0].outputs[0]["data"] == {"text/plain": "2"}
+    assert read(tmp_path / "nb1.ipynb").cells[0].outputs[0]["data"] == {"text/plain": "False"}
+    assert read(tmp_path / "nb2.ipynb").cells[0].outputs[0]["data"] == {"text/plain": repr(str(tmp_path))}
+
+
+def test_execute_timeout_is_reported_in_the_summary(tmp_path, capsys):
+    # The timeout does not include the start-up of the kernel, which can be slow on a busy machine
+    scripts = write_scripts(tmp_path, ["import time\ntime.sleep(60)\n", "1 + 1\n"])
+    jupytext(["--to", "ipynb", "--execute", "--execute-timeout", "3", "--warn-only"] + scripts)
+    out, err = capsys.readouterr()
+    assert "did not complete in 3.0 seconds" in err
+    assert "1 succeeded, 1 failed" in out
+    assert f"{scripts[0]}: The execution of {scripts[0]} did not complete in 3.0 seconds" in out
+
+    assert not (tmp_path / "nb0.ipynb").exists()
+    assert read(tmp_path / "nb1.ipynb").cells[0].outputs[0]["data"] == {"text/plain": "2"}
+
+
+def test_execute_with_jobs(tmp_path, capsys):
+    scripts = write_scripts(tmp_path, ["import os, time\ntime.sleep(1)\nos.getppid()\n"] * 4)
+    with mock.patch("jupytext.cli.jupytext_parallel", wraps=jupytext_parallel) as parallel:
+        assert jupytext(["--to", "ipynb", "--execute", "--jobs", "2"] + scripts) == 0
+    parallel.assert_called_once()
+    out, _ = capsys.readouterr()
+    assert "[jupytext] Executed 4 notebooks in" in out
+
+    # The kernels were started by the two worker processes, not by this process
+    parents = {read(tmp_path / f"nb{i}.ipynb").cells[0].outputs[0]["data"]["text/plain"] for i in range(4)}
+    assert str(os.getpid()) not in parents
+    assert len(parents) == 2
+
+
+def test_kernel_pool_reuses_the_kernel_manager(tmp_path, python_notebook):
+    kernel_name = python_notebook.metadata.kernelspec.name
+    pool = KernelPool(notebooks_left=2)
+    try:
+        nb = new_notebook(cells=[new_code_cell("1 + 1")], metadata=python_notebook.metadata)
+        pool.execute(nb, kernel_name, path=str(tmp_path))
+        km = pool.kernels[(kernel_name, str(tmp_path))]
+
+        nb = new_notebook(cells=[new_code_cell("2 + 2")], metadata=python_notebook.metadata)
+        pool.execute(nb, kernel_name, path=str(tmp_path))
+        assert nb.cells[0].outputs[0]["data"] == {"text/plain": "4"}
+        # No more notebooks are expected, so the kernel is not kept
+        assert not pool.kernels
+        assert not km.is_alive()
+    finally:
+        pool.close()
+
+    assert execution_summary(pool.reports)[0].endswith("2 succeeded, 0 failed")
+
+
+def test_kernel_pool_timeout(python_notebook):
+    pool = KernelPool(notebooks_left=2)
+    nb = new_notebook(cells=[new_code_cell("import time\ntime.sleep(60)")], metadata=python_notebook.metadata)
+    with pytest.raises(NotebookExecutionTimeout):
+        pool.execute(nb, python_notebook.metadata.kernelspec.name, nb_file="slow.ipynb", timeout=2)
+    # The kernel of a notebook that timed out is not reused
+    assert not pool.kernels
+    assert pool.reports[0].failed
@@ -1,6 +1,7 @@
 import logging
 import os
 import sys
+import threading
 import unittest.mock as mock
 
 import pytest
@@ -56,6 +57,70 @@ async def test_config_file_is_called_just_once(tmpdir, cm, n=2):
     assert mock_config.call_count == 1
 
 
+def set_old_timestamp(*paths, age=10):
+    """Make the files look older, so that the contents manager caches their configuration"""
+    for path in paths:
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime - age, stat.st_mtime - age))
+
+
+async def test_config_is_cached_per_directory(tmpdir, cm):
+    cm.root_dir = str(tmpdir)
+    tmpdir.join("jupytext.toml").write('formats = "ipynb,py:percent"\n')
+    dirs = [tmpdir.mkdir(f"dir{i}").mkdir("nested") for i in range(3)]
+    for nested in dirs:
+        jupytext.write(SAMPLE_NOTEBOOK, str(nested.join("notebook.ipynb")))
+    set_old_timestamp(tmpdir.join("jupytext.toml"), tmpdir, *dirs, *[nested.dirpath() for nested in dirs])
+
+    for i in range(3):
+        await ensure_async(cm.get(f"dir{i}/nested/notebook.ipynb", content=False))
+
+    # Alternating between the directories does not search for the configuration file again
+    mock_config = mock.MagicMock(return_value=None)
+    with (
+        mock.patch("jupytext.sync_contentsmanager.load_jupytext_configuration_file", mock_config),
+        mock.patch("jupytext.async_contentsmanager.load_jupytext_configuration_file", mock_config),
+        mock.patch.object(cm, "file_exists", wraps=cm.file_exists) as file_exists,
+    ):
+        for _ in range(2):
+            for i in range(3):
+                model = await ensure_async(cm.get(f"dir{i}/nested/notebook.ipynb", content=False))
+                assert model["type"] == "notebook"
+    # NB: 'get' checks that the notebook exists
+    assert [call.args[0] for call in file_exists.call_args_list] == [f"dir{i}/nested/notebook.ipynb" for i in range(3)] * 2
+    mock_config.assert_not_called()
+
+    config = await ensure_async(cm.get_config("dir0/nested/notebook.ipynb"))
+    assert config.formats == ["ipynb,py:percent"]
+
+    # The cache is refreshed when the config file is modified
+    tmpdir.join("jupytext.toml").write('formats = "ipynb,md"\n')
+    config = await ensure_async(cm.get_config("dir0/nested/notebook.ipynb"))
+    assert config.formats == ["ipynb,md"]
+
+    # or when a configuration file is added in one of the directories searched
+    dirs[1].dirpath().join("jupytext.toml").write('formats = "ipynb,py:light"\n')
+    config = await ensure_async(cm.get_config("dir1/nested/notebook.ipynb"))
+    assert config.formats == ["ipynb,py:light"]
+
+
+async def test_config_cache_is_refreshed_when_pyproject_is_edited(tmpdir, cm):
+    cm.root_dir = str(tmpdir)
+    nested = tmpdir.mkdir("nested")
+    jupytext.write(SAMPLE_NOTEBOOK, str(nested.join("notebook.ipynb")))
+    tmpdir.join("pyproject.toml").write('[project]\nname = "sample"\n')
+    set_old_timestamp(tmpdir.join("pyproject.toml"), tmpdir, nested)
+
+    assert await ensure_async(cm.get_config("nested/notebook.ipynb")) is cm
+
+    # Editing pyproject.toml in place does not change the modification time of the directory
+    with open(tmpdir.join("pyproject.toml"), "a") as fp:
+        fp.write('\n[tool.jupytext]\nformats = "ipynb,py:percent"\n')
+    config = await ensure_async(cm.get_config("nested/notebook.ipynb"))
+    assert config is not cm
+    assert config.formats == ["ipynb,py:percent"]
+
+
 async def test_pairing_through_config_leaves_ipynb_unmodified(tmpdir, cm):
     cm.root_dir = str(tmpdir)
 
@@ -258,3 +323,86 @@ async def test_cm_config_log_only_if_changed(cwd_tmp_path, tmp_path, caplog, cm)
     # Same config as previously => no log
     await ensure_async(cm.get("subfolder/nb2.py", type="notebook", content=False))
     assert "Jupytext configuration file" not in caplog.text
+
+
+async def test_cell_export_cache(tmp_path, caplog, cm, python_notebook):
+    cm.root_dir = str(tmp_path)
+    cm.formats = "ipynb,py:percent"
+    cm.cell_export_cache = True
+    caplog.set_level(logging.INFO)
+
+    nb = new_notebook(
+        cells=[new_markdown_cell("A Markdown cell"), new_code_cell("1 + 1"), new_code_cell("2 + 2")],
+        metadata=python_notebook.metadata,
+    )
+    await ensure_async(cm.save(notebook_model(nb), "notebook.ipynb"))
+    assert "Cell export cache for notebook.py: 0 of 3 cells reused" in caplog.text
+    caplog.clear()
+
+    nb.cells[1].source = "1 + 2"
+    await ensure_async(cm.save(notebook_model(nb), "notebook.ipynb"))
+    assert "Cell export cache for notebook.py: 2 of 3 cells reused" in caplog.text
+
+    nb2 = (await ensure_async(cm.get("notebook.ipynb")))["content"]
+    assert (tmp_path / "notebook.py").read_text() == jupytext.writes(nb2, "py:percent")
+    assert nb2.cells[1].source == "1 + 2"
+
+
+@pytest.mark.parametrize("conversion_executor", ["thread", "process"])
+async def test_conversion_executor(tmp_path, cm, python_notebook, conversion_executor):
+    cm.root_dir = str(tmp_path)
+    cm.formats = "ipynb,py:percent"
+    cm.conversion_executor = conversion_executor
+    cm.conversion_max_workers = 2
+
+    nb = new_notebook(
+        cells=[new_markdown_cell("A Markdown cell"), new_code_cell("1 + 1")],
+        metadata=python_notebook.metadata,
+    )
+    await ensure_async(cm.save(notebook_model(nb), "notebook.ipynb"))
+    assert (tmp_path / "notebook.py").read_text() == jupytext.writes(nb, "py:percent")
+
+    text = (tmp_path / "notebook.py").read_text()
+    (tmp_path / "notebook.py").write_text(text.replace("1 + 1", "1 + 2"))
+    for path in ["notebook.py", "notebook.ipynb"]:
+        nb2 = (await ensure_async(cm.get(path)))["content"]
+        assert [cell.source for cell in nb2.cells] == ["A Markdown cell", "1 + 2"]
+
+    if isinstance(cm, jupytext.TextFileContentsManager):
+        # The synchronous contents manager does not use a pool
+        assert not cm.conversion_executors
+        return
+
+    assert list(cm.conversion_executors) == [(conversion_executor, 2)]
+    executor = cm.conversion_executors[conversion_executor, 2]
+    if conversion_executor == "process":
+        # Forking the multi-threaded Jupyter server could deadlock
+        assert executor._mp_context.get_start_method() == "spawn"
+
+    # The pool is replaced when the options change
+    cm.conversion_max_workers = 3
+    await ensure_async(cm.get("notebook.py"))
+    assert list(cm.conversion_executors) == [(conversion_executor, 3)]
+    with pytest.raises(RuntimeError, match="shutdown"):
+        executor.submit(int)
+
+    cm.close()
+    assert not cm.conversion_executors
+
+
+async def test_conversion_executor_runs_the_conversions_in_a_thread(tmp_path, python_notebook):
+    cm = jupytext.AsyncTextFileContentsManager()
+    cm.root_dir = str(tmp_path)
+    (tmp_path / "jupytext.toml").write_text('formats = "ipynb,py:percent"\nconversion_executor = "thread"\n')
+
+    threads = set()
+
+    def reads(*args, **kwargs):
+        threads.add(threading.get_ident())
+        return jupytext.reads(*args, **kwargs)
+
+    nb = new_notebook(cells=[new_code_cell("1 + 1")], metadata=python_notebook.metadata)
+    await cm.save(notebook_model(nb), "notebook.ipynb")
+    with mock.patch("jupytext.async_contentsmanager.reads", reads):
+        await cm.get("notebook.py")
+    assert threads and threading.get_ident() not in threads
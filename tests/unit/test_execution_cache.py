@@ -0,0 +1,86 @@
+import os
+
+from nbformat.v4.nbbase import new_code_cell, new_markdown_cell, new_notebook, new_output
+
+from jupytext.execute import ExecutionCache
+
+
+def executed_notebook(source="1 + 1", result="2"):
+    return new_notebook(
+        cells=[
+            new_markdown_cell("A notebook"),
+            new_code_cell(
+                source,
+                execution_count=1,
+                outputs=[new_output("execute_result", data={"text/plain": result}, execution_count=1)],
+            ),
+        ],
+        metadata={"language_info": {"name": "python"}},
+    )
+
+
+def test_restore_the_outputs(tmp_path):
+    cache = ExecutionCache(str(tmp_path / "cache"))
+    nb = executed_notebook()
+    key = cache.key(nb, "python3", str(tmp_path))
+    cache.put(key, nb)
+
+    nb = new_notebook(cells=[new_markdown_cell("Another text"), new_code_cell("1 + 1")])
+    assert cache.key(nb, "python3", str(tmp_path)) == key
+    assert cache.restore(key, nb)
+    assert nb.cells[1].execution_count == 1
+    assert nb.cells[1].outputs[0]["data"] == {"text/plain": "2"}
+    assert nb.metadata["language_info"] == {"name": "python"}
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_the_key_depends_on_the_code_kernel_and_run_path(tmp_path):
+    cache = ExecutionCache(str(tmp_path / "cache"))
+    key = cache.key(executed_notebook(), "python3", str(tmp_path))
+    assert cache.key(executed_notebook("1 + 2"), "python3", str(tmp_path)) != key
+    assert cache.key(executed_notebook(), "other_kernel", str(tmp_path)) != key
+    assert cache.key(executed_notebook(), "python3", str(tmp_path / "cache")) != key
+    # The outputs and the markdown cells are not part of the key
+    assert cache.key(executed_notebook(result="3"), "python3", str(tmp_path)) == key
+
+
+def test_the_key_depends_on_the_data_files(tmp_path):
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "a.csv").write_text("x\n1\n")
+    cache = ExecutionCache(str(tmp_path / "cache"), dependencies=["data/*.csv"])
+    key = cache.key(executed_notebook(), "python3", str(tmp_path))
+
+    (tmp_path / "data" / "a.csv").write_text("x\n2\n")
+    key_modified = cache.key(executed_notebook(), "python3", str(tmp_path))
+    assert key_modified != key
+
+    (tmp_path / "data" / "b.csv").write_text("y\n")
+    assert cache.key(executed_notebook(), "python3", str(tmp_path)) != key_modified
+
+
+def test_miss(tmp_path):
+    cache = ExecutionCache(str(tmp_path / "cache"))
+    nb = new_notebook(cells=[new_code_cell("1 + 1")])
+    assert not cache.restore(cache.key(nb), nb)
+    assert nb.cells[0].outputs == []
+    assert cache.misses == 1
+
+
+def test_the_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ExecutionCache(str(tmp_path / "cache"))
+    keys = []
+    for i in range(3):
+        nb = executed_notebook(f"x = {i}", "x" * 1000)
+        keys.append(cache.key(nb))
+        cache.put(keys[-1], nb)
+        path = cache._path(keys[-1])
+        os.utime(path, (i, i))
+
+    # The first entry is used again
+    assert cache.restore(keys[0], new_notebook(cells=[new_code_cell("x = 0")]))
+
+    cache.max_size = 2 * os.stat(cache._path(keys[0])).st_size
+    cache.evict()
+    assert os.path.exists(cache._path(keys[0]))
+    assert not os.path.exists(cache._path(keys[1]))
+    assert os.path.exists(cache._path(keys[2]))
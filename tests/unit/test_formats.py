@@ -166,6 +166,42 @@ def test_script_with_spyder_cell_with_name_is_percent(
     assert guess_format(script, ".py")[0] == "percent"
 
 
+def test_script_with_magic_before_percent_cell_is_hydrogen(
+    script="""%matplotlib inline
+
+#%%
+1 + 2""",
+):
+    assert guess_format(script, ".py")[0] == "hydrogen"
+
+
+def test_percent_cell_marker_in_a_string_is_ignored(
+    script='''text = """
+# %%
+"""
+''',
+):
+    assert guess_format(script, ".py")[0] == "light"
+
+
+@pytest.mark.parametrize(
+    "script, ext, expected",
+    [
+        ("# %%\n# {{{\n1 + 2", ".py", ("percent", {})),
+        ("import marimo\napp = marimo.App()\n# region\n", ".py", ("marimo", {})),
+        ("# region\n# {{{\n", ".py", ("light", {"cell_markers": "{{{,}}}"})),
+        ("# " + "#" * 20 + "\n# region\n", ".py", ("light", {"cell_markers": "region,endregion"})),
+        ("# " + "#" * 20 + "\n1 + 2\n" + "#" * 21 + "\n", ".py", ("sphinx", {})),
+        ("# " + "#" * 20 + "\n1 + 2\n" + "#" * 21 + "\n", ".R", ("light", {})),
+        ("#' Text\n1 + 2\n", ".R", ("spin", {})),
+        ("// %%\nx = 1;\n", ".js", ("percent", {})),
+    ],
+)
+def test_guess_format_marker_priority(script, ext, expected):
+    assert guess_format(script, ext) == expected
+    assert guess_format(script, ext, script.splitlines(), {}) == expected
+
+
 def test_read_format_from_metadata(
     script="""---
 jupyter:
@@ -1,9 +1,13 @@
-from nbformat.v4.nbbase import new_markdown_cell, new_notebook, new_raw_cell
+from unittest import mock
+
+import yaml
+from nbformat.v4.nbbase import new_code_cell, new_markdown_cell, new_notebook, new_raw_cell
 
 import jupytext
 from jupytext.compare import compare
-from jupytext.formats import get_format_implementation
+from jupytext.formats import get_format_implementation, guess_format, read_metadata
 from jupytext.header import (
+    TextDocument,
     header_to_metadata_and_cell,
     metadata_and_cell_to_header,
     recursive_update,
@@ -203,3 +207,49 @@ def test_recusive_update():
     # the value of `None`` is a special case
     assert recursive_update({0: 1}, {0: None}) == {}
     assert recursive_update({0: 1}, {0: None}, overwrite=False) == {}
+
+
+def test_text_document_parses_each_header_once():
+    text = """---
+title: Sample header
+jupyter:
+  kernelspec:
+    name: python3
+---
+
+Text
+"""
+    document = TextDocument(text)
+    with mock.patch("yaml.safe_load", wraps=yaml.safe_load) as safe_load:
+        metadata, jupyter, cell, pos = document.header("", "")
+        assert document.header("", "") == (metadata, jupyter, cell, pos)
+    assert safe_load.call_count == 1
+    expected_metadata, _, expected_cell, expected_pos = header_to_metadata_and_cell(text.splitlines(), "", "")
+    assert (metadata, cell.source, pos) == (expected_metadata, expected_cell.source, expected_pos)
+
+    # The caller can modify the metadata and the cell
+    metadata["kernelspec"]["name"] = "modified"
+    cell.source = "modified"
+    metadata, _, cell, _ = document.header("", "")
+    assert metadata["kernelspec"]["name"] == "python3"
+    assert cell.source == "---\ntitle: Sample header\n---"
+
+
+def test_reads_parses_the_header_once():
+    notebook = new_notebook(
+        cells=[new_code_cell("1 + 1")],
+        metadata={"kernelspec": {"name": "python3", "display_name": "Python 3", "language": "python"}},
+    )
+    for fmt in ["py:percent", "md", "Rmd", "R"]:
+        text = jupytext.writes(notebook, fmt)
+        with mock.patch("yaml.safe_load", wraps=yaml.safe_load) as safe_load:
+            jupytext.reads(text, fmt.split(":")[0])
+        assert safe_load.call_count == 1, fmt
+
+
+def test_guess_format_uses_the_lines_of_the_caller():
+    text = "# %%\n1 + 1\n"
+    lines = text.splitlines()
+    with mock.patch("jupytext.formats.read_metadata", wraps=read_metadata) as read:
+        assert guess_format(text, ".py", lines)[0] == "percent"
+    assert read.call_args[0][2].lines is lines
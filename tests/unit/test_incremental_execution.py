@@ -0,0 +1,108 @@
+import pytest
+from nbformat.v4.nbbase import new_code_cell, new_markdown_cell, new_notebook, new_output
+
+from jupytext.incremental import CellNames, IncrementalExecutionUnsure, cells_to_execute
+
+PYTHON = {"kernelspec": {"name": "python3", "language": "python", "display_name": "Python 3"}}
+
+
+def notebook_with_outputs(*sources):
+    return new_notebook(
+        cells=[
+            new_code_cell(
+                source,
+                execution_count=i + 1,
+                outputs=[new_output("execute_result", data={"text/plain": "..."}, execution_count=i + 1)],
+            )
+            for i, source in enumerate(sources)
+        ],
+        metadata=PYTHON,
+    )
+
+
+def notebook(*sources):
+    return new_notebook(cells=[new_code_cell(source) for source in sources], metadata=PYTHON)
+
+
+SOURCES = [
+    "import pandas as pd",
+    "a = 1",
+    "b = 2",
+    "c = a + 1",
+    "d = b + 1",
+    "c * 2",
+]
+
+
+def test_no_change():
+    assert cells_to_execute(notebook(*SOURCES), notebook_with_outputs(*SOURCES)) == []
+
+
+def test_a_changed_cell_and_its_dependents_are_executed():
+    sources = list(SOURCES)
+    sources[1] = "a = 10"
+    assert cells_to_execute(notebook(*sources), notebook_with_outputs(*SOURCES)) == [1, 3, 5]
+
+
+def test_the_cells_required_by_a_changed_cell_are_executed():
+    sources = list(SOURCES)
+    sources[5] = "c * 3"
+    assert cells_to_execute(notebook(*sources), notebook_with_outputs(*SOURCES)) == [1, 3, 5]
+
+
+def test_markdown_cells_are_ignored():
+    nb = notebook(*SOURCES)
+    nb.cells.insert(2, new_markdown_cell("A new markdown cell"))
+    assert cells_to_execute(nb, notebook_with_outputs(*SOURCES)) == []
+
+
+def test_cells_without_outputs_are_executed():
+    nb_outputs = notebook_with_outputs(*SOURCES)
+    nb_outputs.cells[2].execution_count = None
+    assert cells_to_execute(notebook(*SOURCES), nb_outputs) == [2, 4]
+
+
+def test_a_removed_cell():
+    sources = SOURCES[:2] + SOURCES[3:]
+    # The cell that used the name defined by the removed cell is executed
+    assert cells_to_execute(notebook(*sources), notebook_with_outputs(*SOURCES)) == [3]
+
+
+def test_a_method_call_modifies_the_object():
+    sources = ["x = []", "x.append(1)", "y = 0", "len(x)"]
+    new_sources = ["x = []", "x.append(2)", "y = 0", "len(x)"]
+    assert cells_to_execute(notebook(*new_sources), notebook_with_outputs(*sources)) == [0, 1, 3]
+
+
+def test_a_function_uses_the_names_defined_after_it():
+    sources = ["def f():\n    return x", "x = 1", "f()"]
+    new_sources = ["def f():\n    return x", "x = 2", "f()"]
+    assert cells_to_execute(notebook(*new_sources), notebook_with_outputs(*sources)) == [0, 1, 2]
+
+
+def test_names_in_functions_are_local():
+    names = CellNames("def f(u):\n    v = u + w\n    return v\n\nz = [i for i in range(3)]")
+    assert names.bound == {"f", "z"}
+    assert {"u", "w", "range"} <= names.uses
+    assert names.carried["f"] >= {"u", "w"}
+
+
+@pytest.mark.parametrize(
+    "source",
+    ["%matplotlib inline", "!ls", "from os import *", "exec('x = 1')", "def f():\n    global x\n    x = 1"],
+)
+def test_fall_back_to_full_execution(source):
+    with pytest.raises(IncrementalExecutionUnsure):
+        cells_to_execute(notebook(source, "x = 1"), notebook_with_outputs(source, "x = 2"))
+
+
+def test_reordered_cells_are_executed_in_full():
+    with pytest.raises(IncrementalExecutionUnsure):
+        cells_to_execute(notebook("x = 2", "x = 1", "print(x)"), notebook_with_outputs("x = 1", "x = 2", "print(x)"))
+
+
+def test_non_python_notebooks_are_executed_in_full():
+    nb = notebook("x <- 1")
+    nb.metadata["kernelspec"]["language"] = "R"
+    with pytest.raises(IncrementalExecutionUnsure):
+        cells_to_execute(nb, notebook_with_outputs("x <- 1"))
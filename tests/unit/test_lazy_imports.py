@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+import pytest
+
+
+def imported_modules(code):
+    """The modules imported by the code, when run in a new Python process"""
+    out = subprocess.run(
+        [sys.executable, "-c", code + "\nimport sys\nprint('\\n'.join(sys.modules))"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return set(out.splitlines())
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import jupytext",
+        "from jupytext.cli import jupytext; jupytext(['--version'])",
+    ],
+)
+def test_nbformat_is_not_imported(code):
+    modules = imported_modules(code)
+    assert "jupytext" in modules
+    assert "nbformat" not in modules
+
+
+def test_public_objects_are_imported_on_first_use():
+    modules = imported_modules("import jupytext; jupytext.reads")
+    assert "jupytext.jupytext" in modules
+    assert "nbformat" in modules
+    assert "jupyter_server" not in modules
+
+
+def test_myst_parser_is_imported_on_first_use():
+    modules = imported_modules("import jupytext; jupytext.reads('1 + 1', 'py:percent')")
+    assert "markdown_it" not in modules
+
+
+def test_the_daemon_and_execution_modules_are_not_imported_by_the_cli():
+    modules = imported_modules("from jupytext.cli import jupytext; jupytext(['--version'])")
+    assert "jupytext.daemon" not in modules
+    assert "jupytext.execute" not in modules